@@ -14,6 +14,7 @@ Update the Hiero export to be Tank/Shotgun aware
 import re
 import os
 import sys
+import time
 import shutil
 import tempfile
 import traceback
@@ -56,6 +57,8 @@ from tk_hiero_export import (
     ShotgunNukeShotExporterUI,
     ShotgunAudioExporterUI,
     ShotgunHieroObjectBase,
+    InstrumentedConnection,
+    trace_span,
 )
 
 sys.path.pop()
@@ -97,6 +100,65 @@ class HieroExport(Application):
         self.first_shot = False
         self._register_exporter()
 
+    @property
+    def shotgun(self):
+        """
+        The app's SG connection. During an export, the requests made through
+        it are recorded by the export's
+        :class:`~tk_hiero_export.sg_instrumentation.SGRequestRecorder`.
+        """
+        sg = super(HieroExport, self).shotgun
+        session = getattr(self, "export_session", None)
+        recorder = session.sg_recorder if session is not None else None
+        if recorder is not None:
+            return InstrumentedConnection(sg, recorder)
+        return sg
+
+    def execute_hook(self, key, base_class=None, **kwargs):
+        """
+        Executes a hook, see :meth:`_dispatch_hook`.
+        """
+        return self._dispatch_hook(
+            key,
+            "execute",
+            super(HieroExport, self).execute_hook,
+            key,
+            base_class=base_class,
+            **kwargs
+        )
+
+    def execute_hook_method(self, key, method_name, base_class=None, **kwargs):
+        """
+        Executes a hook method, see :meth:`_dispatch_hook`.
+        """
+        return self._dispatch_hook(
+            key,
+            method_name,
+            super(HieroExport, self).execute_hook_method,
+            key,
+            method_name,
+            base_class=base_class,
+            **kwargs
+        )
+
+    def _dispatch_hook(self, key, method_name, execute, *args, **kwargs):
+        """
+        Runs a hook method through ``execute``. Every hook run by the app goes
+        through here: during an export, the latency of the call is recorded by
+        the export's :class:`~tk_hiero_export.hook_profiler.HookProfiler`, and
+        the call is a span of the export's
+        :class:`~tk_hiero_export.tracing.ExportTracer` when it is traced.
+        """
+        session = getattr(self, "export_session", None)
+        profiler = session.hook_profiler if session is not None else None
+        with trace_span(self, "%s.%s" % (key, method_name), "hook"):
+            start = time.perf_counter()
+            try:
+                return execute(*args, **kwargs)
+            finally:
+                if profiler is not None:
+                    profiler.record(key, method_name, time.perf_counter() - start)
+
     @property
     def context_change_allowed(self):
         """
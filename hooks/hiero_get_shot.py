@@ -45,7 +45,15 @@ class HieroGetShot(Hook):
 
         # default the return fields to None to use the python-api default
         fields = kwargs.get("fields", None)
-        shots = sg.find("Shot", filter, fields=fields)
+
+        # use the shot prefetched while the export dialog was open if any
+        session = getattr(self.parent, "export_session", None)
+        prefetch = session.prefetch if session is not None else None
+        shot = prefetch.get_shot(parent, item.name(), fields) if prefetch else None
+        if shot is not None:
+            shots = [shot]
+        else:
+            shots = sg.find("Shot", filter, fields=fields)
         if len(shots) > 1:
             # can not handle multiple shots with the same name
             raise Exception("Multiple shots named '%s' found", item.name())
@@ -105,7 +113,14 @@ class HieroGetShot(Hook):
         # the entity type of the parent.
         par_entity_type = "Sequence"
 
-        parents = sg.find(par_entity_type, filter)
+        # use the sequence prefetched while the export dialog was open if any
+        session = getattr(self.parent, "export_session", None)
+        prefetch = session.prefetch if session is not None else None
+        parent = prefetch.get_sequence(hiero_sequence.name()) if prefetch else None
+        if parent is not None:
+            parents = [parent]
+        else:
+            parents = sg.find(par_entity_type, filter)
         if len(parents) > 1:
             # can not handle multiple parents with the same name
             raise Exception(
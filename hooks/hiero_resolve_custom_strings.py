@@ -17,9 +17,6 @@ class HieroResolveCustomStrings(Hook):
     their concrete value when paths are being processed during the export.
     """
 
-    # Cache of shots that have already been pulled from shotgun
-    _sg_lookup_cache = {}
-
     def execute(self, task, keyword, **kwargs):
         """
         The default implementation of the custom resolver simply looks up
@@ -36,8 +33,11 @@ class HieroResolveCustomStrings(Hook):
         """
         shot_code = task._item.name()
 
-        # grab the shot from the cache, or the get_shot hook if not cached
-        sg_shot = self._sg_lookup_cache.get(shot_code)
+        # grab the shot from the export's cache, which holds the custom fields
+        # of its shots, or the get_shot hook if not cached
+        session = getattr(self.parent, "export_session", None)
+        cache = session.custom_field_cache if session is not None else None
+        sg_shot = cache.get_shot(task._item) if cache is not None else None
         if sg_shot is None:
             fields = [
                 ctf["keyword"]
@@ -51,8 +51,8 @@ class HieroResolveCustomStrings(Hook):
                 fields=fields,
                 upload_thumbnail=False,
             )
-
-            self._sg_lookup_cache[shot_code] = sg_shot
+            if cache is not None and sg_shot is not None:
+                cache.add_shot(task._item, sg_shot)
 
         if sg_shot is None:
             raise RuntimeError("Could not find shot for custom resolver: %s" % keyword)
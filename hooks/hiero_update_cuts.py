@@ -57,6 +57,23 @@ class HieroUpdateCuts(HookBaseClass):
         self.parent.logger.info("Created CutItem in ShotGrid: %s" % cut_item)
         return cut_item
 
+    def allow_bulk_cut_item_creation(self, preset_properties):
+        """
+        Determines whether all of the CutItem entities of the exported
+        cut are created by the shot processor in a single batch request,
+        right after the Cut entity is created. When bulk creation is
+        allowed, create_cut_item is not called, so it is only allowed
+        when create_cut_item isn't overridden.
+
+        :param dict preset_properties: The export preset's properties
+            dictionary.
+
+        :returns: True to create all CutItems in bulk, False to create
+            them one at a time.
+        :rtype: bool
+        """
+        return type(self).create_cut_item is HieroUpdateCuts.create_cut_item
+
     def get_cut_thumbnail(self, cut, task_item, preset_properties):
         """
         Gets the path to a thumbnail image to use when updating the
@@ -41,6 +41,45 @@ class HieroUpdateShot(HookBaseClass):
         )
         self.parent.sgtk.create_filesystem_structure(entity_type, [entity_id])
 
+    def allow_bulk_filesystem_structure_creation(self, preset_properties):
+        """
+        Determines whether the filesystem structures of the exported
+        shots are created with a single call of
+        create_filesystem_structures per entity type, once all of the
+        shots have been updated. When bulk creation is allowed,
+        create_filesystem_structure is not called, so it is only allowed
+        when create_filesystem_structure isn't overridden.
+
+        :param dict preset_properties: The export preset's properties
+            dictionary.
+
+        :returns: True to create the filesystem structures in bulk,
+            False to create them one shot at a time.
+        :rtype: bool
+        """
+        return (
+            type(self).create_filesystem_structure
+            is HieroUpdateShot.create_filesystem_structure
+        )
+
+    def create_filesystem_structures(self, entity_type, entity_ids, preset_properties):
+        """
+        Handles creating the filesystem structure for all of the shots
+        of an entity type that were exported, in a single call.
+
+        :param str entity_type: The entity type that was created or
+            updated as part of the export. Most likely this will be
+            "Shot".
+        :param list entity_ids: The ids of the entities that were
+            created or updated as part of the export.
+        :param dict preset_properties: The export preset's properties
+            dictionary.
+        """
+        self.parent.logger.debug(
+            "Creating file system structure for %s %s..." % (entity_type, entity_ids)
+        )
+        self.parent.sgtk.create_filesystem_structure(entity_type, entity_ids)
+
     def update_shotgun_shot_entity(
         self, entity_type, entity_id, entity_data, preset_properties
     ):
@@ -61,3 +100,39 @@ class HieroUpdateShot(HookBaseClass):
             "Updating info for %s %s: %s" % (entity_type, entity_id, entity_data)
         )
         self.parent.sgtk.shotgun.update(entity_type, entity_id, entity_data)
+
+    def update_shotgun_shot_entity_changes(
+        self, entity_type, entity_id, entity_data, changed_data, preset_properties
+    ):
+        """
+        Handles updating the Shot entity in Shotgun with the fields of the
+        new data whose values differ from the ones of the Shot, rather than
+        all of them. The Shot isn't updated when none of them differ.
+
+        When update_shotgun_shot_entity is overridden, it is called with
+        all of the new data instead, as it would be otherwise.
+
+        :param str entity_type: The entity type to update.
+        :param int entity_id: The id of the entity to update.
+        :param dict entity_data: The new data to update the entity with.
+        :param dict changed_data: The fields of the new data whose values
+            differ from the ones of the entity in Shotgun.
+        :param dict preset_properties: The export preset's properties
+            dictionary.
+        :returns: The data the Shot was updated with, empty if it wasn't.
+        :rtype: dict
+        """
+        if (
+            type(self).update_shotgun_shot_entity
+            is not HieroUpdateShot.update_shotgun_shot_entity
+        ):
+            self.update_shotgun_shot_entity(
+                entity_type, entity_id, entity_data, preset_properties
+            )
+            return entity_data
+        elif changed_data:
+            self.update_shotgun_shot_entity(
+                entity_type, entity_id, changed_data, preset_properties
+            )
+            return changed_data
+        return {}
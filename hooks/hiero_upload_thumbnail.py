@@ -37,15 +37,13 @@ class HieroUploadThumbnail(Hook):
         :param item: The Hiero task item being processed.
         :param task: The Hiero task being processed.
         """
-        thumbdir = tempfile.mkdtemp(prefix="hiero_process_shot")
         try:
-            path = "%s.png" % os.path.join(thumbdir, source.name())
             task = kwargs.get("task", None)
 
             if item is None:
                 # No timeline info, use the poster frame of the source item
                 frame = source.posterFrame()
-                thumb_qimage = source.thumbnail(frame)
+                thumb_source = source
             else:
                 if (task is not None) and task.isCollated():
                     # collated shot, use middle frame from task sequence (all collated items)
@@ -56,21 +54,32 @@ class HieroUploadThumbnail(Hook):
                             min_frame = min(i.timelineIn(), min_frame)
                             max_frame = max(i.timelineOut(), max_frame)
                     frame = int(math.ceil((min_frame + max_frame) / 2.0))
-                    thumb_qimage = task._sequence.thumbnail(frame)
+                    thumb_source = task._sequence
                 else:
                     # Simple item, just use middle frame
                     frame = int(math.ceil((item.sourceIn() + item.sourceOut()) / 2.0))
-                    thumb_qimage = source.thumbnail(frame)
-            # scale it down to 600px wide
-            thumb_qimage_scaled = thumb_qimage.scaledToWidth(
-                600, QtCore.Qt.SmoothTransformation
-            )
-            # scale thumbnail here...
-            thumb_qimage_scaled.save(path)
+                    thumb_source = source
+
             self.parent.log_debug(
                 "Uploading thumbnail for %s %s..." % (entity["type"], entity["id"])
             )
-            self.parent.shotgun.upload_thumbnail(entity["type"], entity["id"], path)
+            session = getattr(self.parent, "export_session", None)
+            upload_service = session.upload_service if session else None
+            thumbnail_cache = session.thumbnail_cache if session else None
+            if upload_service is None:
+                self._upload_from_file(entity, source, thumb_source.thumbnail(frame))
+            elif thumbnail_cache is not None:
+                # get the scaled and encoded thumbnail from the export's cache,
+                # then queue the upload on the export's background uploader.
+                upload_service.upload_thumbnail_data(
+                    entity,
+                    thumbnail_cache.get(thumb_source, frame),
+                    thumbnail_cache.image_format,
+                )
+            else:
+                upload_service.upload_thumbnail_image(
+                    entity, thumb_source.thumbnail(frame)
+                )
         except:
             self.parent.log_info(
                 "Thumbnail for %s was not refreshed in ShotGrid." % source
@@ -78,6 +87,21 @@ class HieroUploadThumbnail(Hook):
 
             tb = traceback.format_exc()
             self.parent.log_debug(tb)
+
+    def _upload_from_file(self, entity, source, thumb_qimage):
+        """
+        Uploads the thumbnail through a temporary file, when there is no
+        upload service available.
+        """
+        thumbdir = tempfile.mkdtemp(prefix="hiero_process_shot")
+        try:
+            path = "%s.png" % os.path.join(thumbdir, source.name())
+            # scale it down to 600px wide
+            thumb_qimage_scaled = thumb_qimage.scaledToWidth(
+                600, QtCore.Qt.SmoothTransformation
+            )
+            thumb_qimage_scaled.save(path)
+            self.parent.shotgun.upload_thumbnail(entity["type"], entity["id"], path)
         finally:
             # Sometimes Windows holds on to the temporary thumbnail file longer than expected which
             # can cause an exception here. If we wait a second and try again, this usually solves
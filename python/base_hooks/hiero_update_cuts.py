@@ -63,6 +63,35 @@ class HieroUpdateCuts(HookBaseClass):
         """
         raise NotImplementedError
 
+    def allow_bulk_cut_item_creation(self, preset_properties):
+        """
+        Determines whether all of the CutItem entities of the exported
+        cut are created by the shot processor in a single batch request,
+        right after the Cut entity is created. When bulk creation is
+        allowed, :meth:`create_cut_item` is not called.
+
+        If this method returns False, or isn't implemented by the hook,
+        each CutItem entity is created through :meth:`create_cut_item`
+        when its Shot is processed. The default hook only allows bulk
+        creation when :meth:`create_cut_item` isn't overridden.
+
+        Example Implementation:
+
+        .. code-block:: python
+
+            # We override create_cut_item to filter the CutItems that get
+            # created, so we need it to be called for each one of them.
+            return False
+
+        :param dict preset_properties: The export preset's properties
+            dictionary.
+
+        :returns: True to create all CutItems in bulk, False to create
+            them one at a time.
+        :rtype: bool
+        """
+        raise NotImplementedError
+
     def get_cut_thumbnail(self, cut, task_item, preset_properties):
         """
         Gets the path to a thumbnail image to use when updating the
@@ -52,6 +52,69 @@ class HieroUpdateShot(HookBaseClass):
         """
         raise NotImplementedError
 
+    def allow_bulk_filesystem_structure_creation(self, preset_properties):
+        """
+        Determines whether the filesystem structures of the exported
+        shots are created with a single call of
+        :meth:`create_filesystem_structures` per entity type, once all of
+        the shots have been updated, rather than one call of
+        :meth:`create_filesystem_structure` per shot. Creating them in
+        bulk avoids walking the schema and querying ShotGrid for each
+        shot. When bulk creation is allowed,
+        :meth:`create_filesystem_structure` is not called.
+
+        If this method returns False, or isn't implemented by the hook,
+        the filesystem structure of each shot is created through
+        :meth:`create_filesystem_structure` when it is updated. The
+        default hook only allows bulk creation when
+        :meth:`create_filesystem_structure` isn't overridden.
+
+        Example Implementation:
+
+        .. code-block:: python
+
+            # We override create_filesystem_structure to only create the
+            # structure of some of the shots, so we need it to be called for
+            # each one of them.
+            return False
+
+        :param dict preset_properties: The export preset's properties
+            dictionary.
+
+        :returns: True to create the filesystem structures in bulk,
+            False to create them one shot at a time.
+        :rtype: bool
+        """
+        raise NotImplementedError
+
+    def create_filesystem_structures(self, entity_type, entity_ids, preset_properties):
+        """
+        Handles creating the filesystem structure for all of the shots
+        of an entity type that were exported, in a single call. Only
+        called when :meth:`allow_bulk_filesystem_structure_creation`
+        returns True.
+
+        Example Implementation:
+
+        .. code-block:: python
+
+            # Check our custom property to know whether we should create the filesystem
+            # structure or not.
+            if preset_properties.get("custom_create_filesystem_property", True):
+                self.parent.sgtk.create_filesystem_structure(entity_type, entity_ids)
+            else:
+                self.parent.logger.debug("Not creating the filesystem structure!")
+
+        :param str entity_type: The entity type that was created or
+            updated as part of the export. Most likely this will be
+            "Shot".
+        :param list entity_ids: The ids of the entities that were
+            created or updated as part of the export.
+        :param dict preset_properties: The export preset's properties
+            dictionary.
+        """
+        raise NotImplementedError
+
     def update_shotgun_shot_entity(
         self, entity_type, entity_id, entity_data, preset_properties
     ):
@@ -71,12 +134,46 @@ class HieroUpdateShot(HookBaseClass):
             if not preset_properties.get("custom_update_cut_in_property", True):
                 del entity_data["sg_cut_in"]
 
-            self.parent.sgtk.shotgun.update(entity_type, entity_id, entity_data)
+            self.parent.shotgun.update(entity_type, entity_id, entity_data)
+
+        :param str entity_type: The entity type to update.
+        :param int entity_id: The id of the entity to update.
+        :param dict entity_data: The new data to update the entity with.
+        :param dict preset_properties: The export preset's properties
+            dictionary.
+        """
+        raise NotImplementedError
+
+    def update_shotgun_shot_entity_changes(
+        self, entity_type, entity_id, entity_data, changed_data, preset_properties
+    ):
+        """
+        Handles updating the Shot entity in Shotgun with the fields of the
+        new data whose values differ from the ones of the Shot, rather than
+        all of them. Called by the shot updater in place of
+        :meth:`update_shotgun_shot_entity` when implemented.
+
+        Example Implementation:
+
+        .. code-block:: python
+
+            # Only send the fields which changed since the last export, the
+            # Shot isn't updated when it's already up to date.
+            if changed_data:
+                self.parent.shotgun.update(entity_type, entity_id, changed_data)
+                return changed_data
+            return {}
 
         :param str entity_type: The entity type to update.
         :param int entity_id: The id of the entity to update.
         :param dict entity_data: The new data to update the entity with.
+        :param dict changed_data: The fields of the new data whose values
+            differ from the ones of the entity in Shotgun.
         :param dict preset_properties: The export preset's properties
             dictionary.
+        :returns: The data the Shot was updated with, empty if it wasn't.
+            When None is returned, the Shot is assumed to have been updated
+            with the changed data.
+        :rtype: dict
         """
         raise NotImplementedError
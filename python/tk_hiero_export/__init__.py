@@ -73,3 +73,6 @@ from .sg_audio_export import (
     ShotgunAudioExporter,
     ShotgunAudioPreset,
 )
+from .sg_instrumentation import InstrumentedConnection
+from .tracing import ExportTracer, trace_span
+from .hook_profiler import HookProfiler
@@ -10,8 +10,6 @@
 
 import os
 import sys
-import shutil
-import time
 import collections
 
 #TODO MB: Can we remove these unused imports?
@@ -25,16 +23,29 @@ import tank
 from tank.platform.qt import QtGui, QtCore
 
 from . import HieroCustomizeExportUI
+from .sg_batch import BatchPipeline
+from .connection_pool import ConnectionPool
+from .thumbnail_cache import ThumbnailCache
+from .custom_field_cache import CustomFieldCache
+from .compiled_preset import CompiledPreset
+from .helpers import ResolveHelpers
+from .upload_service import UploadService
 
 
 class ShotgunHieroObjectBase(object):
     """Base class to make the Hiero classes app aware."""
 
     _app = None
+    _connection_pool = None
+    _version_template = None
+    _tk_version_strings = {}
 
     @classmethod
     def setApp(cls, app):
         cls._app = app
+        cls._connection_pool = None
+        cls._version_template = None
+        cls._tk_version_strings = {}
 
     @property
     def app(self):
@@ -148,56 +159,277 @@ class ShotgunHieroObjectBase(object):
 
         return hook_widget
 
+    def resolvedExportPath(self):
+        """
+        Returns the resolved export path of this task. The path is resolved
+        once per task and item, from the resolved path table of the task's
+        submission, as the exporters ask for it over and over.
+        """
+        return ResolveHelpers.getResolvedPathTable(self).exportPath(
+            self, super(ShotgunHieroObjectBase, self).resolvedExportPath
+        )
+
     def _formatTkVersionString(self, hiero_version_str):
-        """Reformat the Hiero version string to the tk format."""
-        try:
-            version_number = int(hiero_version_str[1:])
-        except ValueError:
+        """
+        Reformat the Hiero version string to the tk format. The formatted
+        strings are memoized, the ``{tk_version}`` resolver asking for the
+        same few versions for every path it resolves.
+        """
+        cls = ShotgunHieroObjectBase
+        tk_version_str = cls._tk_version_strings.get(hiero_version_str)
+        if tk_version_str is not None:
+            return tk_version_str
+
+        version_str = hiero_version_str[1:]
+        if version_str.isdigit():
+            if cls._version_template is None:
+                cls._version_template = self.app.get_template("template_version")
+            tk_version_str = cls._version_template.apply_fields(
+                {"version": int(version_str)}
+            )
+        else:
             # Version is sometimes a glob expression (when building tracks for example)
             # in these cases, return the original string without the leading 'v'
-            return hiero_version_str[1:]
+            tk_version_str = version_str
 
-        version_template = self.app.get_template("template_version")
-        tk_version_str = version_template.apply_fields({"version": version_number})
+        cls._tk_version_strings[hiero_version_str] = tk_version_str
         return tk_version_str
 
-    def _upload_thumbnail_to_sg(self, sg_entity, thumb_qimage):
+    def _get_thumbnail(self, source, frame):
         """
-        Updates the thumbnail for an entity in Shotgun
+        Returns the thumbnail of a Hiero source at a given frame, scaled down
+        and encoded. Thumbnails are cached for the whole export, so tasks
+        asking for the same frame share a single copy.
+
+        :param source: The Hiero clip or sequence.
+        :param int frame: The frame of the thumbnail.
+
+        :returns: The encoded thumbnail.
+        :rtype: bytes
         """
-        import tempfile
-        import uuid
+        return self._get_thumbnail_cache().get(source, frame)
 
-        thumbdir = tempfile.mkdtemp(prefix="hiero_process_thumbnail_")
-        try:
-            path = "%s.png" % os.path.join(thumbdir, sg_entity.get("name", "thumbnail"))
-            # scale it down to 600px wide
-            thumb_qimage_scaled = thumb_qimage.scaledToWidth(
-                600, QtCore.Qt.SmoothTransformation
+    def _get_export_session(self):
+        """
+        Returns the :class:`ExportSession` this object was attached to by the
+        shot processor, or the one of the export being started, or None
+        outside of an export started by the shot processor.
+        """
+        session = getattr(self, "_export_session", None)
+        if session is None:
+            session = getattr(self.app, "export_session", None)
+        return session
+
+    def _attach_export_session(self, session):
+        """
+        Makes this task part of the given export session, which waits for it
+        to be done before finishing.
+
+        :param session: The :class:`ExportSession` of the export.
+        """
+        session.attach(self)
+        self._export_session = session
+
+    def _get_thumbnail_cache(self):
+        """
+        Returns the :class:`ThumbnailCache` of the current export, or the one
+        of this task outside of an export started by the shot processor.
+        """
+        session = self._get_export_session()
+        if session is not None:
+            return session.thumbnail_cache
+        if getattr(self, "_thumbnail_cache", None) is None:
+            self._thumbnail_cache = ThumbnailCache(
+                self.app.get_setting("thumbnail_format"),
+                self.app.get_setting("thumbnail_quality"),
             )
-            thumb_qimage_scaled.save(path)
-            self.app.log_debug(
-                "Uploading thumbnail for %s %s..."
-                % (sg_entity["type"], sg_entity["id"])
+        return self._thumbnail_cache
+
+    def _get_custom_field_cache(self):
+        """
+        Returns the :class:`CustomFieldCache` of the current export, or the
+        one of the app outside of an export started by the shot processor.
+        """
+        session = self._get_export_session()
+        if session is not None:
+            return session.custom_field_cache
+        if getattr(self.app, "custom_field_cache", None) is None:
+            fields = self.app.get_setting("custom_template_fields")
+            self.app.custom_field_cache = CustomFieldCache(
+                self.app.context.project, [ctf["keyword"] for ctf in fields]
             )
-            self.app.shotgun.upload_thumbnail(sg_entity["type"], sg_entity["id"], path)
+        return self.app.custom_field_cache
+
+    def _get_compiled_preset(self):
+        """
+        Returns the :class:`CompiledPreset` of the current export, shared
+        read-only by its tasks. Outside of an export started by the shot
+        processor, this object compiles its own from its preset.
+        """
+        session = self._get_export_session()
+        compiled_preset = session.compiled_preset if session is not None else None
+        if compiled_preset is None:
+            if getattr(self, "_compiled_preset", None) is None:
+                self._compiled_preset = CompiledPreset(
+                    self.app, self._preset.properties(), [self._preset]
+                )
+            compiled_preset = self._compiled_preset
+        return compiled_preset
+
+    def _upload_thumbnail_to_sg(self, sg_entity, thumbnail):
+        """
+        Updates the thumbnail for an entity in Shotgun. The thumbnail is either
+        encoded, as returned by :meth:`_get_thumbnail`, or a QImage which is
+        encoded in memory. Its upload is queued on the export's upload service.
+        """
+        try:
+            if isinstance(thumbnail, bytes):
+                self._get_upload_service().upload_thumbnail_data(
+                    sg_entity, thumbnail, self._get_thumbnail_cache().image_format
+                )
+            else:
+                self._get_upload_service().upload_thumbnail_image(sg_entity, thumbnail)
         except Exception as e:
             self.app.log_info(
                 "Thumbnail for %s %s (#%s) was not refreshed in ShotGrid: %s"
                 % (sg_entity["type"], sg_entity.get("name"), sg_entity["id"], e)
             )
-        finally:
-            # Sometimes Windows holds on to the temporary thumbnail file longer than expected which
-            # can cause an exception here. If we wait a second and try again, this usually solves
-            # the issue.
+
+    def _get_connection_pool(self):
+        """
+        Returns the :class:`ConnectionPool` providing SG connections to the
+        app's background work, one per thread.
+        """
+        cls = ShotgunHieroObjectBase
+        if cls._connection_pool is None:
+            cls._connection_pool = ConnectionPool(
+                self.app,
+                self.app.get_setting("sg_connection_pool_size"),
+                self.app.get_setting("sg_connection_keep_alive"),
+            )
+        return cls._connection_pool
+
+    def _get_upload_service(self):
+        """
+        Returns the :class:`UploadService` of the current export.
+
+        Outside of an export started by the shot processor, this task uploads
+        synchronously from the calling thread, through a service of its own
+        which is finished once the task is done.
+        """
+        session = self._get_export_session()
+        if session is not None:
+            return session.upload_service
+        if getattr(self, "_upload_service", None) is None:
+            self._upload_service = UploadService(
+                self.app, self._get_connection_pool(), worker_count=0
+            )
+        return self._upload_service
+
+    def _attach_batch_pipeline(self, pipeline):
+        """
+        Makes this task queue its SG writes into the given pipeline, which is
+        shared with the other tasks of the export.
+
+        :param pipeline: The :class:`BatchPipeline` to write into.
+        """
+        pipeline.retain()
+        self._batch_pipeline = pipeline
+        self._batch_pipeline_released = False
+
+    def _get_batch_pipeline(self):
+        """
+        Returns the :class:`BatchPipeline` this task queues its SG writes into.
+
+        Tasks that weren't attached to a pipeline by the shot processor get
+        their own, which is committed as soon as the task releases it.
+        """
+        if getattr(self, "_batch_pipeline", None) is None:
+            self._attach_batch_pipeline(BatchPipeline(self.app))
+        return self._batch_pipeline
+
+    def _release_batch_pipeline(self):
+        """
+        Signals that this task has queued all of its SG writes. The last task
+        of the shot to do so commits the pipeline, and the last task of the
+        export finishes its session. A task only releases the pipeline once,
+        however many times it's called.
+
+        Outside of an export, the task's own upload service is finished and
+        its thumbnail cache dropped once its writes have been committed.
+        """
+        pipeline = self._get_batch_pipeline()
+        if not self._batch_pipeline_released:
+            self._batch_pipeline_released = True
             try:
-                shutil.rmtree(thumbdir)
-            except Exception:
-                self.parent.log_error(
-                    "Error removing temporary thumbnail file, trying again."
-                )
-                time.sleep(1.0)
-                shutil.rmtree(thumbdir)
+                pipeline.release()
+            finally:
+                session = getattr(self, "_export_session", None)
+                if session is not None:
+                    session.task_done(self)
+                upload_service = getattr(self, "_upload_service", None)
+                if upload_service is not None:
+                    self._upload_service = None
+                    upload_service.finish()
+                self._thumbnail_cache = None
+
+    def forcedAbort(self):
+        """
+        Called when the task is cancelled. Releases the SG batch pipeline the
+        task was attached to, as its ``finishTask`` won't be called.
+        """
+        base = super(ShotgunHieroObjectBase, self)
+        if hasattr(base, "forcedAbort"):
+            base.forcedAbort()
+        if getattr(self, "_batch_pipeline", None) is not None:
+            self._release_batch_pipeline()
+
+    def _get_prefetch(self):
+        """
+        Returns the :class:`SGPrefetcher` started by the dialog of the current
+        export, or None if there is none.
+        """
+        session = self._get_export_session()
+        return session.prefetch if session is not None else None
+
+    def _get_current_user(self):
+        """Returns the current user's HumanUser entity."""
+        prefetch = self._get_prefetch()
+        user = prefetch.get_current_user() if prefetch else None
+        if user is None:
+            user = tank.util.get_current_user(self.app.tank)
+        return user
+
+    def _find_default_tasks(self, task_filter, entity):
+        """
+        Returns the Tasks of an entity matching the ``default_task_filter``
+        setting, from the prefetched data when available.
+
+        :param list task_filter: The parsed ``default_task_filter`` setting.
+        :param dict entity: The entity the Tasks are linked to.
+        """
+        prefetch = self._get_prefetch()
+        tasks = None
+        if prefetch and entity:
+            tasks = prefetch.get_default_tasks(entity)
+        if tasks is None:
+            task_filter = list(task_filter) + [["entity", "is", entity]]
+            tasks = self.app.shotgun.find("Task", task_filter)
+        return tasks
+
+    def _find_task_template(self, entity_type, code):
+        """
+        Returns the TaskTemplate with the given code, from the prefetched data
+        when available.
+        """
+        prefetch = self._get_prefetch()
+        template = prefetch.get_task_template(entity_type, code) if prefetch else None
+        if template is None:
+            template = self.app.shotgun.find_one(
+                "TaskTemplate",
+                [["entity_type", "is", entity_type], ["code", "is", code]],
+            )
+        return template
 
     def _cutsSupported(self):
         """Returns True if the site has Cut support, False otherwise."""
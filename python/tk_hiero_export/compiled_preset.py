@@ -0,0 +1,121 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import re
+import ast
+
+
+# Breaks down a toolkit write node specifier such as
+# 'Toolkit Node: Mono Dpx ("editorial")' into its name and output.
+TOOLKIT_WRITE_NODE_REGEX = re.compile(
+    r'^Toolkit Node: (?P<name>.+) \("(?P<output>.+)"\)'
+)
+
+# The number of channels of the audio channel layouts.
+AUDIO_CHANNELS = {
+    "mono": 1,
+    "stereo": 2,
+    "5.1 (L R C LFE Ls Rs)": 6,
+}
+
+# The number of channels of the other audio channel layouts.
+DEFAULT_AUDIO_CHANNELS = 8
+
+
+class CompiledPreset(object):
+    """
+    The settings and preset properties of an export, parsed and validated
+    once when the export starts and shared read-only by its tasks, rather
+    than parsed again by every task.
+    """
+
+    def __init__(self, app, shot_properties, item_presets=()):
+        """
+        :param app: The app.
+        :param dict shot_properties: The ``shotgunShotCreateProperties`` of
+            the shot processor preset.
+        :param list item_presets: The presets of the export template, whose
+            toolkit write nodes and audio settings are parsed upfront.
+        """
+        self._app = app
+
+        self.task_filter = None
+        setting = app.get_setting("default_task_filter", "[]")
+        try:
+            self.task_filter = tuple(ast.literal_eval(setting))
+        except (ValueError, SyntaxError, TypeError):
+            # the tasks continue without a task
+            app.log_error("Invalid value for 'default_task_filter': %s" % setting)
+
+        self.status_map = dict(shot_properties.get("sg_status_hiero_tags", []))
+        self.task_template_map = dict(shot_properties.get("task_template_map", []))
+
+        self._toolkit_write_nodes = {}
+        self._audio_settings = {}
+        for preset in item_presets:
+            properties = preset.properties()
+            for specifier in properties.get("toolkitWriteNodes", []):
+                self.toolkit_write_node(specifier)
+            if "bitDepth" in properties:
+                try:
+                    self.audio_settings(properties)
+                except (KeyError, IndexError, AttributeError):
+                    # reported by the audio task when it needs the settings
+                    pass
+
+    def find_tag_value(self, tag_map, item):
+        """
+        Returns the value of the first tag of an item found in a map, ie. the
+        ``status_map``, or None.
+        """
+        for tag in item.tags():
+            if tag.name() in tag_map:
+                return tag_map[tag.name()]
+        return None
+
+    def toolkit_write_node(self, specifier):
+        """
+        Returns the metadata of a toolkit write node specifier, a dictionary
+        with its ``name`` and ``output``, or None if the specifier is invalid.
+        """
+        if specifier not in self._toolkit_write_nodes:
+            match = TOOLKIT_WRITE_NODE_REGEX.match(specifier)
+            if match is None:
+                self._app.log_warning(
+                    "Invalid toolkit write node specifier: %s" % specifier
+                )
+            self._toolkit_write_nodes[specifier] = match and match.groupdict()
+        return self._toolkit_write_nodes[specifier]
+
+    def audio_settings(self, properties):
+        """
+        Returns the audio settings of an audio preset's properties, as the
+        ``(numChannels, sampleRate, bitDepth, bitRate)`` integers passed to
+        ``writeAudioToFile``.
+        """
+        key = tuple(
+            properties[name]
+            for name in ("numChannels", "sampleRate", "bitDepth", "bitRate")
+        )
+        settings = self._audio_settings.get(key)
+        if settings is None:
+            (channels, sample_rate, bit_depth, bit_rate) = key
+            settings = self._audio_settings[key] = (
+                AUDIO_CHANNELS.get(channels, DEFAULT_AUDIO_CHANNELS),
+                _first_number(sample_rate),
+                _first_number(bit_depth),
+                _first_number(bit_rate),
+            )
+        return settings
+
+
+def _first_number(value):
+    """Returns the first whole number of a string such as '48000 Hz'."""
+    return [int(s) for s in value.split() if s.isdigit()][0]
@@ -0,0 +1,232 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import time
+import threading
+import contextlib
+
+import sgtk
+
+from .sg_instrumentation import InstrumentedConnection
+
+
+# The maximum number of connections opened by a pool.
+DEFAULT_MAX_CONNECTIONS = 8
+
+# The number of seconds an idle connection is kept open for.
+DEFAULT_KEEP_ALIVE = 300
+
+
+class PooledConnection(object):
+    """
+    A ShotGrid connection handed out by the :class:`ConnectionPool`. It
+    behaves as the connection it wraps and counts the requests made through
+    it.
+    """
+
+    def __init__(self, sg):
+        self._sg = sg
+        self.created = time.time()
+        self.last_used = self.created
+        self.thread_name = None
+        self.requests = 0
+        self.request_time = 0.0
+
+    def __getattr__(self, name):
+        attr = getattr(self._sg, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            start = time.time()
+            try:
+                return attr(*args, **kwargs)
+            finally:
+                self.requests += 1
+                self.request_time += time.time() - start
+
+        return call
+
+    def close(self):
+        """Closes the underlying connection."""
+        try:
+            self._sg.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool(object):
+    """
+    Pool of ShotGrid connections for the app's background work, as a single
+    connection can't be used from several threads at once.
+
+    Each thread gets its own connection, which it gets back every time it
+    asks for one as long as it's still open. No more than ``max_connections``
+    are opened at once, threads waiting for a connection to be released
+    once the cap is reached. Idle connections are closed once they haven't
+    been used for ``keep_alive`` seconds.
+    """
+
+    def __init__(
+        self,
+        app,
+        max_connections=DEFAULT_MAX_CONNECTIONS,
+        keep_alive=DEFAULT_KEEP_ALIVE,
+    ):
+        self._app = app
+        self._max_connections = max(max_connections, 1)
+        self._keep_alive = keep_alive
+        self._condition = threading.Condition()
+        self._connections = []
+        self._idle = []
+        # the number of connections being opened, outside of the condition
+        self._opening = 0
+        # thread ident -> [connection, number of nested acquisitions]
+        self._in_use = {}
+
+    @contextlib.contextmanager
+    def connection(self):
+        """
+        Context manager providing the connection of the calling thread::
+
+            with pool.connection() as sg:
+                sg.find(...)
+
+        Nested uses from the same thread share the same connection. During an
+        export, the requests are recorded as they are for the app's connection.
+        """
+        connection = self._acquire()
+        try:
+            session = getattr(self._app, "export_session", None)
+            recorder = session.sg_recorder if session is not None else None
+            if recorder is not None:
+                yield InstrumentedConnection(connection, recorder)
+            else:
+                yield connection
+        finally:
+            self._release(connection)
+
+    def stats(self):
+        """
+        Returns the request statistics of the open connections.
+
+        :returns: A list of dictionaries with the ``thread`` that last used the
+            connection, its number of ``requests``, the ``request_time``
+            spent on them and its ``age`` in seconds.
+        :rtype: list
+        """
+        now = time.time()
+        with self._condition:
+            return [
+                {
+                    "thread": c.thread_name,
+                    "requests": c.requests,
+                    "request_time": c.request_time,
+                    "age": now - c.created,
+                }
+                for c in self._connections
+            ]
+
+    def close(self):
+        """Closes the idle connections."""
+        with self._condition:
+            (idle, self._idle) = (self._idle, [])
+            for connection in idle:
+                self._connections.remove(connection)
+        for connection in idle:
+            connection.close()
+
+    def _acquire(self):
+        """Returns the connection of the calling thread, waiting for one if needed."""
+        thread = threading.current_thread()
+        with self._condition:
+            held = self._in_use.get(thread.ident)
+            if held is not None:
+                held[1] += 1
+                return held[0]
+
+            while True:
+                self._expire_idle()
+
+                connection = self._pick_idle(thread.name)
+                if connection is not None:
+                    return self._hold(connection, thread)
+
+                if len(self._connections) + self._opening < self._max_connections:
+                    # reserve the slot, the connection is opened without
+                    # holding the condition so that other threads aren't
+                    # blocked meanwhile
+                    self._opening += 1
+                    break
+
+                self._condition.wait()
+
+        try:
+            connection = PooledConnection(sgtk.util.shotgun.create_sg_connection())
+        except Exception:
+            with self._condition:
+                self._opening -= 1
+                self._condition.notify()
+            raise
+
+        with self._condition:
+            self._opening -= 1
+            self._connections.append(connection)
+            self._app.log_debug(
+                "Opened SG connection %d of %d for thread %s."
+                % (len(self._connections), self._max_connections, thread.name)
+            )
+            return self._hold(connection, thread)
+
+    def _hold(self, connection, thread):
+        """
+        Hands a connection out to a thread. Called with the condition held.
+        """
+        connection.thread_name = thread.name
+        self._in_use[thread.ident] = [connection, 1]
+        return connection
+
+    def _release(self, connection):
+        """Returns a connection to the pool once its thread is done with it."""
+        thread = threading.current_thread()
+        with self._condition:
+            held = self._in_use[thread.ident]
+            held[1] -= 1
+            if held[1]:
+                return
+
+            del self._in_use[thread.ident]
+            connection.last_used = time.time()
+            self._idle.append(connection)
+            self._condition.notify()
+
+    def _pick_idle(self, thread_name):
+        """
+        Takes an idle connection, preferring the one last used by the given
+        thread. Called with the condition held.
+        """
+        if not self._idle:
+            return None
+        for connection in self._idle:
+            if connection.thread_name == thread_name:
+                break
+        else:
+            connection = self._idle[0]
+        self._idle.remove(connection)
+        return connection
+
+    def _expire_idle(self):
+        """Closes the connections idle for too long. Called with the condition held."""
+        now = time.time()
+        expired = [c for c in self._idle if now - c.last_used > self._keep_alive]
+        for connection in expired:
+            self._idle.remove(connection)
+            self._connections.remove(connection)
+            connection.close()
@@ -0,0 +1,156 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import threading
+import collections
+
+
+# The maximum number of Shots held by a cache.
+DEFAULT_MAX_SHOTS = 10000
+
+# The field the Sequence code of the prefetched Shots is read from.
+SEQUENCE_CODE_FIELD = "sg_sequence.Sequence.code"
+
+
+class CustomFieldCache(object):
+    """
+    Least recently used cache of the ``custom_template_fields`` of the Shots
+    of an export, keyed by project, sequence name and shot name.
+
+    The fields of all of the Shots of an export are fetched in a single
+    query before its tasks are created. Each entry also holds the values the
+    ``{custom}`` resolvers resolved for the tasks of the Shot, so that each
+    task only runs the ``hook_resolve_custom_strings`` hook once per keyword,
+    however many times its paths are resolved.
+    """
+
+    def __init__(self, project, fields, max_shots=DEFAULT_MAX_SHOTS):
+        """
+        :param dict project: The Project of the export.
+        :param list fields: The ``custom_template_fields`` keywords.
+        :param int max_shots: The maximum number of Shots held.
+        """
+        self._project_id = project["id"] if project else None
+        self._fields = list(fields)
+        self._max_shots = max_shots
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def prefetch(self, sg, track_items):
+        """
+        Fetches the fields of the Shots of the given track items, in a single
+        query. Shots which don't exist yet are left to the resolve hook.
+
+        :param sg: The SG connection to query.
+        :param list track_items: The hiero.core.TrackItems being exported.
+
+        :returns: The number of Shots fetched.
+        """
+        if not self._fields or not track_items:
+            return 0
+
+        keys = set(self._key(item) for item in track_items)
+        shots = sg.find(
+            "Shot",
+            [
+                ["project", "is", {"type": "Project", "id": self._project_id}],
+                ["code", "in", sorted(set(k[2] for k in keys))],
+                [SEQUENCE_CODE_FIELD, "in", sorted(set(k[1] for k in keys))],
+            ],
+            fields=["code", SEQUENCE_CODE_FIELD] + self._fields,
+        )
+
+        count = 0
+        for shot in shots:
+            key = (self._project_id, shot[SEQUENCE_CODE_FIELD], shot["code"])
+            if key in keys:
+                # only keep the requested fields, as the get_shot hook would
+                self._add(
+                    key, dict((k, shot[k]) for k in ["type", "id"] + self._fields)
+                )
+                count += 1
+        return count
+
+    def get_shot(self, item):
+        """
+        :param item: The hiero.core.TrackItem of the Shot.
+        :returns: A copy of the Shot with its custom fields, or None if it
+            isn't cached.
+        """
+        with self._lock:
+            entry = self._get(self._key(item))
+            if entry is None or entry["shot"] is None:
+                return None
+            return dict(entry["shot"])
+
+    def add_shot(self, item, shot):
+        """
+        Caches the Shot of an item, with its custom fields.
+
+        :param item: The hiero.core.TrackItem of the Shot.
+        :param dict shot: The Shot.
+        """
+        self._add(self._key(item), dict(shot))
+
+    def resolve(self, keyword, task, resolve):
+        """
+        Returns the value of a ``{custom}`` keyword for a task, resolving it
+        with ``resolve`` the first time only.
+
+        :param str keyword: The keyword, ie. ``{code}``.
+        :param task: The export task.
+        :param resolve: A callable returning the value of the keyword.
+        """
+        key = self._key(task._item)
+        # the item and export path of a task identify it, unlike its id()
+        # which may be reused once the task is garbage collected
+        value_key = (task._item.guid(), task._exportPath, keyword)
+        with self._lock:
+            entry = self._get(key)
+            if entry is not None and value_key in entry["values"]:
+                self.hits += 1
+                return entry["values"][value_key]
+            self.misses += 1
+
+        value = resolve()
+
+        with self._lock:
+            entry = self._get(key)
+            if entry is None:
+                entry = self._insert(key, None)
+            entry["values"][value_key] = value
+        return value
+
+    def _key(self, item):
+        return (self._project_id, item.parentSequence().name(), item.name())
+
+    def _get(self, key):
+        """Returns the entry of a key, as the most recently used one."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._entries[key] = entry
+        return entry
+
+    def _add(self, key, shot):
+        with self._lock:
+            entry = self._get(key)
+            if entry is None:
+                self._insert(key, shot)
+            else:
+                entry["shot"] = shot
+
+    def _insert(self, key, shot):
+        entry = {"shot": shot, "values": {}}
+        self._entries[key] = entry
+        while len(self._entries) > self._max_shots:
+            self._entries.popitem(last=False)
+        return entry
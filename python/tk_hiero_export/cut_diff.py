@@ -0,0 +1,182 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+
+# The fields of a Cut compared with the previous revision.
+CUT_FIELDS = (
+    "duration",
+    "fps",
+    "sg_cut_type",
+    "timecode_start_text",
+    "timecode_end_text",
+)
+
+# The fields of a CutItem compared with the previous revision.
+CUT_ITEM_FIELDS = (
+    "code",
+    "cut_order",
+    "cut_item_in",
+    "cut_item_out",
+    "cut_item_duration",
+    "edit_in",
+    "edit_out",
+    "timecode_cut_item_in_text",
+    "timecode_cut_item_out_text",
+    "timecode_edit_in_text",
+    "timecode_edit_out_text",
+)
+
+
+class CutDiff(object):
+    """
+    The differences between the cut of an export and the latest revision of
+    the Cut in SG, so that the revision is updated with the changes only
+    rather than a new revision created with all of its CutItems.
+
+    The CutItems are matched by their Shot, in cut order when a Shot appears
+    more than once in the cut. A matched CutItem whose fields differ is
+    changed and the exported ones without a match are added.
+
+    A previous CutItem without a match is only removed when its Shot is no
+    longer in the edit, as it is otherwise only missing from the export, ie.
+    when a selection of the sequence is exported. Removed CutItems are only
+    retired when asked to, and left untouched otherwise, so that the history
+    of the revision is kept.
+    """
+
+    def __init__(
+        self,
+        previous_cut,
+        previous_items,
+        cut_data,
+        cut_item_data_list,
+        shot_names,
+        retire_removed=False,
+    ):
+        """
+        :param dict previous_cut: The previous Cut, with the ``CUT_FIELDS``.
+        :param list previous_items: The CutItems of the previous Cut, with
+            their ``shot``, its ``shot.Shot.code`` and the ``CUT_ITEM_FIELDS``.
+        :param dict cut_data: The data of the exported Cut.
+        :param list cut_item_data_list: The data of the exported CutItems.
+        :param shot_names: The names of the Shots of the edit, exported or
+            not.
+        :param bool retire_removed: Whether the removed CutItems are retired.
+        """
+        self.retire_removed = retire_removed
+        self.cut = {"type": "Cut", "id": previous_cut["id"]}
+        self.cut_changes = dict(
+            (field, cut_data[field])
+            for field in CUT_FIELDS
+            if field in cut_data and cut_data[field] != previous_cut.get(field)
+        )
+
+        previous_by_shot = {}
+        for item in sorted(previous_items, key=lambda i: i.get("cut_order") or 0):
+            previous_by_shot.setdefault(_shot_id(item), []).append(item)
+
+        # (cut item data, previous CutItem, changed fields) tuples
+        self.matched = []
+        self.added = []
+        for cut_item_data in cut_item_data_list:
+            candidates = previous_by_shot.get(_shot_id(cut_item_data))
+            if not candidates:
+                self.added.append(cut_item_data)
+                continue
+            previous_item = candidates.pop(0)
+            changes = dict(
+                (field, cut_item_data[field])
+                for field in CUT_ITEM_FIELDS
+                if cut_item_data.get(field) != previous_item.get(field)
+            )
+            self.matched.append((cut_item_data, previous_item, changes))
+
+        # the previous CutItems without a match, removed when their shot is
+        # known not to be in the edit anymore
+        self.removed = []
+        self.unexported = []
+        for item in [item for items in previous_by_shot.values() for item in items]:
+            shot_name = item.get("shot.Shot.code")
+            if shot_name is not None and shot_name not in shot_names:
+                self.removed.append(item)
+            else:
+                self.unexported.append(item)
+
+    @property
+    def changed(self):
+        """The matched CutItems whose fields differ."""
+        return [
+            (data, item, changes) for (data, item, changes) in self.matched if changes
+        ]
+
+    @property
+    def retired(self):
+        """The removed CutItems to retire."""
+        return self.removed if self.retire_removed else []
+
+    def is_empty(self):
+        """Returns True if there is nothing to write to the previous revision."""
+        return not (self.cut_changes or self.added or self.changed or self.retired)
+
+    def requests(self):
+        """
+        Returns the batch requests updating the Cut and its changed CutItems,
+        and retiring the removed ones when asked to. The added CutItems are
+        left to create.
+        """
+        requests = []
+        if self.cut_changes:
+            requests.append(
+                {
+                    "request_type": "update",
+                    "entity_type": "Cut",
+                    "entity_id": self.cut["id"],
+                    "data": self.cut_changes,
+                }
+            )
+        for (cut_item_data, previous_item, changes) in self.changed:
+            requests.append(
+                {
+                    "request_type": "update",
+                    "entity_type": "CutItem",
+                    "entity_id": previous_item["id"],
+                    "data": changes,
+                }
+            )
+        for previous_item in self.retired:
+            requests.append(
+                {
+                    "request_type": "delete",
+                    "entity_type": "CutItem",
+                    "entity_id": previous_item["id"],
+                }
+            )
+        return requests
+
+    def summary(self):
+        """Returns a one line summary of the differences."""
+        changed = len(self.changed)
+        return (
+            "%d added, %d changed, %d removed (%d retired), %d unchanged, "
+            "%d not exported CutItem(s)"
+            % (
+                len(self.added),
+                changed,
+                len(self.removed),
+                len(self.retired),
+                len(self.matched) - changed,
+                len(self.unexported),
+            )
+        )
+
+
+def _shot_id(cut_item):
+    shot = cut_item.get("shot")
+    return shot["id"] if shot else None
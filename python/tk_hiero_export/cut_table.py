@@ -0,0 +1,160 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+
+# The columns of a row of the table, as returned by CutTable.row().
+ROW_COLUMNS = (
+    "cut_item_in",
+    "cut_item_out",
+    "cut_item_duration",
+    "edit_in",
+    "edit_out",
+    "edit_duration",
+    "head_in",
+    "tail_out",
+    "working_duration",
+)
+
+
+class CutTable(object):
+    """
+    The cut data of the shot updater tasks of an export, computed for all of
+    them at once: the values correspond to the exported versions created on
+    disk.
+
+    The Hiero objects are read in a single pass over the tasks, into a column
+    per value. The derived values are then computed a column at a time, and
+    each task reads its row from the table rather than computing it again.
+    """
+
+    def __init__(self, app, tasks):
+        """
+        :param app: The app.
+        :param list tasks: The :class:`ShotgunShotUpdater` tasks.
+        """
+        self._rows = dict(
+            (self._key(task), index) for (index, task) in enumerate(tasks)
+        )
+
+        # the single pass over the Hiero objects
+        head_in = []
+        tail_out = []
+        source_in = []
+        source_out = []
+        handles = []
+        start_frame = []
+        timeline_in = []
+        timeline_out = []
+        timecode_start = []
+        nuke_backend = []
+        cut_length = []
+        head_room_offset = []
+        for task in tasks:
+            (task_head_in, task_tail_out) = task.collatedOutputRange(
+                clampToSource=False
+            )
+            head_in.append(task_head_in)
+            tail_out.append(task_tail_out)
+            # these are the source in/out frames. we'll use them to determine if
+            # we have enough frames to account for the handles.
+            source_in.append(int(task._item.sourceIn()))
+            source_out.append(int(task._item.sourceOut()))
+            handles.append(task._cutHandles if task._cutHandles is not None else 0)
+            # the frame offset specified in the export options
+            start_frame.append(task._startFrame or 0)
+            timeline_in.append(task._item.timelineIn())
+            timeline_out.append(task._item.timelineOut())
+            timecode_start.append(task._item.sequence().timecodeStart())
+            nuke_backend.append(task._has_nuke_backend())
+            cut_length.append(task.is_cut_length_export())
+            # the offset automatically added when collating, only in older
+            # versions of hiero
+            head_room_offset.append(
+                task.HEAD_ROOM_OFFSET
+                if not nuke_backend[-1] and task.isCollated()
+                else 0
+            )
+
+        # newer versions of the hiero/nukestudio don't write black frames for
+        # the head when there's not enough source for the in handle, the in
+        # handle is then limited by the source in. even new versions write
+        # black frames for insufficient tail handles, so the out handle is
+        # always the full handles.
+        in_handle = [
+            min(s, h) if nb else h
+            for (s, h, nb) in zip(source_in, handles, nuke_backend)
+        ]
+
+        # for a cut length export the cut is within the handles of the exported
+        # range. otherwise the full source is exported, from the start frame.
+        cut_in = [
+            (hi + ih) if cl else (si + sf)
+            for (hi, ih, si, sf, cl) in zip(
+                head_in, in_handle, source_in, start_frame, cut_length
+            )
+        ]
+        cut_out = [
+            (to - h) if cl else (so + sf)
+            for (to, h, so, sf, cl) in zip(
+                tail_out, handles, source_out, start_frame, cut_length
+            )
+        ]
+
+        # the edit in/out points from the timeline, accounting for the custom
+        # start code of the hiero timeline
+        edit_in = [t + tc for (t, tc) in zip(timeline_in, timecode_start)]
+        edit_out = [t + tc for (t, tc) in zip(timeline_out, timecode_start)]
+
+        cut_duration = [o - i + 1 for (i, o) in zip(cut_in, cut_out)]
+        edit_duration = [o - i + 1 for (i, o) in zip(edit_in, edit_out)]
+        working_duration = [o - i + 1 for (i, o) in zip(head_in, tail_out)]
+        self.retimed = [c != e for (c, e) in zip(cut_duration, edit_duration)]
+
+        self._columns = {
+            "cut_item_in": cut_in,
+            "cut_item_out": cut_out,
+            "cut_item_duration": cut_duration,
+            "edit_in": edit_in,
+            "edit_out": edit_out,
+            "edit_duration": edit_duration,
+            "head_in": [h - o for (h, o) in zip(head_in, head_room_offset)],
+            "tail_out": [t - o for (t, o) in zip(tail_out, head_room_offset)],
+            "working_duration": working_duration,
+        }
+
+        for (task, retimed) in zip(tasks, self.retimed):
+            if retimed:
+                app.log_warning(
+                    "It looks like the shot %s has a retime applied. SG cuts do "
+                    "not support retimes." % (task.clipName(),)
+                )
+
+    def __len__(self):
+        return len(self._rows)
+
+    def column(self, name):
+        """Returns the list of the values of a column, one per task."""
+        return self._columns[name]
+
+    def row(self, task):
+        """
+        Returns the cut data of a task as a new dictionary of the
+        ``ROW_COLUMNS``, or None if the task isn't in the table.
+        """
+        index = self._rows.get(self._key(task))
+        if index is None:
+            return None
+        return dict((name, self._columns[name][index]) for name in ROW_COLUMNS)
+
+    @staticmethod
+    def _key(task):
+        # the item and export path of a task identify it, unlike its id()
+        # which may be reused once the task is garbage collected
+        return (task._item.guid(), task._exportPath)
@@ -0,0 +1,211 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import os
+import time
+import threading
+
+from .sg_batch import BatchPipeline
+from .tracing import ExportTracer
+from .hook_profiler import HookProfiler
+from .sg_instrumentation import SGRequestRecorder
+from .upload_service import UploadService
+from .thumbnail_cache import ThumbnailCache
+from .custom_field_cache import CustomFieldCache
+
+
+class ExportSession(object):
+    """
+    The state of an export started by the shot processor, shared by its
+    tasks: the SG batch pipelines of its shots, its upload service and
+    caches, and the recorder, profiler and tracer measuring it.
+
+    The session is the app's ``export_session`` while the export runs. It is
+    finished once every task attached to it is done, whether it succeeded,
+    failed or was cancelled, or by the next export when some of its tasks
+    never finished.
+    """
+
+    def __init__(self, app, connection_pool, prefetch=None):
+        """
+        :param app: The app.
+        :param connection_pool: The app's :class:`ConnectionPool`.
+        :param prefetch: The :class:`SGPrefetcher` started by the export
+            dialog, if any.
+        """
+        self._app = app
+        self.connection_pool = connection_pool
+        self.prefetch = prefetch
+
+        # set by the shot processor once the preset of the export is known
+        self.compiled_preset = None
+        self.shot_update_counts = {"full": 0, "partial": 0, "skipped": 0}
+
+        self.hook_profiler = HookProfiler(app)
+        self.tracer = None
+        if app.get_setting("export_trace_folder"):
+            self.tracer = ExportTracer()
+        self.sg_recorder = SGRequestRecorder(
+            app, app.get_setting("sg_request_budget_per_shot"), self.tracer
+        )
+
+        fields = app.get_setting("custom_template_fields")
+        self.custom_field_cache = CustomFieldCache(
+            app.context.project, [ctf["keyword"] for ctf in fields]
+        )
+        self.thumbnail_cache = ThumbnailCache(
+            app.get_setting("thumbnail_format"), app.get_setting("thumbnail_quality")
+        )
+        self.upload_service = UploadService(
+            app, connection_pool, app.get_setting("upload_worker_count")
+        )
+        self.wait_for_uploads = app.get_setting("wait_for_uploads")
+
+        self._pipelines = []
+        self._finish_callbacks = []
+        self._tasks = set()
+        self._lock = threading.Lock()
+        self.finished = False
+
+    def new_pipeline(self):
+        """
+        Returns a new :class:`BatchPipeline` for the tasks of a shot, which is
+        finished along with the session.
+        """
+        pipeline = BatchPipeline(self._app)
+        with self._lock:
+            self._pipelines.append(pipeline)
+        return pipeline
+
+    def attach(self, task):
+        """Registers a task the session waits for before finishing."""
+        with self._lock:
+            self._tasks.add(task)
+
+    def task_done(self, task):
+        """
+        Signals that a task is done, having succeeded, failed or been
+        cancelled. The session is finished once all of its tasks are done.
+        """
+        with self._lock:
+            self._tasks.discard(task)
+            done = not self._tasks
+        if done:
+            self.finish()
+
+    def add_finish_callback(self, callback):
+        """
+        Registers a callable to call, without arguments, once the SG writes
+        of the export have been committed, as the session is finished.
+        """
+        self._finish_callbacks.append(callback)
+
+    def finish(self):
+        """
+        Finishes the export: commits the SG writes left in its pipelines,
+        waits for its uploads if asked to, reports on it and detaches the
+        session from the app. Does nothing once the session is finished.
+        """
+        with self._lock:
+            if self.finished:
+                return
+            self.finished = True
+            unfinished = len(self._tasks)
+            self._tasks.clear()
+            pipelines = list(self._pipelines)
+
+        if unfinished:
+            self._app.log_warning(
+                "Finishing an export with %d unfinished task(s)." % unfinished
+            )
+
+        try:
+            for pipeline in pipelines:
+                pipeline.finish()
+            for callback in self._finish_callbacks:
+                try:
+                    callback()
+                except Exception:
+                    self._app.logger.exception("Post export step failed")
+            self._report()
+        finally:
+            if getattr(self._app, "export_session", None) is self:
+                self._app.export_session = None
+
+    def _report(self):
+        """Reports on the finished export and saves its profile and trace."""
+        self._app.log_info(
+            "Shot updates: %(full)d full, %(partial)d partial, %(skipped)d "
+            "skipped as up to date." % self.shot_update_counts
+        )
+        self._app.log_debug(
+            "Thumbnail cache: %d hit(s), %d miss(es)."
+            % (self.thumbnail_cache.hits, self.thumbnail_cache.misses)
+        )
+        self.thumbnail_cache.clear()
+        self._app.log_debug(
+            "Custom resolvers: %d hit(s), %d miss(es)."
+            % (self.custom_field_cache.hits, self.custom_field_cache.misses)
+        )
+
+        self.upload_service.finish(self.wait_for_uploads)
+        # the uploads are done, so are the requests made by this export
+        self.sg_recorder.report(self._app.shot_count)
+
+        for stats in self.connection_pool.stats():
+            self._app.log_debug(
+                "SG connection of %(thread)s: %(requests)d request(s) in "
+                "%(request_time).2fs, open for %(age).0fs." % stats
+            )
+        # the connections still used by background uploads are closed once
+        # idle for too long, or at the end of the next export
+        self.connection_pool.close()
+
+        self.hook_profiler.report()
+        if self._app.get_setting("hook_profile_folder"):
+            self._save_file(
+                "hook_profile_folder",
+                "hooks",
+                self.hook_profiler.started,
+                self.hook_profiler.save,
+            )
+
+        if self.tracer is not None:
+            self._save_file(
+                "export_trace_folder", "trace", self.tracer.started, self.tracer.save
+            )
+
+    def _save_file(self, setting, kind, started, save):
+        """
+        Saves a file about the export in the folder of a setting, named after
+        its kind and the time of the export.
+
+        :param str setting: The setting holding the folder.
+        :param str kind: The kind of file, ie. ``trace``.
+        :param float started: The time the export started at.
+        :param save: A callable writing the file to the path it's given.
+        """
+        path = os.path.join(
+            self._app.get_setting(setting),
+            "tk-hiero-export_%s_%s_%d.json"
+            % (
+                kind,
+                time.strftime("%Y%m%d_%H%M%S", time.localtime(started)),
+                os.getpid(),
+            ),
+        )
+        try:
+            save(path)
+        except Exception as e:
+            self._app.log_warning(
+                "Unable to save the export %s to %s: %s" % (kind, path, e)
+            )
+        else:
+            self._app.log_info("Saved the export %s to %s" % (kind, path))
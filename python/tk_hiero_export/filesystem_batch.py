@@ -0,0 +1,84 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import threading
+import collections
+
+from . import HieroUpdateShot
+
+
+class FilesystemStructureBatch(object):
+    """
+    Collects the entities updated by the shot updater tasks of an export,
+    and creates their filesystem structure with a single call of the
+    ``create_filesystem_structures`` method of the ``hook_update_shot`` hook
+    per entity type, rather than one call per entity.
+
+    The structures are created once all of the shot updater tasks are done,
+    whether or not they succeeded, ie. at the end of the update pass, or
+    when :meth:`flush` is called by a task which needs them before that.
+    """
+
+    def __init__(self, app, preset_properties, expected=None):
+        """
+        :param app: The app.
+        :param dict preset_properties: The export preset's properties.
+        :param int expected: The number of shot updater tasks of the update
+            pass.
+        """
+        self._app = app
+        self._preset_properties = preset_properties
+        self.expected = expected
+        self._done = set()
+        self._pending = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def add(self, entity_type, entity_id):
+        """
+        Adds an entity whose filesystem structure is to be created.
+        """
+        with self._lock:
+            ids = self._pending.setdefault(entity_type, [])
+            if entity_id not in ids:
+                ids.append(entity_id)
+
+    def task_done(self, task):
+        """
+        Signals that a shot updater task is done, having added its entity or
+        not. The structures are created once the expected number of tasks are
+        done.
+        """
+        with self._lock:
+            self._done.add((task._item.guid(), task._exportPath))
+            complete = self.expected is not None and len(self._done) >= self.expected
+        if complete:
+            self.flush()
+
+    def flush(self):
+        """Creates the filesystem structure of the entities added so far."""
+        with self._lock:
+            pending = self._pending
+            self._pending = collections.OrderedDict()
+
+        for (entity_type, entity_ids) in pending.items():
+            self._app.log_debug(
+                "Creating file system structure for %d %s(s)..."
+                % (len(entity_ids), entity_type)
+            )
+            self._app.execute_hook_method(
+                "hook_update_shot",
+                "create_filesystem_structures",
+                entity_type=entity_type,
+                entity_ids=entity_ids,
+                preset_properties=self._preset_properties,
+                base_class=HieroUpdateShot,
+            )
+            self.calls += 1
@@ -1,16 +1,76 @@
+# placeholder the {track} token resolves to in the per track path templates,
+# replaced with the name of the track of each item afterwards
+TRACK_PLACEHOLDER = "TKHIEROEXPORTTRACKPLACEHOLDER"
+
+
+class ResolvedPathTable(object):
+    """
+    Resolved export paths of the tasks of a submission.
+
+    Each task's export path is resolved once, however many times the task
+    and the Hiero exporters ask for it. The paths of the items collated with
+    a task only differ by their {track}, so the path is resolved once with a
+    placeholder for it and each item's track name is substituted in.
+    """
+
+    def __init__(self):
+        self._paths = {}
+
+    def exportPath(self, task, resolve):
+        """
+        Returns the resolved export path of a task, calling resolve the first
+        time only.
+        """
+        key = (task._exportPath, task._item.guid())
+        path = self._paths.get(key)
+        if path is None:
+            path = self._paths[key] = resolve()
+        return path
+
+    def trackItemPath(self, task, trackItem):
+        """
+        Returns the export path of a task resolved for a track item, ie. with
+        the {track} of the item.
+        """
+        key = (task._exportPath, task._item.guid(), "{track}")
+        template = self._paths.get(key)
+        if template is None:
+            resolver = task._resolver.duplicate()
+            resolver.addResolver(
+                "{track}",
+                "replaces track token with track name, filling spaces with underscores",
+                TRACK_PLACEHOLDER,
+            )
+            template = resolver.resolve(task, task._exportPath, isPath=True)
+            self._paths[key] = template
+        return template.replace(
+            TRACK_PLACEHOLDER, trackItem.parentTrack().name().replace(" ", "_")
+        )
+
+
+def getResolvedPathTable(shotTaskInstance):
+    # the table lives on the submission, so that it's shared by all of the
+    # tasks of an export and goes away with it
+    submission = getattr(shotTaskInstance, "_submission", None)
+    table = getattr(submission, "_tkResolvedPathTable", None)
+    if table is None:
+        table = ResolvedPathTable()
+        try:
+            submission._tkResolvedPathTable = table
+        except AttributeError:
+            # no submission to share the table with, keep it on the task
+            table = shotTaskInstance.__dict__.setdefault("_tkResolvedPathTable", table)
+    return table
+
+
 def getResolvedPathForTrackItem(shotTaskInstance, trackItem):
-    # todo - determine resolved export path for the passed in item
-    # we can use Hiero's resolvers to do this.
-    # there's likely a way we can easily spawn a task here to use with FnResolveTable.resolve
-    # but I don't have time to figure that out right now.
-    # instead I'll duplicate the current resolve table, and override the values
-    # that actually change between the items we'll pass into this function.
-    # right now, that's just {track}
-    resolver = shotTaskInstance._resolver
-    resolverDuplicate = resolver.duplicate()
-    resolverDuplicate.addResolver("{track}", "replaces track token with track name, filling spaces with underscores", trackItem.parentTrack().name().replace(" ", "_"))
-    thisItemResolvedExportPath = resolverDuplicate.resolve(shotTaskInstance, shotTaskInstance._exportPath, isPath=True)
-    
+    # resolve the export path of the task for the passed in item. the items
+    # only differ by their {track}, which is substituted in the path resolved
+    # once per task by the submission's resolved path table.
+    thisItemResolvedExportPath = getResolvedPathTable(shotTaskInstance).trackItemPath(
+        shotTaskInstance, trackItem
+    )
+
     # at this point the path is likely a mix of forward/backslashes due to how nuke/SG handle things differently.
     # make them all forward slashes (i.e. nuke style)
-    return thisItemResolvedExportPath.replace("\\", "/")
\ No newline at end of file
+    return thisItemResolvedExportPath.replace("\\", "/")
@@ -0,0 +1,135 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import os
+import json
+import math
+import time
+import threading
+import collections
+
+
+# The upper bounds of the latency histogram buckets, in seconds. The last
+# bucket holds the calls slower than the last bound.
+HISTOGRAM_BOUNDS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+# The number of hook methods taking the most time listed in the report.
+SLOWEST_COUNT = 3
+
+
+class HookProfiler(object):
+    """
+    Records the latency of the hook methods run through the app during an
+    export, and reports on them once the export is done.
+
+    The latency of a hook method includes the time spent in the hooks it
+    runs itself.
+    """
+
+    def __init__(self, app):
+        """
+        :param app: The app.
+        """
+        self._app = app
+        # the time the export started
+        self.started = time.time()
+        self._durations = collections.defaultdict(list)
+        self._lock = threading.Lock()
+
+    def record(self, hook, method, duration):
+        """
+        Adds a call to a hook method to the profile.
+
+        :param str hook: The hook setting, ie. ``hook_get_shot``.
+        :param str method: The name of the hook method.
+        :param float duration: The duration of the call, in seconds.
+        """
+        with self._lock:
+            self._durations[(hook, method)].append(duration)
+
+    def stats(self):
+        """
+        Returns the statistics of each hook method called, the methods taking
+        the most time first.
+
+        :returns: A list of dictionaries with the ``hook`` and ``method``, the
+            ``count`` of calls, their ``total``, ``p50``, ``p95`` and ``max``
+            durations in seconds, and their latency ``histogram`` as a list of
+            ``[upper_bound, count]`` pairs, the last bound being None.
+        """
+        with self._lock:
+            durations = dict((k, sorted(v)) for (k, v) in self._durations.items())
+
+        stats = []
+        for ((hook, method), values) in durations.items():
+            histogram = [[bound, 0] for bound in HISTOGRAM_BOUNDS] + [[None, 0]]
+            for value in values:
+                for bucket in histogram:
+                    if bucket[0] is None or value < bucket[0]:
+                        bucket[1] += 1
+                        break
+            stats.append(
+                {
+                    "hook": hook,
+                    "method": method,
+                    "count": len(values),
+                    "total": sum(values),
+                    "p50": _percentile(values, 50),
+                    "p95": _percentile(values, 95),
+                    "max": values[-1],
+                    "histogram": histogram,
+                }
+            )
+        return sorted(stats, key=lambda s: s["total"], reverse=True)
+
+    def report(self):
+        """
+        Logs a summary of the hook calls: the time spent in hooks, the hook
+        methods taking the most time and the latencies of every method.
+        """
+        stats = self.stats()
+        if not stats:
+            return
+
+        self._app.log_info(
+            "%d hook call(s), %.2fs in hooks. Most time spent in: %s"
+            % (
+                sum(s["count"] for s in stats),
+                sum(s["total"] for s in stats),
+                ", ".join(
+                    "%(hook)s.%(method)s (%(total).2fs)" % s
+                    for s in stats[:SLOWEST_COUNT]
+                ),
+            )
+        )
+        for s in stats:
+            self._app.log_debug(
+                "Hook %(hook)s.%(method)s: %(count)d call(s), %(total).3fs, "
+                "p50 %(p50).4fs, p95 %(p95).4fs, max %(max).4fs." % s
+            )
+
+    def save(self, path):
+        """
+        Writes the statistics of the hook calls, as returned by
+        :meth:`stats`, to a JSON file.
+
+        :param str path: The path of the file.
+        """
+        folder = os.path.dirname(path)
+        if folder and not os.path.isdir(folder):
+            os.makedirs(folder)
+        with open(path, "w") as f:
+            json.dump({"started": self.started, "hooks": self.stats()}, f, indent=2)
+
+
+def _percentile(values, percent):
+    """Returns the nearest rank percentile of a sorted list of values."""
+    index = int(math.ceil(percent / 100.0 * len(values))) - 1
+    return values[max(index, 0)]
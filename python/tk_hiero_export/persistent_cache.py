@@ -0,0 +1,132 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import os
+import json
+import time
+import threading
+
+
+# Cached values older than this are refreshed in the background when read.
+DEFAULT_REFRESH_AFTER = 5 * 60
+
+# Cached values older than this are discarded and fetched again right away.
+DEFAULT_TTL = 7 * 24 * 60 * 60
+
+
+class PersistentCache(object):
+    """
+    Small on-disk cache of ShotGrid lookups that rarely change, such as
+    schema valid values, so that the export dialog doesn't block on them
+    every time it opens.
+
+    The cache is a JSON file stored under the app's cache location, which
+    is specific to the site and project. Values are read from the cache when
+    present and not expired; values older than the refresh delay are then
+    fetched again from a background thread, through a connection of the
+    app's :class:`ConnectionPool`, to be up to date the next time they are
+    read.
+    """
+
+    def __init__(
+        self,
+        app,
+        name,
+        connection_pool,
+        ttl=DEFAULT_TTL,
+        refresh_after=DEFAULT_REFRESH_AFTER,
+    ):
+        self._app = app
+        self._connection_pool = connection_pool
+        self._path = os.path.join(app.cache_location, "%s.json" % name)
+        self._ttl = ttl
+        self._refresh_after = refresh_after
+        self._entries = None
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def get(self, key, fetch):
+        """
+        Returns a cached value, fetching it when missing or expired.
+
+        :param str key: The key of the value.
+        :param fetch: Callable taking a ShotGrid connection and returning the
+            value, which must be JSON serializable.
+
+        :returns: The value.
+        """
+        with self._lock:
+            entry = self._load().get(key)
+
+        now = time.time()
+        if entry is None or now - entry["timestamp"] > self._ttl:
+            value = fetch(self._app.shotgun)
+            self._store(key, value)
+            return value
+
+        if now - entry["timestamp"] > self._refresh_after:
+            self._refresh(key, fetch)
+        return entry["value"]
+
+    def _refresh(self, key, fetch):
+        """Fetches a value again from a background thread."""
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                with self._connection_pool.connection() as sg:
+                    value = fetch(sg)
+                self._store(key, value)
+            except Exception as e:
+                self._app.log_debug("Unable to refresh the cached %s: %s" % (key, e))
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        thread = threading.Thread(target=refresh)
+        thread.daemon = True
+        thread.start()
+
+    def _load(self):
+        """Returns the cached entries, reading them from disk the first time."""
+        if self._entries is None:
+            self._entries = {}
+            if os.path.exists(self._path):
+                try:
+                    with open(self._path) as fh:
+                        self._entries = json.load(fh)
+                except Exception as e:
+                    self._app.log_debug(
+                        "Ignoring unreadable cache %s: %s" % (self._path, e)
+                    )
+        return self._entries
+
+    def _store(self, key, value):
+        """Stores a value and writes the cache to disk."""
+        with self._lock:
+            entries = self._load()
+            entries[key] = {"value": value, "timestamp": time.time()}
+
+            try:
+                cache_dir = os.path.dirname(self._path)
+                if not os.path.exists(cache_dir):
+                    os.makedirs(cache_dir)
+
+                # write to a temporary file first so that a concurrent reader
+                # never sees a partially written cache
+                tmp_path = "%s.%s.tmp" % (self._path, threading.current_thread().ident)
+                with open(tmp_path, "w") as fh:
+                    json.dump(entries, fh)
+                os.replace(tmp_path, self._path)
+            except Exception as e:
+                self._app.log_debug("Unable to write cache %s: %s" % (self._path, e))
@@ -0,0 +1,249 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import ast
+import time
+import threading
+
+import sgtk
+
+
+# Prefetched data older than this isn't used, ie. when the dialog it was
+# prefetched for was cancelled.
+MAX_AGE = 60 * 60
+
+# The fields of the current user, as returned by sgtk.util.get_current_user.
+USER_FIELDS = [
+    "id",
+    "type",
+    "email",
+    "login",
+    "name",
+    "image",
+    "firstname",
+    "lastname",
+]
+
+
+class SGPrefetcher(object):
+    """
+    Fetches the SG entities an export is going to look up while the export
+    dialog is open, so that the export starts with a warm cache.
+
+    The Sequences and Shots of the items being exported, the Tasks matching
+    the ``default_task_filter`` setting, the current user and the Shot
+    TaskTemplates are fetched from a background thread, through a connection
+    of the app's :class:`ConnectionPool`. Lookups only use the prefetched data once the prefetch is
+    done, and return ``None`` when they can't answer, in which case callers
+    query SG as usual. Lookups return copies, which callers are free to
+    modify.
+    """
+
+    def __init__(self, app, connection_pool):
+        self._app = app
+        self._connection_pool = connection_pool
+        self._done = threading.Event()
+        self._started = time.time()
+        self._shot_fields = [
+            ctf["keyword"] for ctf in app.get_setting("custom_template_fields")
+        ]
+        self._user = None
+        self._sequences = {}
+        self._shots = {}
+        self._tasks = {}
+        self._task_templates = {}
+
+    def start(self, track_items):
+        """
+        Starts prefetching the data for the given track items. The names are
+        read from the Hiero items right away, in the calling thread.
+
+        :param list track_items: The hiero.core.TrackItems being exported.
+        """
+        self._started = time.time()
+        shot_names = {}
+        for item in track_items:
+            sequence_name = item.parentSequence().name()
+            shot_names.setdefault(sequence_name, set()).add(item.name())
+
+        thread = threading.Thread(target=self._prefetch, args=(shot_names,))
+        thread.daemon = True
+        thread.start()
+
+    def is_done(self):
+        """
+        Returns True once the prefetch has completed, as long as the data is
+        recent enough to be used.
+        """
+        return self._done.is_set() and time.time() - self._started < MAX_AGE
+
+    def get_current_user(self):
+        """
+        :returns: The current user's HumanUser entity, or None if unknown.
+        """
+        if not self.is_done():
+            return None
+        return self._copy(self._user)
+
+    def get_sequence(self, code):
+        """
+        :param str code: The code of the Sequence.
+        :returns: The Sequence entity, or None if it wasn't prefetched.
+        """
+        if not self.is_done():
+            return None
+        return self._copy(self._sequences.get(code))
+
+    def get_shot(self, parent, code, fields=None):
+        """
+        :param dict parent: The parent entity of the Shot.
+        :param str code: The code of the Shot.
+        :param list fields: The fields that will be read from the Shot. The
+            prefetch only holds the custom template fields.
+
+        :returns: The Shot entity, or None if it can't be answered from the
+            prefetched data.
+        """
+        if not self.is_done():
+            return None
+        if fields and not set(fields).issubset(self._shot_fields):
+            return None
+        shot = self._shots.get((parent["type"], parent["id"], code))
+        if shot is None:
+            return None
+        # only return the requested fields, as a find would
+        return dict((key, shot[key]) for key in ["type", "id"] + list(fields or []))
+
+    def get_default_tasks(self, entity):
+        """
+        :param dict entity: The Shot the Tasks are linked to.
+        :returns: The list of Tasks of the Shot that match the
+            ``default_task_filter`` setting, or None if not prefetched.
+        """
+        if not self.is_done():
+            return None
+        tasks = self._tasks.get((entity["type"], entity["id"]))
+        if tasks is None:
+            return None
+        return [dict(task) for task in tasks]
+
+    def drop_default_tasks(self, entity):
+        """
+        Drops the prefetched Tasks of an entity, ie. once the entity was
+        updated with a TaskTemplate which may have created new Tasks, so that
+        they are looked up from SG again.
+
+        :param dict entity: The Shot the Tasks are linked to.
+        """
+        self._tasks.pop((entity["type"], entity["id"]), None)
+
+    def get_task_template(self, entity_type, code):
+        """
+        :param str entity_type: The entity type of the TaskTemplate.
+        :param str code: The code of the TaskTemplate.
+        :returns: The TaskTemplate, or None if it wasn't prefetched.
+        """
+        if not self.is_done():
+            return None
+        return self._copy(self._task_templates.get((entity_type, code)))
+
+    @staticmethod
+    def _copy(entity):
+        return None if entity is None else dict(entity)
+
+    def _prefetch(self, shot_names):
+        """Fetches the data, called from the background thread."""
+        try:
+            with self._connection_pool.connection() as sg:
+                self._fetch(sg, shot_names)
+        except Exception as e:
+            self._app.log_debug("Unable to prefetch the SG data: %s" % e)
+        finally:
+            self._done.set()
+
+    def _fetch(self, sg, shot_names):
+        """Fetches the data through the given connection."""
+        project = self._app.context.project
+
+        # the user is looked up through the given connection, as the one of
+        # the tk instance isn't meant to be shared with a background thread.
+        # it is left to the export tasks when not authenticated as a user
+        user = sgtk.get_authenticated_user()
+        if user is not None and user.login:
+            self._user = sg.find_one(
+                "HumanUser", [["login", "is", user.login]], USER_FIELDS
+            )
+
+        for template in sg.find(
+            "TaskTemplate",
+            [["entity_type", "is", "Shot"]],
+            fields=["code", "entity_type"],
+        ):
+            self._task_templates[(template["entity_type"], template["code"])] = {
+                "type": "TaskTemplate",
+                "id": template["id"],
+            }
+
+        if not shot_names:
+            return
+
+        for sequence in sg.find(
+            "Sequence",
+            [["project", "is", project], ["code", "in", list(shot_names)]],
+            fields=["code"],
+        ):
+            self._sequences[sequence["code"]] = {
+                "type": "Sequence",
+                "id": sequence["id"],
+            }
+
+        if not self._sequences:
+            return
+
+        codes = set()
+        for names in shot_names.values():
+            codes.update(names)
+        shots = sg.find(
+            "Shot",
+            [
+                ["project", "is", project],
+                ["code", "in", list(codes)],
+                ["sg_sequence", "in", list(self._sequences.values())],
+            ],
+            fields=["code", "sg_sequence"] + self._shot_fields,
+        )
+        for shot in shots:
+            parent = shot["sg_sequence"]
+            self._shots[(parent["type"], parent["id"], shot["code"])] = shot
+        if not shots:
+            return
+
+        try:
+            task_filter = ast.literal_eval(
+                self._app.get_setting("default_task_filter", "[]")
+            )
+        except ValueError:
+            # reported by the export tasks
+            return
+
+        task_filter.append(
+            ["entity", "in", [{"type": "Shot", "id": s["id"]} for s in shots]]
+        )
+        tasks = dict((("Shot", shot["id"]), []) for shot in shots)
+        for task in sg.find("Task", task_filter, fields=["entity"]):
+            key = (task["entity"]["type"], task["entity"]["id"])
+            del task["entity"]
+            tasks.setdefault(key, []).append(task)
+        self._tasks = tasks
+
+        self._app.log_debug(
+            "Prefetched %d Sequence(s), %d Shot(s) and their Tasks from SG."
+            % (len(self._sequences), len(shots))
+        )
@@ -11,7 +11,6 @@
 import re
 import os
 import sys
-import ast
 
 from hiero.exporters import FnAudioExportTask
 from hiero.exporters import FnAudioExportUI
@@ -20,6 +19,7 @@ import sgtk
 from sgtk.platform.qt import QtGui, QtCore
 
 from .base import ShotgunHieroObjectBase
+from .tracing import traced_task
 from .collating_exporter import CollatingExporter, CollatedShotPreset
 
 from hiero import core
@@ -61,6 +61,7 @@ class ShotgunAudioExporterUI(ShotgunHieroObjectBase, FnAudioExportUI.AudioExport
             widget.layout().addWidget(custom_widget)
 
 
+@traced_task
 class ShotgunAudioExporter(
     ShotgunHieroObjectBase, FnAudioExportTask.AudioExportTask, CollatingExporter
 ):
@@ -129,22 +130,17 @@ class ShotgunAudioExporter(
         ##############################
         # see if we get a task to use
         self._sg_task = None
-        try:
-            task_filter = self.app.get_setting("default_task_filter", "[]")
-            task_filter = ast.literal_eval(task_filter)
-            task_filter.append(["entity", "is", self._sg_shot])
-            tasks = self.app.shotgun.find("Task", task_filter)
+        # an invalid filter is reported once, when the preset is compiled
+        task_filter = self._get_compiled_preset().task_filter
+        if task_filter is not None:
+            tasks = self._find_default_tasks(task_filter, self._sg_shot)
             if len(tasks) == 1:
                 self._sg_task = tasks[0]
-        except ValueError:
-            # continue without task
-            setting = self.app.get_setting("default_task_filter", "[]")
-            self.app.log_error("Invalid value for 'default_task_filter': %s" % setting)
 
         # figure out the thumbnail frame
         ##########################
         source = self._item.source()
-        self._thumbnail = source.thumbnail(source.posterFrame())
+        self._thumbnail = self._get_thumbnail(source, source.posterFrame())
 
         return FnAudioExportTask.AudioExportTask.startTask(self)
 
@@ -199,33 +195,15 @@ class ShotgunAudioExporter(
                         # The following values need to be passed as additional arguments to the writeAudioToFile method
                         # in nuke versions >= 12.1:
                         # numChannels[number(int)], sampleRate[Hz], bitDepth[bits], bitRate[kbp/s]
-                        bitDepth_str = self._initDict["preset"]._properties["bitDepth"]
-                        bitRate_str = self._initDict["preset"]._properties["bitRate"]
-                        bitDepth = [
-                            int(s) for s in bitDepth_str.split() if s.isdigit()
-                        ][0]
-                        bitRate = [int(s) for s in bitRate_str.split() if s.isdigit()][
-                            0
-                        ]
-                        numChannels_str = self._initDict["preset"]._properties[
-                            "numChannels"
-                        ]
-                        sampleRate_str = self._initDict["preset"]._properties[
-                            "sampleRate"
-                        ]
-                        sampleRate = [
-                            int(s) for s in sampleRate_str.split() if s.isdigit()
-                        ][0]
-
-                        # numChannels parameter must be passed as an integer
-                        if numChannels_str == "mono":
-                            numChannels = 1
-                        elif numChannels_str == "stereo":
-                            numChannels = 2
-                        elif numChannels_str == "5.1 (L R C LFE Ls Rs)":
-                            numChannels = 6
-                        else:
-                            numChannels = 8
+                        # parsed from the preset strings once per export.
+                        (
+                            numChannels,
+                            sampleRate,
+                            bitDepth,
+                            bitRate,
+                        ) = self._get_compiled_preset().audio_settings(
+                            self._initDict["preset"]._properties
+                        )
 
                         # If trackitem write out just the audio within the cut
                         self._sequence.writeAudioToFile(
@@ -259,18 +237,23 @@ class ShotgunAudioExporter(
 
     def finishTask(self):
         """Finish Task"""
-        # run base class implementation
-        FnAudioExportTask.AudioExportTask.finishTask(self)
-
-        if self._do_publish:
-            self._publish()
-
-        # Log usage metrics
         try:
-            self.app.log_metric("Audio Export", log_version=True)
-        except:
-            # ingore any errors. ex: metrics logging not supported
-            pass
+            # run base class implementation
+            FnAudioExportTask.AudioExportTask.finishTask(self)
+
+            if self._do_publish:
+                self._publish()
+
+            # Log usage metrics
+            try:
+                self.app.log_metric("Audio Export", log_version=True)
+            except:
+                # ingore any errors. ex: metrics logging not supported
+                pass
+        finally:
+            # release the pipeline even if this task failed, the SG writes
+            # of the export are only committed once every task released it
+            self._release_batch_pipeline()
 
     def _publish(self):
         """
@@ -295,8 +278,10 @@ class ShotgunAudioExporter(
 
         # register publish
         self.app.log_debug("Register publish in ShotGrid: %s" % str(args))
-        pub_data = sgtk.util.register_publish(**args)
+        self._get_batch_pipeline().add_publish(args, callback=self._on_publish_created)
 
+    def _on_publish_created(self, pub_data):
+        """Called once the publish registered by this task has been created."""
         # upload thumbnail for publish
         self._upload_thumbnail_to_sg(pub_data, self._thumbnail)
 
@@ -0,0 +1,421 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import sgtk
+
+
+# The maximum number of requests sent to ShotGrid in a single batch call.
+DEFAULT_BATCH_SIZE = 50
+
+# The register_publish arguments applied once the publish has been created,
+# which a dry run ignores. The batcher applies them after the batched create.
+POST_CREATE_ARGS = (
+    "dependency_paths",
+    "dependency_ids",
+    "thumbnail_path",
+    "update_entity_thumbnail",
+    "update_task_thumbnail",
+)
+
+
+def send_batch(app, requests, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Sends a list of ``batch`` requests to ShotGrid, in chunks of at most
+    ``batch_size`` requests.
+
+    :param app: The app whose ShotGrid connection is used.
+    :param list requests: The batch request dictionaries.
+    :param int batch_size: The maximum number of requests per call.
+
+    :returns: The list of results, in the order of the requests.
+    :rtype: list
+    """
+    results = []
+    for i in range(0, len(requests), batch_size):
+        chunk = requests[i : i + batch_size]
+        app.log_debug("Sending %d request(s) to ShotGrid: %s" % (len(chunk), chunk))
+        results.extend(app.shotgun.batch(chunk))
+    return results
+
+
+class PublishBatcher(object):
+    """
+    Collects PublishedFile registrations and creates them in grouped
+    ``batch`` calls rather than one ``register_publish`` round trip each.
+
+    Each call to :meth:`add` returns an empty dictionary that is populated
+    in place with the created entity once :meth:`flush` has run, so callers
+    can hold on to it and use the id afterwards (for example when linking
+    the publish to a Version).
+
+    The dependencies and thumbnails ``register_publish`` would add once the
+    publish is created are added by :meth:`flush`, the dependencies of all
+    of the publishes in a single ``batch`` call.
+    """
+
+    def __init__(self, app, batch_size=DEFAULT_BATCH_SIZE):
+        self._app = app
+        self._batch_size = batch_size
+        self._pending = []
+
+    def add(self, publish_args, extra_publish_data=None):
+        """
+        Queue a publish for creation.
+
+        The arguments are resolved into the PublishedFile data by running
+        ``register_publish`` as a dry run, with any extra publish data merged
+        in so that no follow up ``update`` is required.
+
+        :param dict publish_args: The keyword arguments that would otherwise
+            be passed to ``sgtk.util.register_publish``.
+        :param dict extra_publish_data: Optional extra field values, as
+            returned by the get_extra_publish_data hook.
+
+        :returns: A dictionary that will hold the created entity after the
+            next call to :meth:`flush`.
+        :rtype: dict
+        """
+        args = dict(publish_args)
+        if extra_publish_data:
+            sg_fields = dict(args.get("sg_fields") or {})
+            sg_fields.update(extra_publish_data)
+            args["sg_fields"] = sg_fields
+        post_create = dict(
+            (name, args.pop(name)) for name in POST_CREATE_ARGS if args.get(name)
+        )
+        args["dry_run"] = True
+
+        data = sgtk.util.register_publish(**args)
+        entity_type = data.pop("type", None)
+        if entity_type is None:
+            entity_type = sgtk.util.get_published_file_entity_type(self._app.sgtk)
+        if post_create:
+            post_create["entity"] = data.get("entity")
+            post_create["task"] = data.get("task")
+
+        publish = {}
+        self._pending.append((entity_type, data, publish, post_create))
+        return publish
+
+    def has_pending(self):
+        """Returns True if there are publishes waiting to be created."""
+        return bool(self._pending)
+
+    def flush(self):
+        """
+        Create all queued publishes in ShotGrid.
+
+        :returns: The list of created entity dictionaries, in the order they
+            were queued.
+        :rtype: list
+        """
+        created = []
+        while self._pending:
+            chunk = self._pending[: self._batch_size]
+            del self._pending[: self._batch_size]
+
+            requests = [
+                {"request_type": "create", "entity_type": entity_type, "data": data}
+                for (entity_type, data, _, _) in chunk
+            ]
+            self._app.log_debug("Registering %d publish(es) in ShotGrid." % len(chunk))
+            results = send_batch(self._app, requests, self._batch_size)
+
+            post_creates = []
+            for ((_, _, publish, post_create), result) in zip(chunk, results):
+                publish.update(result)
+                created.append(publish)
+                if post_create:
+                    post_creates.append((publish, post_create))
+
+            self._create_dependencies(post_creates)
+            self._upload_thumbnails(post_creates)
+
+        return created
+
+    def _create_dependencies(self, post_creates):
+        """
+        Creates the dependencies of the given publishes, as register_publish
+        does, in a single batch call.
+
+        :param list post_creates: The created publishes, along with the
+            arguments applied once they're created.
+        """
+        publish_type = sgtk.util.get_published_file_entity_type(self._app.sgtk)
+        if publish_type == "PublishedFile":
+            dependency_type = "PublishedFileDependency"
+            (field, upstream_field) = ("published_file", "dependent_published_file")
+        else:
+            dependency_type = "TankDependency"
+            (field, upstream_field) = (
+                "tank_published_file",
+                "dependent_tank_published_file",
+            )
+
+        paths = set()
+        for (_, post_create) in post_creates:
+            paths.update(post_create.get("dependency_paths") or [])
+        upstream = {}
+        if paths:
+            upstream = sgtk.util.find_publish(self._app.sgtk, sorted(paths))
+
+        requests = []
+        for (publish, post_create) in post_creates:
+            links = [
+                upstream[path]
+                for path in post_create.get("dependency_paths") or []
+                if path in upstream
+            ]
+            links.extend(
+                {"type": publish_type, "id": dependency_id}
+                for dependency_id in post_create.get("dependency_ids") or []
+            )
+            for link in links:
+                requests.append(
+                    {
+                        "request_type": "create",
+                        "entity_type": dependency_type,
+                        "data": {
+                            field: {"type": publish["type"], "id": publish["id"]},
+                            upstream_field: {"type": link["type"], "id": link["id"]},
+                        },
+                    }
+                )
+        if requests:
+            self._app.log_debug(
+                "Registering %d publish dependencies in ShotGrid." % len(requests)
+            )
+            send_batch(self._app, requests, self._batch_size)
+
+    def _upload_thumbnails(self, post_creates):
+        """
+        Uploads the thumbnail files of the given publishes, and to their
+        entity and Task when asked to, as register_publish does.
+
+        :param list post_creates: The created publishes, along with the
+            arguments applied once they're created.
+        """
+        for (publish, post_create) in post_creates:
+            path = post_create.get("thumbnail_path")
+            if not path:
+                continue
+            entities = [publish]
+            if post_create.get("update_entity_thumbnail"):
+                entities.append(post_create["entity"])
+            if post_create.get("update_task_thumbnail"):
+                entities.append(post_create["task"])
+            for entity in entities:
+                if not entity:
+                    continue
+                try:
+                    self._app.shotgun.upload_thumbnail(
+                        entity["type"], entity["id"], path
+                    )
+                except Exception as e:
+                    self._app.log_warning(
+                        "Unable to upload the thumbnail of %s %s: %s"
+                        % (entity["type"], entity["id"], e)
+                    )
+
+
+class BatchPipeline(object):
+    """
+    Collects the publish, Version and CutItem writes made by the export tasks
+    and commits them as a small number of ``batch`` calls.
+
+    The writes are committed in dependency order: PublishedFiles first, then
+    the Versions referencing them, then the CutItem updates linking to those
+    Versions. Every queued entity is returned as a dictionary that is
+    populated in place once its stage has been committed, which is how ids
+    are resolved between stages. Callbacks registered alongside an entity
+    are called with the created entity once its stage is done.
+
+    The pipeline is shared by the tasks of a shot. Each task retains it when
+    attached and releases it once its own writes have been queued; the
+    writes are committed when the last task releases the pipeline.
+    """
+
+    def __init__(self, app, batch_size=DEFAULT_BATCH_SIZE):
+        self._app = app
+        self._batch_size = batch_size
+        self._publish_batcher = PublishBatcher(app, batch_size)
+        self._publish_callbacks = []
+        self._versions = []
+        self._cut_item_links = []
+        self._commit_callbacks = []
+        self._users = 0
+
+    def retain(self):
+        """Register a task that will queue writes into this pipeline."""
+        self._users += 1
+
+    def release(self):
+        """
+        Signal that a task has queued all of its writes. The pipeline is
+        committed once every task that retained it has released it.
+        """
+        self._users = max(self._users - 1, 0)
+        if self._users == 0:
+            self.commit()
+
+    def finish(self):
+        """
+        Commit the pipeline as the export is finished, whether or not every
+        task that retained it has released it, ie. when the export was
+        cancelled or some of its tasks failed before finishing. Does nothing
+        more if the last task has already committed the pipeline.
+        """
+        if not (self._users or self.has_pending() or self._commit_callbacks):
+            return
+        if self._users:
+            self._app.log_warning(
+                "Committing the SG writes of an export with %d unfinished "
+                "task(s)." % self._users
+            )
+            self._users = 0
+        self.commit()
+
+    def has_pending(self):
+        """Returns True if there are writes waiting to be committed."""
+        return bool(
+            self._publish_batcher.has_pending()
+            or self._versions
+            or self._cut_item_links
+        )
+
+    def add_commit_callback(self, callback):
+        """
+        Register a callable to call, without arguments, once the pipeline has
+        been committed, ie. once the last task of the shot is done.
+
+        :param callback: The callable.
+        """
+        self._commit_callbacks.append(callback)
+
+    def add_publish(self, publish_args, extra_publish_data=None, callback=None):
+        """
+        Queue a PublishedFile for creation.
+
+        :param dict publish_args: The keyword arguments that would otherwise
+            be passed to ``sgtk.util.register_publish``.
+        :param dict extra_publish_data: Optional extra field values to merge
+            into the creation request.
+        :param callback: Optional callable, called with the created entity.
+
+        :returns: A dictionary populated with the publish once created.
+        :rtype: dict
+        """
+        publish = self._publish_batcher.add(publish_args, extra_publish_data)
+        if callback:
+            self._publish_callbacks.append((publish, callback))
+        return publish
+
+    def add_version(self, version_data, callback=None):
+        """
+        Queue a Version for creation. The data may reference publishes
+        returned by :meth:`add_publish`, they will have been created by the
+        time the Version is.
+
+        :param dict version_data: The field values of the Version.
+        :param callback: Optional callable, called with the created entity.
+
+        :returns: A dictionary populated with the Version once created.
+        :rtype: dict
+        """
+        version = {}
+        self._versions.append((version_data, version, callback))
+        return version
+
+    def link_cut_item(self, cut_item_data, version, callback=None):
+        """
+        Queue an update linking a CutItem to a Version.
+
+        The CutItem is only updated if its data holds an id once the
+        Versions have been created, ie. the CutItem exists in ShotGrid.
+
+        :param dict cut_item_data: The CutItem data of the export task.
+        :param dict version: The Version, as returned by :meth:`add_version`.
+        :param callback: Optional callable, called with the CutItem entity.
+        """
+        self._cut_item_links.append((cut_item_data, version, callback))
+
+    def commit(self):
+        """Create and update all queued entities, stage by stage."""
+
+        # publishes
+        self._publish_batcher.flush()
+        (callbacks, self._publish_callbacks) = (self._publish_callbacks, [])
+        self._run_callbacks(callbacks)
+
+        # versions, now that the publishes they reference have ids
+        (versions, self._versions) = (self._versions, [])
+        results = self._batch(
+            [
+                {"request_type": "create", "entity_type": "Version", "data": data}
+                for (data, _, _) in versions
+            ]
+        )
+        for ((_, version, _), result) in zip(versions, results):
+            version.update(result)
+        self._run_callbacks(
+            [(version, callback) for (_, version, callback) in versions]
+        )
+
+        # link the cut items to their versions
+        (links, self._cut_item_links) = (self._cut_item_links, [])
+        links = [
+            (cut_item_data, version, callback)
+            for (cut_item_data, version, callback) in links
+            if "id" in cut_item_data and "id" in version
+        ]
+        self._batch(
+            [
+                {
+                    "request_type": "update",
+                    "entity_type": "CutItem",
+                    "entity_id": cut_item_data["id"],
+                    "data": {"version": {"type": "Version", "id": version["id"]}},
+                }
+                for (cut_item_data, version, _) in links
+            ]
+        )
+        self._run_callbacks(
+            [
+                ({"type": "CutItem", "id": cut_item_data["id"]}, callback)
+                for (cut_item_data, _, callback) in links
+            ]
+        )
+
+        (callbacks, self._commit_callbacks) = (self._commit_callbacks, [])
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                self._app.logger.exception("Post commit step failed")
+
+    def _batch(self, requests):
+        """Send the requests to ShotGrid in chunks of the batch size."""
+        return send_batch(self._app, requests, self._batch_size)
+
+    def _run_callbacks(self, callbacks):
+        """
+        Run the entity callbacks of a committed stage. A failing callback is
+        logged so that it doesn't prevent the others from running.
+        """
+        for (entity, callback) in callbacks:
+            if callback is None:
+                continue
+            try:
+                callback(entity)
+            except Exception:
+                self._app.logger.exception(
+                    "Post creation step failed for %s %s"
+                    % (entity.get("type"), entity.get("id"))
+                )
@@ -10,7 +10,6 @@
 
 import os
 import os.path
-import ast
 import sys
 import time
 import shutil
@@ -30,6 +29,7 @@ import sgtk.util
 from sgtk.platform.qt import QtGui, QtCore
 
 from .base import ShotgunHieroObjectBase
+from .tracing import traced_task
 
 from . import (
     HieroGetShot
@@ -95,6 +95,7 @@ class ShotgunCopyExporterUI(
             layout.addWidget(custom_widget)
 
 
+@traced_task
 class ShotgunCopyExporter(
     ShotgunHieroObjectBase, GCollatedFrameExporter.GCollatedFrameExporter
 ):
@@ -138,23 +139,18 @@ class ShotgunCopyExporter(
         ##############################
         # see if we get a task to use
         SGAssociatedTask = None
-        try:
-            task_filter = self.app.get_setting("default_task_filter", "[]")
-            task_filter = ast.literal_eval(task_filter)
-            task_filter.append(["entity", "is", SGMainShotInfo])
-            tasks = self.app.shotgun.find("Task", task_filter)
+        # an invalid filter is reported once, when the preset is compiled
+        task_filter = self._get_compiled_preset().task_filter
+        if task_filter is not None:
+            tasks = self._find_default_tasks(task_filter, SGMainShotInfo)
             if len(tasks) == 1:
                 SGAssociatedTask = tasks[0]
-        except ValueError:
-            # continue without task
-            setting = self.app.get_setting("default_task_filter", "[]")
-            self.app.log_error("Invalid value for 'default_task_filter': %s" % setting)
             
         
         SGVersionData = None
         if self._preset.properties()["create_version"]:
             # lookup current login
-            sg_current_user = tank.util.get_current_user(self.app.tank)
+            sg_current_user = self._get_current_user()
 
             # get version data for main item
             SGVersionData = {
@@ -193,7 +189,7 @@ class ShotgunCopyExporter(
         # as if the thumbnail failed to upload.
         try:
             source = itemCollateInfo["trackItem"].source()
-            return source.thumbnail(self._item.sourceIn())
+            return self._get_thumbnail(source, self._item.sourceIn())
             # thumb.save("C:/Users/matt.brealey/Desktop/thumb.png", "PNG", -1)
         except Exception:
             return None
@@ -224,42 +220,74 @@ class ShotgunCopyExporter(
 
     def finishTask(self):
         """Finish Task"""
-        # run base class implementation
-        GCollatedFrameExporter.GCollatedFrameExporter.finishTask(self)
-        
-        # grab the stored data from startTask()
-        SGMainShotInfo = self._sgInfo["SGMainShotInfo"]
-        SGAssociatedTask = self._sgInfo["SGAssociatedTask"]
-        SGVersionData = self._sgInfo["SGVersionData"]
-        SGThumbnailData = self._sgInfo["SGThumbnailData"]
-        
-        print(SGMainShotInfo)
-        print(SGAssociatedTask)
-        print(SGVersionData)
-        print(SGThumbnailData)
-        print(self._sgInfo["SGVersionNum"])
-        
-        # by using entity instead of export path to get context, this ensures
-        # collated plates get linked to the hero shot
-        ctx = self.app.tank.context_from_entity("Shot", SGMainShotInfo["id"])
-        published_file_type = self.app.get_setting("plate_published_file_type")
-        published_file_entity_type = sgtk.util.get_published_file_entity_type(self.app.sgtk)
-
-        # Publish the main track item
-        version_data = SGVersionData["mainItem"]
-        resolved_export_path = version_data["sg_path_to_frames"]
-        thumbnail = SGThumbnailData["mainItem"]
-        self._publishTrackItem(ctx, published_file_type, published_file_entity_type, resolved_export_path, thumbnail, version_data)
-        
-        # Publish each overlapping track item
-        for overlappingTrackItemID in SGVersionData["overlappingItems"]:
-            version_data = SGVersionData["overlappingItems"][overlappingTrackItemID]
+        try:
+            # run base class implementation
+            GCollatedFrameExporter.GCollatedFrameExporter.finishTask(self)
+
+            # grab the stored data from startTask()
+            SGMainShotInfo = self._sgInfo["SGMainShotInfo"]
+            SGAssociatedTask = self._sgInfo["SGAssociatedTask"]
+            SGVersionData = self._sgInfo["SGVersionData"]
+            SGThumbnailData = self._sgInfo["SGThumbnailData"]
+
+            # by using entity instead of export path to get context, this ensures
+            # collated plates get linked to the hero shot
+            ctx = self.app.tank.context_from_entity("Shot", SGMainShotInfo["id"])
+            published_file_type = self.app.get_setting("plate_published_file_type")
+            published_file_entity_type = sgtk.util.get_published_file_entity_type(
+                self.app.sgtk
+            )
+
+            # Queue the publishes and Versions for the main and every overlapping
+            # track item. the SG writes of the shot are committed together once
+            # its last task has finished.
+            pipeline = self._get_batch_pipeline()
+
+            # Publish the main track item
+            version_data = SGVersionData["mainItem"]
             resolved_export_path = version_data["sg_path_to_frames"]
-            thumbnail = SGThumbnailData["overlappingItems"].get(overlappingTrackItemID, None)
-            self._publishTrackItem(ctx, published_file_type, published_file_entity_type, resolved_export_path, thumbnail, version_data)
-        
-    
-    def _publishTrackItem(self, ctx, published_file_type, published_file_entity_type, resolved_export_path, thumbnail, version_data):
+            thumbnail = SGThumbnailData["mainItem"]
+            self._publishTrackItem(
+                pipeline,
+                ctx,
+                published_file_type,
+                published_file_entity_type,
+                resolved_export_path,
+                thumbnail,
+                version_data,
+            )
+
+            # Publish each overlapping track item
+            for overlappingTrackItemID in SGVersionData["overlappingItems"]:
+                version_data = SGVersionData["overlappingItems"][overlappingTrackItemID]
+                resolved_export_path = version_data["sg_path_to_frames"]
+                thumbnail = SGThumbnailData["overlappingItems"].get(
+                    overlappingTrackItemID, None
+                )
+                self._publishTrackItem(
+                    pipeline,
+                    ctx,
+                    published_file_type,
+                    published_file_entity_type,
+                    resolved_export_path,
+                    thumbnail,
+                    version_data,
+                )
+        finally:
+            # release the pipeline even if this task failed, the SG writes
+            # of the export are only committed once every task released it
+            self._release_batch_pipeline()
+
+    def _publishTrackItem(
+        self,
+        pipeline,
+        ctx,
+        published_file_type,
+        published_file_entity_type,
+        resolved_export_path,
+        thumbnail,
+        version_data,
+    ):
 
         # create publish
         ################
@@ -274,32 +302,32 @@ class ShotgunCopyExporter(
 
         if self._sgInfo["SGAssociatedTask"] is not None:
             args["task"] = self._sgInfo["SGAssociatedTask"]
-       
+
+        # upload thumbnail for publish once it has been created
+        def on_publish_created(pub_data):
+            if thumbnail:
+                self._upload_thumbnail_to_sg(pub_data, thumbnail)
+
         # register publish
         self.app.log_debug("Register publish in shotgun: %s" % str(args))
-        pub_data = tank.util.register_publish(**args)
-
-        # upload thumbnail for publish
-        if thumbnail:
-            self._upload_thumbnail_to_sg(pub_data, thumbnail)
+        pub_data = pipeline.add_publish(args, callback=on_publish_created)
 
         # create version
         ################
-        vers = None
         if self._preset.properties()["create_version"]:
             if published_file_entity_type == "PublishedFile":
                 version_data["published_files"] = [pub_data]
             else:  # == "TankPublishedFile
                 version_data["tank_published_file"] = pub_data
 
+            # Web-reviewable media creation once the Version exists
+            ####################
             self.app.log_debug("Creating SG Version %s" % str(version_data))
-            vers = self.app.shotgun.create("Version", version_data)
+            pipeline.add_version(
+                version_data,
+                lambda vers: TaskHelpers.createWebReviewable(self, vers),
+            )
 
-        # Web-reviewable media creation
-        ####################
-        if vers:
-            TaskHelpers.createWebReviewable(self, vers)
-    
     def _tryCopy(self,src, dst):
         """Attempts to copy src file to dst, including the permission bits, last access time, last modification time, and flags"""
 
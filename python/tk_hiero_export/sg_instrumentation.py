@@ -0,0 +1,240 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import sys
+import json
+import time
+import logging
+import threading
+import collections
+
+import sgtk
+
+
+# The number of slowest requests listed in the report.
+SLOWEST_COUNT = 5
+
+# How far up the stack to look for the task or hook making a request.
+CALLER_DEPTH = 25
+
+
+# A request made to SG during an export.
+SGRequest = collections.namedtuple(
+    "SGRequest",
+    ["method", "entity_type", "duration", "payload_size", "task", "hook"],
+)
+
+
+class SGRequestRecorder(object):
+    """
+    Records the requests made to SG during an export, through connections
+    wrapped by :class:`InstrumentedConnection`, and reports on them once the
+    export is done.
+
+    Each request is recorded with its method, entity type and duration. The
+    size of its payload and the export task and hook it was made from are
+    only worked out when they're reported on: when the budget is set, the
+    requests are traced or debug logging is on.
+    """
+
+    def __init__(self, app, budget_per_shot=0, tracer=None):
+        """
+        :param app: The app.
+        :param int budget_per_shot: If set, the number of requests per shot
+            above which the report warns about the export.
+        :param tracer: If set, the :class:`~.tracing.ExportTracer` each
+            request is also recorded on as a span.
+        """
+        self._app = app
+        self._budget_per_shot = budget_per_shot
+        self._tracer = tracer
+        self._requests = []
+        self._lock = threading.Lock()
+        self.detailed = bool(
+            budget_per_shot
+            or tracer is not None
+            or app.logger.isEnabledFor(logging.DEBUG)
+        )
+
+    def record(self, request, start=None):
+        """
+        Adds a :class:`SGRequest` to the recording.
+
+        :param request: The :class:`SGRequest`.
+        :param float start: The ``time.perf_counter()`` the request started
+            at, for its span on the tracer. Requests recorded without it are
+            assumed to have ended now.
+        """
+        with self._lock:
+            self._requests.append(request)
+        if self._tracer is not None:
+            self._tracer.add_span(
+                ("%s %s" % (request.method, request.entity_type or "")).strip(),
+                "sg",
+                start if start is not None else time.perf_counter() - request.duration,
+                request.duration,
+                {
+                    "payload_size": request.payload_size,
+                    "task": request.task,
+                    "hook": request.hook,
+                },
+            )
+
+    def requests(self):
+        """Returns the list of recorded :class:`SGRequest`."""
+        with self._lock:
+            return list(self._requests)
+
+    def report(self, shot_count):
+        """
+        Logs a summary of the recorded requests: the number of requests per
+        shot, the time spent waiting on SG, the tasks and hooks making the
+        most requests and the slowest requests. Warns if the number of
+        requests per shot exceeds the budget.
+
+        :param int shot_count: The number of shots exported.
+        """
+        requests = self.requests()
+        if not requests:
+            return
+
+        total_time = sum(r.duration for r in requests)
+        per_shot = len(requests) / float(max(shot_count, 1))
+        self._app.log_info(
+            "%d SG request(s) for %d shot(s), %.1f per shot, %.2fs waiting on SG."
+            % (len(requests), shot_count, per_shot, total_time)
+        )
+
+        by_method = collections.Counter(
+            "%s %s" % (r.method, r.entity_type or "") for r in requests
+        )
+        self._app.log_debug(
+            "SG requests by type: %s"
+            % ", ".join("%s: %d" % (k.strip(), n) for (k, n) in by_method.most_common())
+        )
+
+        by_caller = collections.Counter(
+            "%s/%s" % (r.task or "-", r.hook or "-") for r in requests
+        )
+        self._app.log_debug(
+            "SG requests by task/hook: %s"
+            % ", ".join("%s: %d" % (k, n) for (k, n) in by_caller.most_common())
+        )
+
+        slowest = sorted(requests, key=lambda r: r.duration, reverse=True)
+        for r in slowest[:SLOWEST_COUNT]:
+            self._app.log_debug(
+                "Slow SG request: %s %s took %.2fs (%d bytes) from %s/%s"
+                % (
+                    r.method,
+                    r.entity_type or "",
+                    r.duration,
+                    r.payload_size,
+                    r.task or "-",
+                    r.hook or "-",
+                )
+            )
+
+        if self._budget_per_shot and per_shot > self._budget_per_shot:
+            self._app.log_warning(
+                "The export made %.1f SG requests per shot, over the budget of %d. "
+                "The most requests were made from: %s"
+                % (
+                    per_shot,
+                    self._budget_per_shot,
+                    ", ".join("%s (%d)" % item for item in by_caller.most_common(3)),
+                )
+            )
+
+
+class InstrumentedConnection(object):
+    """
+    Wraps a SG connection, behaving as it does while recording every request
+    made through it on a :class:`SGRequestRecorder`.
+    """
+
+    def __init__(self, sg, recorder):
+        self._sg = sg
+        self._recorder = recorder
+
+    def __getattr__(self, name):
+        attr = getattr(self._sg, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return attr(*args, **kwargs)
+            finally:
+                duration = time.perf_counter() - start
+                try:
+                    (task, hook) = (None, None)
+                    payload_size = 0
+                    if self._recorder.detailed:
+                        (task, hook) = _find_caller()
+                        payload_size = _payload_size(args, kwargs)
+                    self._recorder.record(
+                        SGRequest(
+                            name,
+                            _entity_type(name, args),
+                            duration,
+                            payload_size,
+                            task,
+                            hook,
+                        ),
+                        start,
+                    )
+                except Exception:
+                    # never fail a request because of the instrumentation
+                    pass
+
+        return call
+
+
+def _entity_type(method, args):
+    """Returns the entity type a request is about, if any."""
+    if method == "batch" and args:
+        types = set(r.get("entity_type") for r in args[0])
+        return ",".join(sorted(t for t in types if t))
+    if args and isinstance(args[0], str):
+        return args[0]
+    return None
+
+
+def _payload_size(args, kwargs):
+    """Returns the approximate size of the request payload, in bytes."""
+    try:
+        return len(json.dumps([args, kwargs], default=str))
+    except Exception:
+        return 0
+
+
+def _find_caller():
+    """
+    Returns the names of the export task and hook up the stack, either one
+    being None if not found.
+    """
+    from .base import ShotgunHieroObjectBase
+
+    task = None
+    hook = None
+    frame = sys._getframe(2)
+    depth = 0
+    while frame is not None and depth < CALLER_DEPTH and not (task and hook):
+        obj = frame.f_locals.get("self")
+        if obj is not None:
+            if hook is None and isinstance(obj, sgtk.Hook):
+                hook = "%s.%s" % (type(obj).__name__, frame.f_code.co_name)
+            elif task is None and isinstance(obj, ShotgunHieroObjectBase):
+                task = type(obj).__name__
+        frame = frame.f_back
+        depth += 1
+    return (task, hook)
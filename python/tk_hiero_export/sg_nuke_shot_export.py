@@ -8,10 +8,8 @@
 # agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
 # not expressly granted therein are reserved by Shotgun Software Inc.
 
-import re
 import os
 import sys
-import ast
 import json
 import shutil
 
@@ -23,6 +21,7 @@ import sgtk
 from sgtk.platform.qt import QtGui, QtCore
 
 from .base import ShotgunHieroObjectBase
+from .tracing import traced_task
 from . import HieroGetExtraPublishData
 
 from .helpers import Collate, ResolveHelpers
@@ -111,6 +110,7 @@ class ShotgunNukeShotExporterUI(
         self.app.log_debug("toolkitPresetChanged: %s" % preset)
 
 
+@traced_task
 class ShotgunNukeShotExporter(
     ShotgunHieroObjectBase, FnNukeShotExporter.NukeShotExporter
 ):
@@ -150,7 +150,7 @@ class ShotgunNukeShotExporter(
             )
 
         source = self._item.source()
-        self._thumbnail = source.thumbnail(source.posterFrame())
+        self._thumbnail = self._get_thumbnail(source, source.posterFrame())
 
         return FnNukeShotExporter.NukeShotExporter.taskStep(self)
 
@@ -169,137 +169,143 @@ class ShotgunNukeShotExporter(
         """
         Finish Task
         """
-        # run base class implementation
-        FnNukeShotExporter.NukeShotExporter.finishTask(self)
-
-        # register publish
-        # get context we're publishing to
-        ctx = self.app.tank.context_from_path(self._resolved_export_path)
-        published_file_type = self.app.get_setting("nuke_script_published_file_type")
-
-        args = {
-            "tk": self.app.tank,
-            "context": ctx,
-            "path": self._resolved_export_path,
-            "name": os.path.basename(self._resolved_export_path),
-            "version_number": int(self._tk_version_number),
-            "published_file_type": published_file_type,
-        }
-
-        # see if we get a task to use
-        if (ctx.entity is not None) and (ctx.entity.get("type", "") == "Shot"):
-            try:
-                task_filter = self.app.get_setting("default_task_filter", "[]")
-                task_filter = ast.literal_eval(task_filter)
-                task_filter.append(["entity", "is", ctx.entity])
-                tasks = self.app.shotgun.find("Task", task_filter)
+        try:
+            # run base class implementation
+            FnNukeShotExporter.NukeShotExporter.finishTask(self)
+
+            # the context is read from the path, which needs the filesystem
+            # structure of the shot. create it if it's still pending.
+            filesystem_structure_batch = getattr(
+                self, "_filesystem_structure_batch", None
+            )
+            if filesystem_structure_batch is not None:
+                filesystem_structure_batch.flush()
+
+            # register publish
+            # get context we're publishing to
+            ctx = self.app.tank.context_from_path(self._resolved_export_path)
+            published_file_type = self.app.get_setting(
+                "nuke_script_published_file_type"
+            )
+
+            args = {
+                "tk": self.app.tank,
+                "context": ctx,
+                "path": self._resolved_export_path,
+                "name": os.path.basename(self._resolved_export_path),
+                "version_number": int(self._tk_version_number),
+                "published_file_type": published_file_type,
+            }
+
+            # see if we get a task to use
+            # an invalid filter is reported once, when the preset is compiled
+            task_filter = self._get_compiled_preset().task_filter
+            if (
+                (ctx.entity is not None)
+                and (ctx.entity.get("type", "") == "Shot")
+                and task_filter is not None
+            ):
+                tasks = self._find_default_tasks(task_filter, ctx.entity)
                 if len(tasks) == 1:
                     args["task"] = tasks[0]
-            except ValueError:
-                # continue without task
-                self.app.log_error("Invalid value for 'default_task_filter'")
 
-        publish_entity_type = sgtk.util.get_published_file_entity_type(self.app.sgtk)
-
-        self.app.log_debug("Register publish in ShotGrid: %s" % str(args))
-        sg_publish = sgtk.util.register_publish(**args)
-        if self._extra_publish_data is not None:
-            self.app.log_debug(
-                "Updating SG %s %s"
-                % (publish_entity_type, str(self._extra_publish_data))
-            )
-            self.app.shotgun.update(
-                sg_publish["type"], sg_publish["id"], self._extra_publish_data
+            publish_entity_type = sgtk.util.get_published_file_entity_type(
+                self.app.sgtk
             )
 
-        # call the publish data hook to allow for publish customization.
+            # the v001 and v000 scripts are queued together. the SG writes of the
+            # shot are committed once its last task has finished, and the
+            # thumbnail is uploaded for each script once it has been published.
+            pipeline = self._get_batch_pipeline()
+            publish_fields = self._get_publish_fields(publish_entity_type)
+            self.app.log_debug("Register publish in ShotGrid: %s" % str(args))
+            pipeline.add_publish(args, publish_fields, self._on_publish_created)
+
+            # Version Zero Generation
+            # Get current script path and name
+            scriptv1Path = self._resolved_export_path
+            scriptv1Name = os.path.basename(scriptv1Path)
+            # Only generate version zero from a v001
+            if ".v001" in scriptv1Name:
+                self.app.log_debug(f"Nuke Script v001 Path: {scriptv1Path}")
+                # Generate script path and name for version zero
+                scriptv0Path = scriptv1Path.replace(".v001.", ".v000.")
+                scriptv0Name = os.path.basename(scriptv0Path)
+                self.app.log_debug(f"Nuke Script v000 Path: {scriptv0Path}")
+
+                # Modify file contents to update nuke root name to v000 and hiero
+                # metadata script path tag to v000
+                # Read the nuke v001 script
+                with open(scriptv1Path, "r") as file:
+                    nukeScriptv1Data = file.read()
+                    self.app.log_debug(f"Reading data from: {scriptv1Name}")
+
+                # Swap out any paths inside the nuke script
+                nukeScriptv0Data = nukeScriptv1Data.replace(scriptv1Name, scriptv0Name)
+
+                # Write the modified data to a version zero script.
+                with open(scriptv0Path, "w") as file:
+                    file.write(nukeScriptv0Data)
+                    self.app.log_debug(f"Writing data to: {scriptv0Name}")
+
+                    self.app.log_debug("Version Zero Sucessful!")
+
+                # Publish v000
+                # Tweak to already establshed args to reflect v000
+                v0_args = dict(args)
+                v0_args["version_number"] = 000
+                v0_args["path"] = scriptv0Path
+                v0_args["name"] = scriptv0Name
+
+                publish_fields = self._get_publish_fields(publish_entity_type)
+                self.app.log_debug("Register publish in ShotGrid: %s" % str(v0_args))
+                pipeline.add_publish(v0_args, publish_fields, self._on_publish_created)
+
+            else:
+                self.app.log_error(
+                    "Version Zero Generation Skipped - Nuke script not v001"
+                )
+
+            # Log usage metrics
+            try:
+                self.app.log_metric("Shot Export", log_version=True)
+            except:
+                # ingore any errors. ex: metrics logging not supported
+                pass
+        finally:
+            # release the pipeline even if this task failed, the SG writes
+            # of the export are only committed once every task released it
+            self._release_batch_pipeline()
+
+    def _get_publish_fields(self, publish_entity_type):
+        """
+        Returns the extra fields of a publish of this task, gathered in
+        startTask and from the publish data hook, which is called for each
+        publish to allow for publish customization. They're merged into the
+        creation request of the publish rather than sent as a separate update.
+        """
         extra_publish_data = self.app.execute_hook(
             "hook_get_extra_publish_data",
             task=self,
             base_class=HieroGetExtraPublishData,
         )
+        publish_fields = {}
+        if self._extra_publish_data is not None:
+            publish_fields.update(self._extra_publish_data)
         if extra_publish_data is not None:
+            publish_fields.update(extra_publish_data)
+        if publish_fields:
             self.app.log_debug(
-                "Updating SG %s %s" % (publish_entity_type, str(extra_publish_data))
-            )
-            self.app.shotgun.update(
-                sg_publish["type"], sg_publish["id"], extra_publish_data
+                "Including extra SG %s data %s"
+                % (publish_entity_type, str(publish_fields))
             )
+        return publish_fields
 
+    def _on_publish_created(self, sg_publish):
+        """Called once a script published by this task has been created."""
         # upload thumbnail for sequence
         self._upload_thumbnail_to_sg(sg_publish, self._thumbnail)
 
-        # Version Zero Generation
-        # Get current script path and name
-        scriptv1Path = self._resolved_export_path
-        scriptv1Name = os.path.basename(scriptv1Path)
-        # Only generate version zero from a v001
-        if '.v001' in scriptv1Name:
-            self.app.log_debug(f'Nuke Script v001 Path: {scriptv1Path}')
-            # Generate script path and name for version zero
-            scriptv0Path = scriptv1Path.replace('.v001.', '.v000.')
-            scriptv0Name = os.path.basename(scriptv0Path)
-            self.app.log_debug(f'Nuke Script v000 Path: {scriptv0Path}')
-            
-            #Modify file contents to update nuke root name to v000 and hiero metadata script path tag to v000
-            # Read the nuke v001 script
-            with open(scriptv1Path, "r") as file:
-                nukeScriptv1Data = file.read()
-                self.app.log_debug(f'Reading data from: {scriptv1Name}')
-
-            # Swap out any paths inside the nuke script
-            nukeScriptv0Data = nukeScriptv1Data.replace(scriptv1Name, scriptv0Name)
-
-            # Write the modified data to a version zero script.
-            with open(scriptv0Path, "w") as file:
-                file.write(nukeScriptv0Data)
-                self.app.log_debug(f'Writing data to: {scriptv0Name}')
-            
-                self.app.log_debug("Version Zero Sucessful!")
-            
-            # Publish v000
-            # Tweak to already establshed args to reflect v000
-            args['version_number'] = 000
-            args['path'] = scriptv0Path
-            args['name'] = scriptv0Name
-
-            self.app.log_debug("Register publish in ShotGrid: %s" % str(args))
-            sg_publish = sgtk.util.register_publish(**args)
-            if self._extra_publish_data is not None:
-                self.app.log_debug(
-                    "Updating SG %s %s"
-                    % (publish_entity_type, str(self._extra_publish_data))
-                )
-                self.app.shotgun.update(
-                    sg_publish["type"], sg_publish["id"], self._extra_publish_data
-                )
-            # call the publish data hook to allow for publish customization.
-            extra_publish_data = self.app.execute_hook(
-                "hook_get_extra_publish_data",
-                task=self,
-                base_class=HieroGetExtraPublishData,
-            )
-            if extra_publish_data is not None:
-                self.app.log_debug(
-                    "Updating SG %s %s" % (publish_entity_type, str(extra_publish_data))
-                )
-                self.app.shotgun.update(
-                    sg_publish["type"], sg_publish["id"], extra_publish_data
-                )
-
-            # upload thumbnail for sequence
-            self._upload_thumbnail_to_sg(sg_publish, self._thumbnail)
-            
-        else:
-            self.app.log_error("Version Zero Generation Skipped - Nuke script not v001")
-
-        # Log usage metrics
-        try:
-            self.app.log_metric("Shot Export", log_version=True)
-        except:
-            # ingore any errors. ex: metrics logging not supported
-            pass
-
     def isExportingItem(self, item):
         """
         This method overrides the default method added to the base class in
@@ -339,14 +345,13 @@ class ShotgunNukeShotExporter(
         oldLayoutEnd = currentLayoutContext.getNodes().pop()
 
         try:
+            compiled_preset = self._get_compiled_preset()
             for toolkit_specifier in self._preset.properties()["toolkitWriteNodes"]:
-                # break down a string like 'Toolkit Node: Mono Dpx ("editorial")' into name and output
-                match = re.match(
-                    '^Toolkit Node: (?P<name>.+) \("(?P<output>.+)"\)',
-                    toolkit_specifier,
-                )
+                # the name and output of the node, parsed once per export
+                metadata = compiled_preset.toolkit_write_node(toolkit_specifier)
+                if metadata is None:
+                    continue
 
-                metadata = match.groupdict()
                 node = nuke.MetadataNode(metadatavalues=list(metadata.items()))
                 node.setName("ShotgunWriteNodePlaceholder")
 
@@ -36,6 +36,18 @@ from .base import ShotgunHieroObjectBase
 from .sg_copy_exporter import ShotgunCopyExporter
 from .sg_symlink_exporter import ShotgunSymLinkExporter
 from .sg_transcode_exporter import ShotgunTranscodeExporter
+from .sg_nuke_shot_export import ShotgunNukeShotExporter
+from .sg_audio_export import ShotgunAudioExporter
+from .sg_batch import send_batch
+from .tracing import trace_span, traced_method
+from .persistent_cache import PersistentCache
+from .prefetch import SGPrefetcher
+from .export_session import ExportSession
+from .compiled_preset import CompiledPreset
+from .cut_table import CutTable
+from .cut_diff import CutDiff, CUT_FIELDS, CUT_ITEM_FIELDS
+from .filesystem_batch import FilesystemStructureBatch
+from . import timecode
 from .shot_updater import ShotgunShotUpdaterPreset
 from .shot_updater import ShotgunShotUpdater
 from .collating_exporter import CollatedShotPreset
@@ -44,6 +56,7 @@ from .collating_exporter_ui import CollatingExporterUI
 from . import (
     HieroPreExport,
     HieroUpdateCuts,
+    HieroUpdateShot,
     HieroGetShot,
     HieroResolveCustomStrings,
 )
@@ -81,6 +94,10 @@ class ShotgunShotProcessorUI(
         else:
             (widget, exportItems, editMode) = args
 
+        # fetch what the export will need from SG while the user is busy
+        # configuring it.
+        self._start_prefetch(exportItems)
+
         # create a layout with custom top and bottom widgets
         master_layout = QtGui.QHBoxLayout(widget)
         master_layout.setContentsMargins(0, 0, 0, 0)
@@ -136,6 +153,10 @@ class ShotgunShotProcessorUI(
             cut_type_layout = self._build_cut_type_layout(properties)
             shotgun_layout.addLayout(cut_type_layout)
 
+            # removed cut items only matter when cuts are updated in place
+            if self.app.get_setting("cut_update_mode") == "diff":
+                shotgun_layout.addWidget(self._build_cut_retire_widget(properties))
+
         shotgun_layout.addStretch()
 
         # add default settings from baseclass below
@@ -174,8 +195,7 @@ class ShotgunShotProcessorUI(
         # ---- construct the widget
 
         # populate the list of cut types and default from the site schema
-        schema = self.app.shotgun.schema_field_read("Cut", "sg_cut_type")
-        cut_types = schema["sg_cut_type"]["properties"]["valid_values"]["value"]
+        cut_types = list(self._get_valid_values("Cut", "sg_cut_type"))
 
         # make sure we have an empty item at the top
         cut_types.insert(0, "")
@@ -214,19 +234,45 @@ class ShotgunShotProcessorUI(
 
         return cut_type_layout
 
+    def _build_cut_retire_widget(self, properties):
+        """
+        Returns a QCheckBox toggling whether the CutItems of the shots removed
+        from the sequence are retired when the Cut is updated.
+
+        :param properties: A dict containing the 'sg_cut_retire_removed_items'
+            preset
+        :return: QtGui.QCheckBox
+        """
+        retire_widget = QtGui.QCheckBox("Retire CutItems removed from the cut")
+        retire_widget.setToolTip(
+            "When the latest revision of the Cut is updated, retire the "
+            "CutItems of the shots which are no longer in the sequence. They "
+            "are kept in the revision otherwise."
+        )
+        retire_widget.setChecked(
+            bool(properties.get("sg_cut_retire_removed_items", False))
+        )
+
+        def value_changed(state):
+            properties["sg_cut_retire_removed_items"] = bool(state)
+
+        retire_widget.stateChanged.connect(value_changed)
+        return retire_widget
+
     def _build_tag_selector_widget(self, items, properties):
         """
         Returns a QT widget which contains the tag.
         """
         fields = ["code"]
         filter = [["entity_type", "is", "Shot"]]
-        templates = [
-            t["code"]
-            for t in self.app.shotgun.find("TaskTemplate", filter, fields=fields)
-        ]
+        templates = self._get_sg_cache().get(
+            "TaskTemplate.Shot",
+            lambda sg: [
+                t["code"] for t in sg.find("TaskTemplate", filter, fields=fields)
+            ],
+        )
 
-        schema = self.app.shotgun.schema_field_read("Shot", "sg_status_list")
-        statuses = schema["sg_status_list"]["properties"]["valid_values"]["value"]
+        statuses = self._get_valid_values("Shot", "sg_status_list")
 
         values = [statuses, templates]
         labels = ["SG Shot Status", "SG Task Template for Shots"]
@@ -311,6 +357,51 @@ class ShotgunShotProcessorUI(
 
         return tagTable
 
+    def _start_prefetch(self, items):
+        """
+        Starts the :class:`SGPrefetcher` for the exported items. The export
+        uses the prefetched data, if available by the time it needs it.
+        """
+        try:
+            track_items = []
+            for item in items:
+                if item.trackItem():
+                    track_items.append(item.trackItem())
+                elif item.sequence():
+                    for track in item.sequence().videoTracks():
+                        track_items.extend(track.items())
+
+            prefetch = SGPrefetcher(self.app, self._get_connection_pool())
+            prefetch.start(track_items)
+            self.app.sg_prefetch = prefetch
+        except Exception as e:
+            self.app.log_debug("Unable to start the SG prefetch: %s" % e)
+
+    def _get_sg_cache(self):
+        """
+        Returns the :class:`PersistentCache` of the SG values shown in the
+        dialog, so that it can be built without waiting on SG.
+        """
+        if getattr(self.app, "export_dialog_cache", None) is None:
+            self.app.export_dialog_cache = PersistentCache(
+                self.app, "export_dialog_cache", self._get_connection_pool()
+            )
+        return self.app.export_dialog_cache
+
+    def _get_valid_values(self, entity_type, field_name):
+        """
+        Returns the valid values of a list or status field from the site
+        schema, through the dialog's SG cache.
+        """
+
+        def fetch(sg):
+            schema = sg.schema_field_read(entity_type, field_name)
+            return schema[field_name]["properties"]["valid_values"]["value"]
+
+        return self._get_sg_cache().get(
+            "schema.%s.%s" % (entity_type, field_name), fetch
+        )
+
     def _get_all_tags_by_name(self):
         """
         Returns all tags by name
@@ -367,6 +458,13 @@ class ShotgunShotProcessor(ShotgunHieroObjectBase, FnShotProcessor.ShotProcessor
         exportTemplate = self._exportTemplate.flatten()
         properties = self._preset.properties().get("shotgunShotCreateProperties", {})
 
+        # We need to pull any custom properties that were added to the
+        # preset and get their current value, adding them to the items'
+        # properties.
+        custom_properties = self._get_custom_properties(
+            get_method="get_shot_processor_ui_properties",
+        )
+
         # inject collate settings into Tasks where needed
         (collateTracks, collateShotNames) = self._getCollateProperties()
         for (itemPath, itemPreset) in exportTemplate:
@@ -375,49 +473,68 @@ class ShotgunShotProcessor(ShotgunHieroObjectBase, FnShotProcessor.ShotProcessor
             if "collateShotNames" in itemPreset.properties():
                 itemPreset.properties()["collateShotNames"] = collateShotNames
 
-            # We need to pull any custom properties that were added to the
-            # preset and get their current value, adding them to the item's
-            # properties.
-            custom_properties = self._get_custom_properties(
-                get_method="get_shot_processor_ui_properties",
-            )
-            sg_shot_properties = self._preset.properties().get(
-                "shotgunShotCreateProperties",
-                dict(),
-            )
-
             for property_data in custom_properties:
                 key = property_data["name"]
 
                 # If we don't have the current value for the property in the
                 # shot processor preset, or the item's preset doesn't contain
                 # the property, we move on without altering the item's properties.
-                if key not in sg_shot_properties or key not in itemPreset.properties():
+                if key not in properties or key not in itemPreset.properties():
                     continue
 
                 # Replace the default value that's in the item preset properties
                 # right now with the current value from the shot processor preset,
                 # which will reflect what the user set in the UI prior to exporting.
-                itemPreset.properties()[key] = sg_shot_properties[key]
+                itemPreset.properties()[key] = properties[key]
 
-        exportTemplate.insert(
-            0, (".shotgun", ShotgunShotUpdaterPreset(".shotgun", properties))
-        )
+        shotUpdaterPreset = ShotgunShotUpdaterPreset(".shotgun", properties)
+        exportTemplate.insert(0, (".shotgun", shotUpdaterPreset))
         self._exportTemplate.restore(exportTemplate)
 
         # tag app as first shot
         self.app.shot_count = 0
 
+        # finish the previous export if some of its tasks never finished, ie.
+        # failed before finishing, rather than leaving its SG writes pending
+        previous_session = getattr(self.app, "export_session", None)
+        if previous_session is not None:
+            previous_session.finish()
+
+        # the state of this export, shared by its tasks. the data prefetched
+        # while the dialog was open is only valid for this export
+        self._export_session = ExportSession(
+            self.app,
+            self._get_connection_pool(),
+            getattr(self.app, "sg_prefetch", None),
+        )
+        self.app.sg_prefetch = None
+        self.app.export_session = self._export_session
+
+        # parse the settings and properties the tasks need once, for all of
+        # them to share
+        self._export_session.compiled_preset = CompiledPreset(
+            self.app,
+            shotUpdaterPreset.properties(),
+            [itemPreset for (itemPath, itemPreset) in exportTemplate],
+        )
+
+        # the custom template fields of the exported Shots, fetched at once
+        # before the tasks resolve their paths
+        self._prefetchCustomFields(exportItems)
+
         # need to temporarily monkey patch the internal hiero check so that our
         # preview quicktime is generated. See the notes in the method being
         # called for more info.
         self._override_frame_server_check()
 
         # startProcessing()'s signature changed in NukeStudio/Hiero 10.5v1.
-        if self.app.get_nuke_version_tuple() >= (10, 5, 1):
-            FnShotProcessor.ShotProcessor.startProcessing(self, exportItems, preview)
-        else:
-            FnShotProcessor.ShotProcessor.startProcessing(self, exportItems)
+        with trace_span(self.app, "startProcessing", "export"):
+            if self.app.get_nuke_version_tuple() >= (10, 5, 1):
+                FnShotProcessor.ShotProcessor.startProcessing(
+                    self, exportItems, preview
+                )
+            else:
+                FnShotProcessor.ShotProcessor.startProcessing(self, exportItems)
 
         # restore the monkey patched hiero method
         self._restore_frame_server_check()
@@ -426,12 +543,41 @@ class ShotgunShotProcessor(ShotgunHieroObjectBase, FnShotProcessor.ShotProcessor
         exportTemplate.pop(0)
         self._exportTemplate.restore(exportTemplate)
 
+    @traced_method("export")
+    def _prefetchCustomFields(self, exportItems):
+        """
+        Fills the :class:`CustomFieldCache` of the export with the custom
+        template fields of the Shots of the exported items.
+        """
+        cache = self._get_custom_field_cache()
+        try:
+            track_items = []
+            for item in exportItems:
+                if item.trackItem():
+                    track_items.append(item.trackItem())
+                elif item.sequence():
+                    for track in item.sequence().videoTracks():
+                        track_items.extend(track.items())
+
+            count = cache.prefetch(self.app.shotgun, track_items)
+            if count:
+                self.app.log_debug(
+                    "Prefetched the custom template fields of %d Shot(s)." % count
+                )
+        except Exception as e:
+            # the resolve hook gets the Shots itself
+            self.app.log_debug("Unable to prefetch the custom template fields: %s" % e)
+
     def processTaskPreQueue(self):
         """Process the tasks just before they're queued up for execution."""
 
         # do the normal pre processing as defined in the base class
         FnShotProcessor.ShotProcessor.processTaskPreQueue(self)
 
+        # the SG writes of the tasks of each shot are committed together, in
+        # a few batch calls once the last of them is done
+        self._attachExportSession()
+
         # if set, only exporting the cut portion of the source clip. If false,
         # the export will be the full clip
         cut_length = self._preset.properties()["cutLength"]
@@ -489,6 +635,12 @@ class ShotgunShotProcessor(ShotgunHieroObjectBase, FnShotProcessor.ShotProcessor
         # us the cut order.
         cut_related_tasks.sort(key=lambda tasks: tasks[0]._item.timelineIn())
 
+        # compute the cut data of all of the shots at once. the updater tasks
+        # read their row from the table, here and when they run.
+        cut_table = CutTable(self.app, [tasks[0] for tasks in cut_related_tasks])
+        for (shot_updater_task, shot_process_task) in cut_related_tasks:
+            shot_updater_task._cut_table = cut_table
+
         # go ahead and populate the shot updater tasks with the cut order. this
         # is used to set the cut order on the Shot as it is created/updated.
         for i in range(0, len(cut_related_tasks)):
@@ -497,6 +649,10 @@ class ShotgunShotProcessor(ShotgunHieroObjectBase, FnShotProcessor.ShotProcessor
             # Cut order is 1-based
             shot_updater_task._cut_order = i + 1
 
+        # the filesystem structures of the shots are created in bulk once the
+        # updater tasks have all updated their shot, unless the hook opts out
+        self._attachFilesystemStructureBatch(cut_related_tasks)
+
         # if you're wondering why we looped over the tasks above only to bail
         # out here if cuts support isn't available for the site, it's to
         # maintain backward compatibility for updating the Shot entities with
@@ -552,6 +708,76 @@ class ShotgunShotProcessor(ShotgunHieroObjectBase, FnShotProcessor.ShotProcessor
         finally:
             self.app.engine.clear_busy()
 
+    def _attachExportSession(self):
+        """
+        Attaches the tasks that write to SG to the :class:`ExportSession` of
+        this export, which is finished once they're all done, and the tasks
+        of each shot to a :class:`BatchPipeline` of their own. The SG writes
+        of a shot are committed once its last task is done, followed by the
+        post creation steps of its Versions and PublishedFiles.
+        """
+        session = self._export_session
+
+        publishing_tasks = (
+            ShotgunShotUpdater,
+            ShotgunCopyExporter,
+            ShotgunSymLinkExporter,
+            ShotgunTranscodeExporter,
+            ShotgunNukeShotExporter,
+            ShotgunAudioExporter,
+        )
+
+        for taskGroup in self._submission.children():
+            pipeline = None
+            for task in taskGroup.children():
+                if isinstance(task, publishing_tasks):
+                    if pipeline is None:
+                        pipeline = session.new_pipeline()
+                    task._attach_batch_pipeline(pipeline)
+                    task._attach_export_session(session)
+
+    def _attachFilesystemStructureBatch(self, cut_related_tasks):
+        """
+        Creates the :class:`FilesystemStructureBatch` of this export if the
+        update_shot hook allows the filesystem structures of its shots to be
+        created in bulk, and attaches it to the shot updater tasks and the
+        Nuke script tasks, which need the structures. The structures are
+        created once every shot updater task is done, failed or cancelled,
+        and those still pending once the export is finished then.
+
+        :param cut_related_tasks: A list of tuples of the form:
+            (shot_updater_task, shot_process_task)
+        """
+        if not cut_related_tasks:
+            return
+
+        # the properties the updater tasks pass to the hook
+        preset_properties = cut_related_tasks[0][0]._preset.properties()
+        try:
+            allowed = self.app.execute_hook_method(
+                "hook_update_shot",
+                "allow_bulk_filesystem_structure_creation",
+                preset_properties=preset_properties,
+                base_class=HieroUpdateShot,
+            )
+        except (TankHookMethodDoesNotExistError, NotImplementedError):
+            # the hook was overridden before this method existed. keep creating
+            # the structures one shot at a time through create_filesystem_structure.
+            allowed = False
+        if not allowed:
+            return
+
+        batch = FilesystemStructureBatch(
+            self.app, preset_properties, len(cut_related_tasks)
+        )
+        for (shot_updater_task, shot_process_task) in cut_related_tasks:
+            shot_updater_task._filesystem_structure_batch = batch
+        for taskGroup in self._submission.children():
+            for task in taskGroup.children():
+                if isinstance(task, ShotgunNukeShotExporter):
+                    task._filesystem_structure_batch = batch
+        self._export_session.add_finish_callback(batch.flush)
+
     def _getCollateProperties(self):
         """
         Returns tuple with values for collateTracks collateShotNames settings.
@@ -566,10 +792,11 @@ class ShotgunShotProcessor(ShotgunHieroObjectBase, FnShotProcessor.ShotProcessor
 
     def _getCutData(self, hiero_sequence):
         """
-        Returns a dict of cut data for the supplied hiero sequence.
+        Returns a dict of cut data for the supplied hiero sequence, along with
+        the latest revision of the Cut in SG.
 
         :param hiero_sequence: `hiero.core.Sequence` object
-        :return: dict - cut data fields
+        :return: tuple - cut data fields, previous Cut or None
         """
 
         parent_entity = None
@@ -604,7 +831,7 @@ class ShotgunShotProcessor(ShotgunHieroObjectBase, FnShotProcessor.ShotProcessor
         prev_cut = sg.find_one(
             "Cut",
             [["code", "is", hiero_sequence.name()], ["entity", "is", parent_entity]],
-            ["revision_number"],
+            ["revision_number"] + list(CUT_FIELDS),
             [{"field_name": "revision_number", "direction": "desc"}],
         )
 
@@ -625,7 +852,7 @@ class ShotgunShotProcessor(ShotgunHieroObjectBase, FnShotProcessor.ShotProcessor
 
         # the bulk of the cut data. the rest will be populated as the individual
         # shots are processed in the cut
-        return {
+        cut_data = {
             "project": self.app.context.project,
             "entity": parent_entity,
             "code": hiero_sequence.name(),
@@ -634,6 +861,7 @@ class ShotgunShotProcessor(ShotgunHieroObjectBase, FnShotProcessor.ShotProcessor
             "revision_number": next_revision_number,
             "fps": hiero_sequence.framerate().toFloat(),
         }
+        return (cut_data, prev_cut)
 
     def _override_frame_server_check(self):
         """
@@ -697,6 +925,7 @@ class ShotgunShotProcessor(ShotgunHieroObjectBase, FnShotProcessor.ShotProcessor
             # patch. no need to log another message.
             pass
 
+    @traced_method("export")
     def _processCut(self, cut_related_tasks):
         """Collect data and create the Cut and CutItem entries for the tasks.
 
@@ -724,7 +953,7 @@ class ShotgunShotProcessor(ShotgunHieroObjectBase, FnShotProcessor.ShotProcessor
 
         # go ahead populate the bulk of the cut data. the first and last
         # cut items will populate the cut's in/out points.
-        cut_data = self._getCutData(hiero_sequence)
+        (cut_data, prev_cut) = self._getCutData(hiero_sequence)
 
         # we'll also calculate the cut duration while processing the tasks
         cut_duration = 0
@@ -732,17 +961,31 @@ class ShotgunShotProcessor(ShotgunHieroObjectBase, FnShotProcessor.ShotProcessor
         # list of cut item data
         cut_item_data_list = []
 
+        # this retrieves the basic cut information from the updater tasks.
+        # cut item in/out, cut item duration, edit in/out.
+        cut_item_rows = [tasks[0].get_cut_item_data() for tasks in cut_related_tasks]
+
+        # translate some of the cut item data into timecodes that will also
+        # be populated in the cut items, a column at a time
+        formatter = timecode.get_formatter(fps, drop_frame)
+        cut_item_timecodes = zip(
+            *[
+                [formatter.format(row[field]) for row in cut_item_rows]
+                for field in ["cut_item_in", "cut_item_out", "edit_in", "edit_out"]
+            ]
+        )
+
         # process the tasks in order
-        for (shot_updater_task, shot_process_task) in cut_related_tasks:
+        for (
+            (shot_updater_task, shot_process_task),
+            cut_item_data,
+            (tc_cut_item_in, tc_cut_item_out, tc_edit_in, tc_edit_out),
+        ) in zip(cut_related_tasks, cut_item_rows, cut_item_timecodes):
 
             # cut order was populated by the calling method to update the
             # Shot entity's cut info
             cut_order = shot_updater_task._cut_order
 
-            # this retrieves the basic cut information from the updater task.
-            # cut item in/out, cut item duration, edit in/out.
-            cut_item_data = shot_updater_task.get_cut_item_data()
-
             # clean out the unnecessary fields used by the shot updater
             for field in ["edit_duration", "head_in", "tail_out", "working_duration"]:
                 del cut_item_data[field]
@@ -750,17 +993,6 @@ class ShotgunShotProcessor(ShotgunHieroObjectBase, FnShotProcessor.ShotProcessor
             # add the length of this item to the full cut duration
             cut_duration += cut_item_data["cut_item_duration"]
 
-            # translate some of the cut item data into timecodes that will also
-            # be populated in the cut item
-            tc_cut_item_in = self._timecode(
-                cut_item_data["cut_item_in"], fps, drop_frame
-            )
-            tc_cut_item_out = self._timecode(
-                cut_item_data["cut_item_out"], fps, drop_frame
-            )
-            tc_edit_in = self._timecode(cut_item_data["edit_in"], fps, drop_frame)
-            tc_edit_out = self._timecode(cut_item_data["edit_out"], fps, drop_frame)
-
             # get the shot so that we have all we need for the cut item.
             # this may create the shot if it doesn't exist already
             shot = self.app.execute_hook(
@@ -803,10 +1035,6 @@ class ShotgunShotProcessor(ShotgunHieroObjectBase, FnShotProcessor.ShotProcessor
                 # first item in the cut, set the cut's start timecode
                 cut_data["timecode_start_text"] = tc_edit_in
 
-                # let the first shot_updater be responsible for uploading
-                # a thumbnail for the Cut
-                shot_updater_task._create_cut_thumbnail = True
-
             if cut_order == len(cut_related_tasks):
                 # last item in the cut, set the cut's end timecode
                 cut_data["timecode_end_text"] = tc_edit_out
@@ -816,16 +1044,127 @@ class ShotgunShotProcessor(ShotgunHieroObjectBase, FnShotProcessor.ShotProcessor
         # all tasks processed, add the duration to the cut data
         cut_data["duration"] = cut_duration
 
-        # create the cut to get the id.
-        sg = self.app.shotgun
-        cut = sg.create("Cut", cut_data)
-        self._app.log_debug("Created Cut in ShotGrid: %s" % (cut,))
-        self._app.log_info("Created Cut '%s' in ShotGrid!" % (cut["code"],))
+        if prev_cut is not None and self.app.get_setting("cut_update_mode") == "diff":
+            # update the latest revision of the cut with the differences only.
+            # the matched cut items receive the ids of the existing entities.
+            (cut, updated) = self._updateCut(
+                hiero_sequence, prev_cut, cut_data, cut_item_data_list
+            )
+
+            # the thumbnail of the cut is refreshed along with its revision
+            if updated:
+                cut_related_tasks[0][0]._create_cut_thumbnail = True
+        else:
+            # create the cut to get the id.
+            sg = self.app.shotgun
+            cut = sg.create("Cut", cut_data)
+            self._app.log_debug("Created Cut in ShotGrid: %s" % (cut,))
+            self._app.log_info("Created Cut '%s' in ShotGrid!" % (cut["code"],))
+
+            # let the first shot_updater be responsible for uploading
+            # a thumbnail for the Cut
+            cut_related_tasks[0][0]._create_cut_thumbnail = True
 
         # make sure the cut item data dicts are updated with the cut info
         for cut_item_data in cut_item_data_list:
             cut_item_data["cut"] = {"id": cut["id"], "type": "Cut"}
 
+        # everything needed to create the cut items is known at this point, so
+        # unless the hook opts out they're all created in one go. the shot
+        # updater and process tasks share the cut item data dicts, which
+        # receive the ids of the created entities.
+        new_cut_item_data_list = [d for d in cut_item_data_list if "id" not in d]
+        if new_cut_item_data_list and self._bulkCutItemCreationAllowed():
+            cut_items = send_batch(
+                self.app,
+                [
+                    {
+                        "request_type": "create",
+                        "entity_type": "CutItem",
+                        "data": dict(cut_item_data),
+                    }
+                    for cut_item_data in new_cut_item_data_list
+                ],
+            )
+            for (cut_item_data, cut_item) in zip(new_cut_item_data_list, cut_items):
+                cut_item_data.update(cut_item)
+
+            self._app.log_info("Created %d CutItems in ShotGrid!" % (len(cut_items),))
+
+    def _updateCut(self, hiero_sequence, prev_cut, cut_data, cut_item_data_list):
+        """
+        Updates the latest revision of a Cut with the differences of the
+        exported cut, in a single batch, rather than creating a new revision.
+
+        The CutItems of the revision are fetched in a single query. The
+        exported CutItems matching one of them receive its id, the others are
+        left to create. The CutItems of shots which are no longer in the
+        sequence are only retired when the ``sg_cut_retire_removed_items``
+        preset property is set.
+
+        :param hiero_sequence: The exported sequence.
+        :param dict prev_cut: The latest revision of the Cut.
+        :param dict cut_data: The data of the exported Cut.
+        :param list cut_item_data_list: The data of the exported CutItems.
+
+        :returns: The Cut entity dictionary, and whether it was updated.
+        """
+        prev_cut_items = self.app.shotgun.find(
+            "CutItem",
+            [["cut", "is", {"type": "Cut", "id": prev_cut["id"]}]],
+            ["shot", "shot.Shot.code"] + list(CUT_ITEM_FIELDS),
+        )
+        shot_names = set(
+            item.name()
+            for track in hiero_sequence.videoTracks()
+            for item in track.items()
+        )
+        properties = self._preset.properties().get("shotgunShotCreateProperties", {})
+        diff = CutDiff(
+            prev_cut,
+            prev_cut_items,
+            cut_data,
+            cut_item_data_list,
+            shot_names,
+            properties.get("sg_cut_retire_removed_items", False),
+        )
+
+        for (cut_item_data, prev_cut_item, changes) in diff.matched:
+            cut_item_data.update({"type": "CutItem", "id": prev_cut_item["id"]})
+
+        if diff.is_empty():
+            self._app.log_info(
+                "Cut '%s' revision %s is up to date in ShotGrid."
+                % (cut_data["code"], prev_cut["revision_number"])
+            )
+        else:
+            send_batch(self.app, diff.requests())
+            self._app.log_info(
+                "Updated Cut '%s' revision %s in ShotGrid: %s."
+                % (cut_data["code"], prev_cut["revision_number"], diff.summary())
+            )
+        return (dict(diff.cut, code=cut_data["code"]), not diff.is_empty())
+
+    def _bulkCutItemCreationAllowed(self):
+        """
+        Returns True if the update_cuts hook allows all of the CutItems to be
+        created in bulk by the processor.
+        """
+        try:
+            return self.app.execute_hook_method(
+                "hook_update_cuts",
+                "allow_bulk_cut_item_creation",
+                preset_properties=self._preset.properties().get(
+                    "shotgunShotCreateProperties",
+                    dict(),
+                ),
+                base_class=HieroUpdateCuts,
+            )
+        except (TankHookMethodDoesNotExistError, NotImplementedError):
+            # the hook was overridden before this method existed. keep creating
+            # the cut items one at a time through create_cut_item.
+            return False
+
     def _timecode(self, frame, fps, drop_frame=False):
         """Convenience wrapper to convert a given frame and fps to a timecode.
 
@@ -834,12 +1173,7 @@ class ShotgunShotProcessor(ShotgunHieroObjectBase, FnShotProcessor.ShotProcessor
         :return: timecode string
         """
 
-        if drop_frame:
-            display_type = hiero.core.Timecode.kDisplayDropFrameTimecode
-        else:
-            display_type = hiero.core.Timecode.kDisplayTimecode
-
-        return hiero.core.Timecode.timeToString(frame, fps, display_type)
+        return timecode.frame_to_timecode(frame, fps, drop_frame)
 
 
 class ShotgunShotProcessorPreset(
@@ -884,6 +1218,10 @@ class ShotgunShotProcessorPreset(
         # holds the cut type to use when creating Cut entires in SG
         default_properties["sg_cut_type"] = ""
 
+        # whether the CutItems of the shots removed from the sequence are
+        # retired when the latest revision of the Cut is updated in place
+        default_properties["sg_cut_retire_removed_items"] = False
+
         # Handle custom properties from the customize_export_ui hook.
         custom_properties = (
             self._get_custom_properties("get_shot_processor_ui_properties") or []
@@ -921,14 +1259,26 @@ class ShotgunShotProcessorPreset(
             resolver.addResolver(
                 "{%s}" % ctf["keyword"],
                 ctf["description"],
-                lambda keyword, task: self.app.execute_hook(
-                    "hook_resolve_custom_strings",
-                    keyword=keyword,
-                    task=task,
-                    base_class=HieroResolveCustomStrings,
-                ),
+                self._resolveCustomString,
             )
 
+    def _resolveCustomString(self, keyword, task):
+        """
+        Resolves a ``{custom}`` keyword for a task with the
+        ``hook_resolve_custom_strings`` hook. The value is cached for the
+        task, as its paths get resolved many times over the export.
+        """
+        return self._get_custom_field_cache().resolve(
+            keyword,
+            task,
+            lambda: self.app.execute_hook(
+                "hook_resolve_custom_strings",
+                keyword=keyword,
+                task=task,
+                base_class=HieroResolveCustomStrings,
+            ),
+        )
+
     def isValid(self):
         """
         This method was introduced into the base class in NukeStudio/Hiero
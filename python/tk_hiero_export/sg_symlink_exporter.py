@@ -9,7 +9,6 @@
 # not expressly granted therein are reserved by Shotgun Software Inc.
 
 import os
-import ast
 import sys
 import shutil
 import tempfile
@@ -29,6 +28,7 @@ import sgtk.util
 from sgtk.platform.qt import QtGui, QtCore
 
 from .base import ShotgunHieroObjectBase
+from .tracing import traced_task
 from .collating_exporter import CollatingExporter, CollatedShotPreset
 
 from . import (
@@ -97,6 +97,7 @@ class ShotgunSymLinkExporterUI(
             layout.addWidget(custom_widget)
 
 
+@traced_task
 class ShotgunSymLinkExporter(
     ShotgunHieroObjectBase, FnSymLinkExporter.SymLinkExporter, CollatingExporter
 ):
@@ -181,21 +182,16 @@ class ShotgunSymLinkExporter(
         ##############################
         # see if we get a task to use
         self._sg_task = None
-        try:
-            task_filter = self.app.get_setting("default_task_filter", "[]")
-            task_filter = ast.literal_eval(task_filter)
-            task_filter.append(["entity", "is", self._sg_shot])
-            tasks = self.app.shotgun.find("Task", task_filter)
+        # an invalid filter is reported once, when the preset is compiled
+        task_filter = self._get_compiled_preset().task_filter
+        if task_filter is not None:
+            tasks = self._find_default_tasks(task_filter, self._sg_shot)
             if len(tasks) == 1:
                 self._sg_task = tasks[0]
-        except ValueError:
-            # continue without task
-            setting = self.app.get_setting("default_task_filter", "[]")
-            self.app.log_error("Invalid value for 'default_task_filter': %s" % setting)
 
         if self._preset.properties()["create_version"]:
             # lookup current login
-            sg_current_user = tank.util.get_current_user(self.app.tank)
+            sg_current_user = self._get_current_user()
 
             file_name = os.path.basename(self._resolved_export_path)
             file_name = os.path.splitext(file_name)[0]
@@ -245,7 +241,7 @@ class ShotgunSymLinkExporter(
         # anything to work with, which will result in the same result
         # as if the thumbnail failed to upload.
         try:
-            self._thumbnail = source.thumbnail(self._item.sourceIn())
+            self._thumbnail = self._get_thumbnail(source, self._item.sourceIn())
         except Exception:
             pass
 
@@ -253,101 +249,108 @@ class ShotgunSymLinkExporter(
 
     def finishTask(self):
         """Finish Task"""
-        # run base class implementation
-        FnSymLinkExporter.SymLinkExporter.finishTask(self)
-
-        # create publish
-        ################
-        # by using entity instead of export path to get context, this ensures
-        # collated plates get linked to the hero shot
-        ctx = self.app.tank.context_from_entity("Shot", self._sg_shot["id"])
-        published_file_type = self.app.get_setting("plate_published_file_type")
-
-        args = {
-            "tk": self.app.tank,
-            "context": ctx,
-            "path": self._resolved_export_path,
-            "name": os.path.basename(self._resolved_export_path),
-            "version_number": int(self._tk_version),
-            "published_file_type": published_file_type,
-        }
-
-        if self._sg_task is not None:
-            args["task"] = self._sg_task
-
-        published_file_entity_type = sgtk.util.get_published_file_entity_type(
-            self.app.sgtk
-        )
+        try:
+            # run base class implementation
+            FnSymLinkExporter.SymLinkExporter.finishTask(self)
+
+            # create publish
+            ################
+            # by using entity instead of export path to get context, this ensures
+            # collated plates get linked to the hero shot
+            ctx = self.app.tank.context_from_entity("Shot", self._sg_shot["id"])
+            published_file_type = self.app.get_setting("plate_published_file_type")
+
+            args = {
+                "tk": self.app.tank,
+                "context": ctx,
+                "path": self._resolved_export_path,
+                "name": os.path.basename(self._resolved_export_path),
+                "version_number": int(self._tk_version),
+                "published_file_type": published_file_type,
+            }
 
-        # register publish
-        self.app.log_debug("Register publish in shotgun: %s" % str(args))
-        pub_data = tank.util.register_publish(**args)
-        if self._extra_publish_data is not None:
-            self.app.log_debug(
-                "Updating SG %s %s"
-                % (published_file_entity_type, str(self._extra_publish_data))
+            if self._sg_task is not None:
+                args["task"] = self._sg_task
+
+            published_file_entity_type = sgtk.util.get_published_file_entity_type(
+                self.app.sgtk
             )
-            self.app.shotgun.update(
-                pub_data["type"], pub_data["id"], self._extra_publish_data
+
+            # queue the publish, with any extra publish data merged into the
+            # creation request rather than sent as a separate update. the SG
+            # writes of the shot are committed together once its last task has
+            # finished.
+            self.app.log_debug("Register publish in shotgun: %s" % str(args))
+            if self._extra_publish_data is not None:
+                self.app.log_debug(
+                    "Including extra SG %s data %s"
+                    % (published_file_entity_type, str(self._extra_publish_data))
+                )
+            pipeline = self._get_batch_pipeline()
+            pub_data = pipeline.add_publish(
+                args, self._extra_publish_data, self._on_publish_created
             )
 
+            # create version
+            ################
+            if self._preset.properties()["create_version"]:
+                if published_file_entity_type == "PublishedFile":
+                    self._version_data["published_files"] = [pub_data]
+                else:  # == "TankPublishedFile
+                    self._version_data["tank_published_file"] = pub_data
+
+                self.app.log_debug("Creating SG Version %s" % str(self._version_data))
+                vers = pipeline.add_version(
+                    self._version_data, self._on_version_created
+                )
+
+                # Update the cut item if possible
+                #################################
+                if hasattr(self, "_cut_item_data"):
+                    # a version will be created and we have a cut item to update.
+                    pipeline.link_cut_item(
+                        self._cut_item_data, vers, self._on_cut_item_linked
+                    )
+
+            # Log usage metrics
+            try:
+                self.app.log_metric("SymLink & Publish", log_version=True)
+            except:
+                # ingore any errors. ex: metrics logging not supported
+                pass
+        finally:
+            # release the pipeline even if this task failed, the SG writes
+            # of the export are only committed once every task released it
+            self._release_batch_pipeline()
+
+    def _on_publish_created(self, pub_data):
+        """Called once the publish registered by this task has been created."""
         # upload thumbnail for publish
         if self._thumbnail:
             self._upload_thumbnail_to_sg(pub_data, self._thumbnail)
         else:
             self.app.log_debug(
                 "There was no thumbnail available for %s %s"
-                % (published_file_entity_type, str(self._extra_publish_data))
+                % (pub_data["type"], pub_data["id"])
             )
 
-        # create version
-        ################
-        vers = None
-        if self._preset.properties()["create_version"]:
-            if published_file_entity_type == "PublishedFile":
-                self._version_data["published_files"] = [pub_data]
-            else:  # == "TankPublishedFile
-                self._version_data["tank_published_file"] = pub_data
-
-            self.app.log_debug("Creating SG Version %s" % str(self._version_data))
-            vers = self.app.shotgun.create("Version", self._version_data)
-
+    def _on_version_created(self, vers):
+        """Called once the Version of this task has been created."""
         # Post creation hook
         ####################
-        if vers:
-            self.app.execute_hook(
-                "hook_post_version_creation",
-                version_data=vers,
-                base_class=HieroPostVersionCreation,
-            )
-
-        # Update the cut item if possible
-        #################################
-        if vers and hasattr(self, "_cut_item_data"):
-
-            # a version was created and we have a cut item to update.
-
-            # just make sure the cut item data has an id which should imply that
-            # it was created in the db.
-            if "id" in self._cut_item_data:
-                cut_item_id = self._cut_item_data["id"]
-
-                # update the Cut item with the newly uploaded version
-                self.app.shotgun.update("CutItem", cut_item_id, {"version": vers})
-                self.app.log_debug("Attached version to cut item.")
+        self.app.execute_hook(
+            "hook_post_version_creation",
+            version_data=vers,
+            base_class=HieroPostVersionCreation,
+        )
 
-                # upload a thumbnail for the cut item as well
-                if self._thumbnail:
-                    self._upload_thumbnail_to_sg(
-                        {"type": "CutItem", "id": cut_item_id}, self._thumbnail
-                    )
+    def _on_cut_item_linked(self, cut_item):
+        """Called once the CutItem has been linked to the Version of this task."""
+        self.app.log_debug("Attached version to cut item.")
 
-        # Log usage metrics
-        try:
-            self.app.log_metric("SymLink & Publish", log_version=True)
-        except:
-            # ingore any errors. ex: metrics logging not supported
-            pass
+        # upload a thumbnail for the cut item as well
+        if self._thumbnail:
+            self._upload_thumbnail_to_sg(cut_item, self._thumbnail)
 
 
 class ShotgunSymLinkPreset(
@@ -0,0 +1,52 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+
+# The fields of the Shots updated by the shot updater, fetched along with
+# the Shots so that only the fields which change are updated.
+SHOT_UPDATE_FIELDS = (
+    "sg_cut_order",
+    "sg_head_in",
+    "sg_cut_in",
+    "sg_cut_out",
+    "sg_tail_out",
+    "sg_cut_duration",
+    "sg_working_duration",
+    "sg_status_list",
+    "task_template",
+)
+
+
+def shot_update_delta(shot, data):
+    """
+    Returns the fields of the data to update a Shot with whose values differ
+    from the ones of the Shot. Fields the Shot wasn't fetched with are always
+    part of the delta.
+
+    :param dict shot: The Shot, as returned by the ``hook_get_shot`` hook.
+    :param dict data: The data to update the Shot with.
+    :rtype: dict
+    """
+    return dict(
+        (field, value)
+        for (field, value) in data.items()
+        if field not in shot or not _same_value(shot[field], value)
+    )
+
+
+def _same_value(current, value):
+    # entities are the same when they have the same type and id, whatever the
+    # other fields they were fetched with
+    if isinstance(current, dict) and isinstance(value, dict):
+        return (current.get("type"), current.get("id")) == (
+            value.get("type"),
+            value.get("id"),
+        )
+    return current == value
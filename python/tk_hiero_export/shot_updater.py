@@ -12,7 +12,10 @@ import hiero.core
 from hiero.exporters import FnShotExporter
 
 from .base import ShotgunHieroObjectBase
+from .tracing import traced_task
 from .collating_exporter import CollatingExporter
+from .cut_table import CutTable
+from .shot_delta import SHOT_UPDATE_FIELDS, shot_update_delta
 
 from . import (
     HieroGetShot,
@@ -20,7 +23,10 @@ from . import (
     HieroUpdateCuts,
 )
 
+from tank.errors import TankHookMethodDoesNotExistError
 
+
+@traced_task
 class ShotgunShotUpdater(
     ShotgunHieroObjectBase, FnShotExporter.ShotTask, CollatingExporter
 ):
@@ -37,89 +43,15 @@ class ShotgunShotUpdater(
         """
         Return some computed values for use when creating cut items.
 
-        The values correspond to the exported version created on disk.
+        The values correspond to the exported version created on disk. They
+        are read from the :class:`CutTable` the shot processor computed for
+        all of the export's shots, or computed for this task alone.
         """
-
-        (head_in, tail_out) = self.collatedOutputRange(clampToSource=False)
-
-        handles = self._cutHandles if self._cutHandles is not None else 0
-        in_handle = handles
-        out_handle = handles
-
-        # get the frame offset specified in the export options
-        startFrame = self._startFrame or 0
-
-        # these are the source in/out frames. we'll use them to determine if we
-        # have enough frames to account for the handles. versions of
-        # hiero/nukestudio handle missing handles differently
-        source_in = int(self._item.sourceIn())
-        source_out = int(self._item.sourceOut())
-
-        if self._has_nuke_backend() and source_in < in_handle:
-            # newer versions of the hiero/nukestudio. no black frames will be
-            # written to disk for the head when not enough source for the in
-            # handle. the in/out should be correct. but the start handle is
-            # limited by the in value. the source in point is within the
-            # specified handles.
-            in_handle = source_in
-
-            # NOTE: even new versions of hiero/nukestudio will write black
-            # frames for insuffient tail handles. so we don't need to account
-            # for that case here.
-
-        #TODO MB: adjust transcode ref here
-        # "cut_length" is a boolean set on the updater by the shot processor.
-        # it signifies whether the transcode task will write the cut length
-        # to disk (True) or if it will write the full source to disk (False)
-        if self.is_cut_length_export():
-            cut_in = head_in + in_handle
-            cut_out = tail_out - out_handle
-        else:
-            cut_in = source_in
-            cut_out = source_out
-
-            # account for any custom start frame
-            cut_in += startFrame
-            cut_out += startFrame
-
-        # get the edit in/out points from the timeline
-        edit_in = self._item.timelineIn()
-        edit_out = self._item.timelineOut()
-
-        # account for custom start code in the hiero timeline
-        seq = self._item.sequence()
-        edit_in += seq.timecodeStart()
-        edit_out += seq.timecodeStart()
-
-        cut_duration = cut_out - cut_in + 1
-        edit_duration = edit_out - edit_in + 1
-
-        if cut_duration != edit_duration:
-            self.app.log_warning(
-                "It looks like the shot %s has a retime applied. SG cuts do "
-                "not support retimes." % (self.clipName(),)
-            )
-
-        working_duration = tail_out - head_in + 1
-
-        if not self._has_nuke_backend() and self.isCollated():
-            # undo the offset that is automatically added when collating.
-            # this is only required in older versions of hiero
-            head_in -= self.HEAD_ROOM_OFFSET
-            tail_out -= self.HEAD_ROOM_OFFSET
-
-        # return the computed cut information
-        return {
-            "cut_item_in": cut_in,
-            "cut_item_out": cut_out,
-            "cut_item_duration": cut_duration,
-            "edit_in": edit_in,
-            "edit_out": edit_out,
-            "edit_duration": edit_duration,
-            "head_in": head_in,
-            "tail_out": tail_out,
-            "working_duration": working_duration,
-        }
+        table = getattr(self, "_cut_table", None)
+        row = table.row(self) if table is not None else None
+        if row is None:
+            row = CutTable(self.app, [self]).row(self)
+        return row
 
     def taskStep(self):
         """
@@ -136,11 +68,16 @@ class ShotgunShotUpdater(
         if self.app.shot_count == 0:
             self.app.preprocess_data = {}
 
+        # fetch the fields this task updates along with the shot's code, so
+        # that only the ones which change are updated. they aren't prefetched,
+        # as they must be read after any update made since the dialog was
+        # opened
         sg_shot = self.app.execute_hook(
             "hook_get_shot",
             task=self,
             item=self._item,
             data=self.app.preprocess_data,
+            fields=["code"] + list(SHOT_UPDATE_FIELDS),
             base_class=HieroGetShot,
         )
 
@@ -150,13 +87,17 @@ class ShotgunShotUpdater(
         shot_type = sg_shot["type"]
         del sg_shot["type"]
 
+        # the current values of the shot, and the values this task sets
+        current_shot = dict(sg_shot)
+        new_data = {}
+
         # The cut order may have been set by the processor. Otherwise keep old behavior.
         cut_order = self.app.shot_count + 1
         if self._cut_order:
             cut_order = self._cut_order
 
         # update the frame range
-        sg_shot["sg_cut_order"] = cut_order
+        new_data["sg_cut_order"] = cut_order
 
         # get cut info
         cut_info = self.get_cut_item_data()
@@ -234,72 +175,101 @@ class ShotgunShotUpdater(
                 self.app.log_debug("Exporting... clip length.")
 
         # update the frame range
-        sg_shot["sg_head_in"] = head_in
-        sg_shot["sg_cut_in"] = cut_in
-        sg_shot["sg_cut_out"] = cut_out
-        sg_shot["sg_tail_out"] = tail_out
-        sg_shot["sg_cut_duration"] = cut_duration
-        sg_shot["sg_working_duration"] = working_duration
+        new_data["sg_head_in"] = head_in
+        new_data["sg_cut_in"] = cut_in
+        new_data["sg_cut_out"] = cut_out
+        new_data["sg_tail_out"] = tail_out
+        new_data["sg_cut_duration"] = cut_duration
+        new_data["sg_working_duration"] = working_duration
 
         # get status from the hiero tags
-        status = None
-        status_map = dict(self._preset.properties()["sg_status_hiero_tags"])
-        for tag in self._item.tags():
-            if tag.name() in status_map:
-                status = status_map[tag.name()]
-                break
+        compiled_preset = self._get_compiled_preset()
+        status = compiled_preset.find_tag_value(compiled_preset.status_map, self._item)
         if status:
-            sg_shot["sg_status_list"] = status
+            new_data["sg_status_list"] = status
 
         # get task template from the tags
         template = None
-        template_map = dict(self._preset.properties()["task_template_map"])
-        for tag in self._item.tags():
-            if tag.name() in template_map:
-                template = self.app.tank.shotgun.find_one(
-                    "TaskTemplate",
-                    [
-                        ["entity_type", "is", shot_type],
-                        ["code", "is", template_map[tag.name()]],
-                    ],
-                )
-                break
+        template_code = compiled_preset.find_tag_value(
+            compiled_preset.task_template_map, self._item
+        )
+        if template_code is not None:
+            template = self._find_task_template(shot_type, template_code)
 
         # if there are no associated, assign default template...
         if template is None:
             default_template = self.app.get_setting("default_task_template")
             if default_template:
-                template = self.app.tank.shotgun.find_one(
-                    "TaskTemplate",
-                    [
-                        ["entity_type", "is", shot_type],
-                        ["code", "is", default_template],
-                    ],
-                )
+                template = self._find_task_template(shot_type, default_template)
 
         if template is not None:
-            sg_shot["task_template"] = template
-
-        # commit the changes and update the thumbnail
-        self.app.execute_hook_method(
-            "hook_update_shot",
-            "update_shotgun_shot_entity",
-            entity_type=shot_type,
-            entity_id=shot_id,
-            entity_data=sg_shot,
-            preset_properties=self._preset.properties(),
-            base_class=HieroUpdateShot,
-        )
-
-        # create the directory structure
-        self.app.execute_hook_method(
-            "hook_update_shot",
-            "create_filesystem_structure",
-            entity_type=shot_type,
-            entity_id=shot_id,
-            preset_properties=self._preset.properties(),
-            base_class=HieroUpdateShot,
-        )
+            new_data["task_template"] = template
+
+        # the shot is updated with the data returned by the hook, which may
+        # hold more fields, along with the values set by this task. only the
+        # latter are compared to the shot's, to commit the changes if any. the
+        # shot isn't updated when it already has the values from a previous
+        # export.
+        sg_shot.update(new_data)
+        shot_delta = shot_update_delta(current_shot, new_data)
+        try:
+            updated_data = self.app.execute_hook_method(
+                "hook_update_shot",
+                "update_shotgun_shot_entity_changes",
+                entity_type=shot_type,
+                entity_id=shot_id,
+                entity_data=sg_shot,
+                changed_data=shot_delta,
+                preset_properties=self._preset.properties(),
+                base_class=HieroUpdateShot,
+            )
+        except (TankHookMethodDoesNotExistError, NotImplementedError):
+            # the hook was overridden before the method existed, the shot is
+            # updated with all of the new data
+            self.app.execute_hook_method(
+                "hook_update_shot",
+                "update_shotgun_shot_entity",
+                entity_type=shot_type,
+                entity_id=shot_id,
+                entity_data=sg_shot,
+                preset_properties=self._preset.properties(),
+                base_class=HieroUpdateShot,
+            )
+            updated_data = sg_shot
+        if updated_data is None:
+            updated_data = shot_delta
+
+        session = self._get_export_session()
+        counts = session.shot_update_counts if session is not None else {}
+        if not updated_data:
+            counts["skipped"] = counts.get("skipped", 0) + 1
+            self.app.log_debug("%s %s is up to date." % (shot_type, self.shotName()))
+        elif all(field in updated_data for field in new_data):
+            counts["full"] = counts.get("full", 0) + 1
+        else:
+            counts["partial"] = counts.get("partial", 0) + 1
+        updated = bool(updated_data)
+
+        # the shot's Tasks may have been created by its TaskTemplate, so the
+        # exporters look them up from SG rather than from the prefetch
+        prefetch = self._get_prefetch()
+        if prefetch is not None and updated:
+            prefetch.drop_default_tasks({"type": shot_type, "id": shot_id})
+
+        # create the directory structure, along with the ones of the other
+        # shots of the export when they're created in bulk
+        filesystem_structure_batch = getattr(self, "_filesystem_structure_batch", None)
+        if filesystem_structure_batch is not None:
+            filesystem_structure_batch.add(shot_type, shot_id)
+        else:
+            self.app.execute_hook_method(
+                "hook_update_shot",
+                "create_filesystem_structure",
+                entity_type=shot_type,
+                entity_id=shot_id,
+                preset_properties=self._preset.properties(),
+                base_class=HieroUpdateShot,
+            )
 
         # return without error
         self.app.log_info("Updated %s %s" % (shot_type, self.shotName()))
@@ -310,7 +280,11 @@ class ShotgunShotUpdater(
         # create the CutItem with the data populated by the shot processor
         cut = None
 
-        if hasattr(self, "_cut_item_data"):
+        if hasattr(self, "_cut_item_data") and "id" in self._cut_item_data:
+            # the shot processor already created all of the cut items in bulk
+            cut = self._cut_item_data["cut"]
+
+        elif hasattr(self, "_cut_item_data"):
             cut_item_data = self._cut_item_data
             cut_item = self.app.execute_hook_method(
                 "hook_update_cuts",
@@ -346,6 +320,40 @@ class ShotgunShotUpdater(
         # return false to indicate success
         return False
 
+    def finishTask(self):
+        """
+        Called once the task is done. Releases the export's SG batch pipeline.
+        """
+        try:
+            FnShotExporter.ShotTask.finishTask(self)
+        finally:
+            try:
+                self._filesystem_structure_task_done()
+            finally:
+                # release the pipeline even if this task failed, the SG writes
+                # of the export are only committed once every task released it
+                self._release_batch_pipeline()
+
+    def forcedAbort(self):
+        """
+        Called when the task is cancelled. The filesystem structures of the
+        other shots of the export don't wait for this one.
+        """
+        try:
+            self._filesystem_structure_task_done()
+        finally:
+            ShotgunHieroObjectBase.forcedAbort(self)
+
+    def _filesystem_structure_task_done(self):
+        """
+        Signals the end of this task to the filesystem structure batch of the
+        export, if any, which creates the structures of the shots once every
+        shot updater task is done.
+        """
+        filesystem_structure_batch = getattr(self, "_filesystem_structure_batch", None)
+        if filesystem_structure_batch is not None:
+            filesystem_structure_batch.task_done(self)
+
     def is_cut_length_export(self):
         """
         Returns ``True`` if this task has the "Cut Length" option checked.
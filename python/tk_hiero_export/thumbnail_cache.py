@@ -0,0 +1,116 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import threading
+import collections
+
+from sgtk.platform.qt import QtCore
+
+
+# The width thumbnails are scaled down to before being uploaded.
+THUMBNAIL_WIDTH = 600
+
+# The maximum size of the encoded thumbnails held by a cache.
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def encode_thumbnail(qimage, image_format="jpg", quality=-1, width=THUMBNAIL_WIDTH):
+    """
+    Scales a thumbnail down and encodes it in memory.
+
+    :param qimage: The QImage to encode.
+    :param str image_format: The image format, ie. "jpg" or "png".
+    :param int quality: The compression quality, from 0 to 100. -1 uses the
+        default quality of the format.
+    :param int width: The width the image is scaled down to.
+
+    :returns: The encoded image.
+    :rtype: bytes
+    """
+    scaled = qimage.scaledToWidth(width, QtCore.Qt.SmoothTransformation)
+
+    data = QtCore.QByteArray()
+    buf = QtCore.QBuffer(data)
+    buf.open(QtCore.QIODevice.WriteOnly)
+    try:
+        if not scaled.save(buf, image_format.upper(), quality):
+            raise ValueError("Unable to encode the thumbnail as %s." % image_format)
+    finally:
+        buf.close()
+
+    return bytes(data.data())
+
+
+class ThumbnailCache(object):
+    """
+    Least recently used cache of the thumbnails pulled from Hiero during an
+    export, keyed by source guid, frame and width.
+
+    The thumbnails are stored scaled down and encoded, so that tasks using
+    the same frame of a source share a single compact copy rather than each
+    holding on to a full resolution QImage. The total size of the cached
+    thumbnails is capped, the least recently used ones being evicted first.
+    """
+
+    def __init__(self, image_format="jpg", quality=-1, max_bytes=DEFAULT_MAX_BYTES):
+        self._image_format = image_format
+        self._quality = quality
+        self._max_bytes = max_bytes
+        self._entries = collections.OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def image_format(self):
+        """The format the thumbnails are encoded in."""
+        return self._image_format
+
+    def get(self, source, frame, width=THUMBNAIL_WIDTH):
+        """
+        Returns a thumbnail of a Hiero source, pulling it from Hiero and
+        encoding it if it isn't cached already.
+
+        :param source: The Hiero clip or sequence.
+        :param int frame: The frame of the thumbnail.
+        :param int width: The width the thumbnail is scaled down to.
+
+        :returns: The encoded thumbnail.
+        :rtype: bytes
+        """
+        key = (source.guid(), frame, width)
+        with self._lock:
+            data = self._entries.pop(key, None)
+            if data is not None:
+                # re-insert as the most recently used
+                self._entries[key] = data
+                self.hits += 1
+                return data
+            self.misses += 1
+
+        data = encode_thumbnail(
+            source.thumbnail(frame), self._image_format, self._quality, width
+        )
+
+        with self._lock:
+            if key not in self._entries and len(data) <= self._max_bytes:
+                self._entries[key] = data
+                self._size += len(data)
+                while self._size > self._max_bytes:
+                    (_, evicted) = self._entries.popitem(last=False)
+                    self._size -= len(evicted)
+        return data
+
+    def clear(self):
+        """Drops all of the cached thumbnails."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
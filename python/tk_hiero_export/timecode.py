@@ -0,0 +1,160 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Formatting of frame numbers as SMPTE timecodes, as
+``hiero.core.Timecode.timeToString`` formats them with the
+``kDisplayTimecode`` and ``kDisplayDropFrameTimecode`` display types.
+
+The module doesn't depend on the Hiero API.
+"""
+
+# The frame rates timecodes are formatted at.
+FRAME_RATES = (23.976, 24.0, 25.0, 29.97, 30.0, 50.0, 59.94, 60.0)
+
+# The nominal rates of the drop frame timecodes, ie. 29.97 and 59.94. The
+# drop frame display type has no effect at the other rates.
+DROP_FRAME_RATES = (30, 60)
+
+# Reference timecodes, as (frame, fps, drop frame, timecode), worked out from
+# the SMPTE counting rules rather than captured from Hiero. Timecodes wrap
+# around after 24 hours, including for negative frames. Running
+# tests/hiero/capture_timecodes.py in a Hiero session prints the timecodes
+# formatted by hiero.core.Timecode.timeToString for the frames of this table
+# and more, to replace it with.
+REFERENCE_TIMECODES = (
+    (0, 23.976, False, "00:00:00:00"),
+    (86399, 23.976, False, "00:59:59:23"),
+    (86400, 24.0, False, "01:00:00:00"),
+    (90000, 25.0, False, "01:00:00:00"),
+    (89999, 25.0, False, "00:59:59:24"),
+    (107892, 29.97, True, "01:00:00;00"),
+    (108000, 29.97, False, "01:00:00:00"),
+    (1799, 29.97, True, "00:00:59;29"),
+    (1800, 29.97, True, "00:01:00;02"),
+    (17981, 29.97, True, "00:09:59;29"),
+    (17982, 29.97, True, "00:10:00;00"),
+    (25912062, 29.97, True, "00:10:00;00"),
+    (-1, 29.97, True, "23:59:59;29"),
+    (108000, 30.0, False, "01:00:00:00"),
+    (180000, 50.0, False, "01:00:00:00"),
+    (3599, 59.94, True, "00:00:59;59"),
+    (3600, 59.94, True, "00:01:00;04"),
+    (35963, 59.94, True, "00:09:59;59"),
+    (35964, 59.94, True, "00:10:00;00"),
+    (215784, 59.94, True, "01:00:00;00"),
+    (216000, 60.0, False, "01:00:00:00"),
+    (2073600, 24.0, False, "00:00:00:00"),
+    (20748345, 24.0, False, "00:08:34:09"),
+    (-1, 24.0, False, "23:59:59:23"),
+    (-86401, 24.0, False, "22:59:59:23"),
+    (1800, 23.976, True, "00:01:15:00"),
+    (-1, 59.94, True, "23:59:59;59"),
+)
+
+
+class TimecodeFormatter(object):
+    """
+    Formats frame numbers as the timecodes of a frame rate. Formatters hold
+    no state besides the constants of their frame rate, and may be shared
+    between threads.
+    """
+
+    def __init__(self, fps, drop_frame=False):
+        """
+        :param float fps: The frame rate, ie. 23.976.
+        :param bool drop_frame: Whether to format drop frame timecodes, at
+            29.97 and 59.94.
+        """
+        self.rate = int(round(fps))
+        if self.rate <= 0:
+            raise ValueError("Invalid frame rate: %s" % fps)
+
+        self.drop_frame = bool(drop_frame) and self.rate in DROP_FRAME_RATES
+        self._separator = ";" if self.drop_frame else ":"
+
+        # the frames dropped at the start of each minute, except every tenth
+        self._dropped = self.rate // 15 if self.drop_frame else 0
+        self._per_minute = self.rate * 60 - self._dropped
+        self._per_ten_minutes = self._per_minute * 10 + self._dropped
+        # timecodes wrap around after 24 hours
+        self._per_day = self._per_ten_minutes * 6 * 24
+
+    def format(self, frame):
+        """Returns the timecode of a frame number."""
+        frame = int(frame) % self._per_day
+
+        if self.drop_frame:
+            # add the frame numbers skipped by the timecodes up to the frame
+            (tens, remainder) = divmod(frame, self._per_ten_minutes)
+            frame += self._dropped * 9 * tens
+            if remainder > self._dropped:
+                frame += self._dropped * (
+                    (remainder - self._dropped) // self._per_minute
+                )
+
+        (seconds, frames) = divmod(frame, self.rate)
+        (minutes, seconds) = divmod(seconds, 60)
+        (hours, minutes) = divmod(minutes, 60)
+        return "%02d:%02d:%02d%s%02d" % (
+            hours,
+            minutes,
+            seconds,
+            self._separator,
+            frames,
+        )
+
+
+# The formatters of the frame rates, shared by the exports. They're
+# stateless, so one built twice by concurrent exports is harmless.
+_formatters = {}
+
+
+def get_formatter(fps, drop_frame=False):
+    """Returns the shared :class:`TimecodeFormatter` of a frame rate."""
+    key = (round(float(fps), 3), bool(drop_frame))
+    formatter = _formatters.get(key)
+    if formatter is None:
+        formatter = _formatters[key] = TimecodeFormatter(fps, drop_frame)
+    return formatter
+
+
+def frame_to_timecode(frame, fps, drop_frame=False):
+    """
+    Returns the timecode of a frame number.
+
+    :param int frame: The frame number.
+    :param float fps: The frame rate.
+    :param bool drop_frame: Whether to format a drop frame timecode.
+    """
+    return get_formatter(fps, drop_frame).format(frame)
+
+
+def validate(time_to_string=None):
+    """
+    Checks the timecodes formatted by the module against the
+    ``REFERENCE_TIMECODES``, or against the ones formatted by
+    ``time_to_string`` for the frames of the table when given.
+
+    :param time_to_string: A callable taking a frame, fps and drop frame
+        flag and returning a timecode, ie. a wrapper of
+        ``hiero.core.Timecode.timeToString`` in a Hiero session.
+
+    :returns: The list of mismatches, as (frame, fps, drop frame, timecode,
+        expected timecode) tuples. Empty when all of the timecodes match.
+    """
+    mismatches = []
+    for (frame, fps, drop_frame, expected) in REFERENCE_TIMECODES:
+        if time_to_string is not None:
+            expected = time_to_string(frame, fps, drop_frame)
+        timecode = TimecodeFormatter(fps, drop_frame).format(frame)
+        if timecode != expected:
+            mismatches.append((frame, fps, drop_frame, timecode, expected))
+    return mismatches
@@ -0,0 +1,173 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import os
+import json
+import time
+import functools
+import threading
+import contextlib
+
+
+# The methods of an export task traced by :func:`traced_task`.
+TASK_METHODS = ("startTask", "taskStep", "finishTask")
+
+
+class ExportTracer(object):
+    """
+    Records timed spans over the lifecycle of an export: the processing of
+    the export, the steps of its tasks, the hooks they run and their SG
+    requests.
+
+    The spans are saved in the Chrome trace event format, which can be
+    loaded in ``chrome://tracing`` or https://ui.perfetto.dev, each thread
+    of the export being shown on its own row.
+    """
+
+    def __init__(self):
+        # the time the export started, and the origin of the spans
+        self.started = time.time()
+        self._origin = time.perf_counter()
+        self._events = []
+        self._threads = set()
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def span(self, name, category, **args):
+        """
+        Context manager recording a span over the code it runs.
+
+        :param str name: The name of the span.
+        :param str category: The category of the span, ie. ``export``,
+            ``task``, ``hook`` or ``sg``.
+        :param args: Extra values shown with the span.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_span(name, category, start, time.perf_counter() - start, args)
+
+    def add_span(self, name, category, start, duration, args=None):
+        """
+        Records a span on the current thread.
+
+        :param str name: The name of the span.
+        :param str category: The category of the span.
+        :param float start: The ``time.perf_counter()`` the span started at.
+        :param float duration: The duration of the span, in seconds.
+        :param dict args: Extra values shown with the span.
+        """
+        thread = threading.current_thread()
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": (start - self._origin) * 1e6,
+            "dur": duration * 1e6,
+            "pid": os.getpid(),
+            "tid": thread.ident,
+        }
+        if args:
+            event["args"] = dict((k, _arg(v)) for (k, v) in args.items())
+
+        with self._lock:
+            if thread.ident not in self._threads:
+                self._threads.add(thread.ident)
+                self._events.append(
+                    {
+                        "name": "thread_name",
+                        "ph": "M",
+                        "pid": event["pid"],
+                        "tid": thread.ident,
+                        "args": {"name": thread.name},
+                    }
+                )
+            self._events.append(event)
+
+    def save(self, path):
+        """
+        Writes the recorded spans as a Chrome trace JSON file.
+
+        :param str path: The path of the file.
+        """
+        with self._lock:
+            events = list(self._events)
+        folder = os.path.dirname(path)
+        if folder and not os.path.isdir(folder):
+            os.makedirs(folder)
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+def trace_span(app, name, category, **args):
+    """
+    Returns a context manager recording a span on the tracer of the app's
+    ``export_session``, doing nothing when no export is being traced.
+    """
+    session = getattr(app, "export_session", None)
+    tracer = session.tracer if session is not None else None
+    if tracer is None:
+        return contextlib.nullcontext()
+    return tracer.span(name, category, **args)
+
+
+def traced_method(category):
+    """
+    Decorator recording a span over each call to a method of an object
+    having an ``app``, on the tracer of the app's ``export_session``.
+    """
+
+    def decorator(method):
+        @functools.wraps(method)
+        def traced(self, *args, **kwargs):
+            with trace_span(self.app, method.__name__, category):
+                return method(self, *args, **kwargs)
+
+        return traced
+
+    return decorator
+
+
+def traced_task(cls):
+    """
+    Class decorator recording a ``task`` span over each call to the
+    ``startTask``, ``taskStep`` and ``finishTask`` methods of an export task
+    class, including the ones it inherits, on the tracer of the app's
+    ``export_session``.
+    """
+    for method_name in TASK_METHODS:
+        method = getattr(cls, method_name, None)
+        if method is not None:
+            setattr(cls, method_name, _traced_task_method(method))
+    return cls
+
+
+def _traced_task_method(method):
+    """Returns a task method running in a ``task`` span when traced."""
+
+    @functools.wraps(method)
+    def traced(self, *args, **kwargs):
+        with trace_span(
+            self.app,
+            "%s.%s" % (type(self).__name__, method.__name__),
+            "task",
+            shot=self.shotName(),
+        ):
+            return method(self, *args, **kwargs)
+
+    return traced
+
+
+def _arg(value):
+    """Returns a span argument as a value the JSON encoder can handle."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
@@ -0,0 +1,469 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import os
+import time
+import shutil
+import hashlib
+import tempfile
+import threading
+import queue
+
+from .thumbnail_cache import encode_thumbnail
+
+
+# The number of upload threads used when not configured by the app settings.
+DEFAULT_WORKER_COUNT = 4
+
+
+def remove_temp_dir(app, path):
+    """
+    Removes a temporary directory created for an upload.
+
+    Sometimes Windows holds on to the temporary file longer than expected
+    which can cause an exception here. If we wait a second and try again,
+    this usually solves the issue.
+    """
+    try:
+        shutil.rmtree(path)
+    except Exception:
+        app.log_error("Error removing temporary file, trying again.")
+        time.sleep(1.0)
+        shutil.rmtree(path)
+
+
+def _entity_link(entity):
+    """
+    Returns the type, id and name of an entity to upload to. Uploads run after
+    they're queued, by which time the caller may have modified its entity
+    dictionary, as the shot updater does.
+    """
+    link = {"type": entity["type"], "id": entity["id"]}
+    if entity.get("name"):
+        link["name"] = entity["name"]
+    return link
+
+
+class _UploadJob(object):
+    """An upload queued on the :class:`UploadService`."""
+
+    def __init__(
+        self, entity, description, size, upload, cleanup_dir=None, digest=None
+    ):
+        self.entity = entity
+        # what is uploaded, for logging. ie. the path of the file
+        self.description = description
+        self.size = size
+        self.upload = upload
+        self.cleanup_dir = cleanup_dir
+        # content hash of the uploaded thumbnail, if other entities may share it
+        self.digest = digest
+        self.shared = False
+
+
+class UploadService(object):
+    """
+    Uploads thumbnails and review media to ShotGrid from a bounded pool of
+    background threads, so that export tasks can queue their uploads and
+    finish without waiting for the HTTP transfers.
+
+    Each worker thread uses its own ShotGrid connection, from the app's
+    :class:`ConnectionPool`. The service keeps
+    track of the submitted, completed and failed uploads which are reported
+    once the export is done, see :meth:`finish`.
+
+    Thumbnails are deduplicated by content: the first entity queued with a
+    given image uploads it, and every other entity queued with the same
+    image shares that thumbnail instead of uploading the file again.
+    Thumbnails encoded in memory are written to a scratch file reused by
+    each thread, as the ShotGrid API uploads from a path.
+
+    With a worker count of 0, uploads run synchronously in the calling
+    thread through the app's connection, which is the behavior used outside
+    of an export.
+    """
+
+    def __init__(self, app, connection_pool, worker_count=DEFAULT_WORKER_COUNT):
+        self._app = app
+        self._connection_pool = connection_pool
+        self._worker_count = worker_count
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._workers = []
+        self._submitted = 0
+        self._completed = 0
+        self._shared = 0
+        self._bytes = 0
+        self._failures = []
+        # content hash -> {"source": uploaded entity, "waiting": [jobs]}
+        self._thumbnails = {}
+        self._scratch_dir = None
+        self._scratch = threading.local()
+
+    def upload_thumbnail_image(self, entity, qimage):
+        """
+        Scale down and encode a thumbnail in memory, using the thumbnail format
+        and quality of the app settings, then queue its upload.
+
+        :param dict entity: The entity receiving the thumbnail.
+        :param qimage: The QImage to upload.
+        """
+        image_format = self._app.get_setting("thumbnail_format")
+        data = encode_thumbnail(
+            qimage, image_format, self._app.get_setting("thumbnail_quality")
+        )
+        self.upload_thumbnail_data(entity, data, image_format)
+
+    def upload_thumbnail_data(self, entity, data, image_format):
+        """
+        Queue the upload of an encoded thumbnail for an entity. If the same
+        image has already been queued for another entity, its thumbnail is
+        shared rather than uploaded again.
+
+        :param dict entity: The entity receiving the thumbnail.
+        :param bytes data: The encoded image.
+        :param str image_format: The image format, used as the file extension.
+        """
+        entity = _entity_link(entity)
+
+        def upload(sg):
+            path = self._scratch_file(image_format)
+            with open(path, "wb") as fh:
+                fh.write(data)
+            sg.upload_thumbnail(entity["type"], entity["id"], path)
+
+        self._submit_thumbnail(
+            _UploadJob(
+                entity,
+                "%s thumbnail" % image_format,
+                len(data),
+                upload,
+                digest=hashlib.sha1(data).hexdigest(),
+            )
+        )
+
+    def upload_thumbnail(self, entity, path, cleanup_dir=None):
+        """
+        Queue a thumbnail upload for an entity. If the same image has already
+        been queued for another entity, its thumbnail is shared rather than
+        uploaded again.
+
+        :param dict entity: The entity receiving the thumbnail.
+        :param str path: The path to the image file.
+        :param str cleanup_dir: Optional temporary directory to remove once
+            the upload is done.
+        """
+        entity = _entity_link(entity)
+        try:
+            digest = self._hash_file(path)
+            size = os.path.getsize(path)
+        except Exception:
+            (digest, size) = (None, 0)
+
+        self._submit_thumbnail(
+            _UploadJob(
+                entity,
+                path,
+                size,
+                lambda sg: sg.upload_thumbnail(entity["type"], entity["id"], path),
+                cleanup_dir,
+                digest,
+            )
+        )
+
+    def upload(self, entity, path, field_name, cleanup_dir=None):
+        """
+        Queue a file upload to a field of an entity, ie. the quicktime of a
+        Version uploaded to ``sg_uploaded_movie``.
+
+        :param dict entity: The entity receiving the file.
+        :param str path: The path to the file to upload.
+        :param str field_name: The field the file is uploaded to.
+        :param str cleanup_dir: Optional temporary directory to remove once
+            the upload is done.
+        """
+        entity = _entity_link(entity)
+        self._submit(
+            _UploadJob(
+                entity,
+                path,
+                os.path.getsize(path),
+                lambda sg: sg.upload(entity["type"], entity["id"], path, field_name),
+                cleanup_dir,
+            )
+        )
+
+    def wait(self):
+        """Blocks until all of the queued uploads are done."""
+        self._queue.join()
+
+    def finish(self, wait=True):
+        """
+        Called once the export is done. Reports on the uploads once they're
+        all done, either blocking until then or from a background thread.
+
+        :param bool wait: True to block until all of the uploads are done.
+        """
+        if wait:
+            self._wait_and_report()
+        else:
+            thread = threading.Thread(target=self._wait_and_report)
+            thread.daemon = True
+            thread.start()
+
+    def summary(self):
+        """
+        Returns a one line summary of the uploads made so far.
+
+        :rtype: str
+        """
+        with self._lock:
+            return (
+                "%d of %d upload(s) to ShotGrid completed (%.1f MB, %d shared "
+                "thumbnail(s)), %d failed."
+                % (
+                    self._completed,
+                    self._submitted,
+                    self._bytes / (1024.0 * 1024.0),
+                    self._shared,
+                    len(self._failures),
+                )
+            )
+
+    def _submit(self, job, count=True):
+        """Queue an upload job, or run it right away if there are no workers."""
+        if count:
+            with self._lock:
+                self._submitted += 1
+
+        if self._worker_count <= 0:
+            self._run(self._app.shotgun, job)
+            return
+
+        self._app.log_debug(
+            "Queueing upload of %s for %s %s"
+            % (job.description, job.entity["type"], job.entity["id"])
+        )
+        self._start_workers()
+        self._queue.put(job)
+
+    def _submit_thumbnail(self, job):
+        """
+        Queue a thumbnail upload job, unless the same image was queued before
+        in which case the job either shares the uploaded thumbnail or waits
+        on the upload to be done.
+        """
+        source = None
+        if job.digest is not None:
+            with self._lock:
+                record = self._thumbnails.get(job.digest)
+                if record is None:
+                    self._thumbnails[job.digest] = {"source": None, "waiting": []}
+                elif record["source"] is None:
+                    # the image is still being uploaded for another entity
+                    record["waiting"].append(job)
+                    self._submitted += 1
+                    return
+                else:
+                    source = record["source"]
+
+        if source is not None:
+            job = self._share_job(job, source)
+
+        self._submit(job)
+
+    def _share_job(self, job, source):
+        """
+        Turns a thumbnail upload job into one sharing the thumbnail already
+        uploaded for the source entity. Sharing falls back to uploading the
+        image, ie. if the source thumbnail hasn't been processed yet.
+        """
+        entity = job.entity
+
+        def share(sg):
+            try:
+                sg.share_thumbnail([entity], source_entity=source)
+            except Exception as e:
+                self._app.log_debug(
+                    "Unable to share the thumbnail of %s %s, uploading it: %s"
+                    % (source["type"], source["id"], e)
+                )
+                job.upload(sg)
+
+        shared_job = _UploadJob(
+            entity, job.description, job.size, share, job.cleanup_dir
+        )
+        shared_job.shared = True
+        return shared_job
+
+    def _thumbnail_done(self, job, success):
+        """
+        Called once the upload of a deduplicated thumbnail is done. The jobs
+        waiting on it share the uploaded thumbnail, or are queued again if
+        the upload failed.
+        """
+        with self._lock:
+            record = self._thumbnails.get(job.digest)
+            if record is None or record["source"] is not None:
+                return
+            (waiting, record["waiting"]) = (record["waiting"], [])
+            if success:
+                record["source"] = {"type": job.entity["type"], "id": job.entity["id"]}
+            else:
+                del self._thumbnails[job.digest]
+
+        if success:
+            for waiting_job in waiting:
+                self._submit(self._share_job(waiting_job, record["source"]), False)
+        elif waiting:
+            # the first waiting job retries the upload, the others wait on it
+            with self._lock:
+                self._thumbnails[job.digest] = {
+                    "source": None,
+                    "waiting": waiting[1:],
+                }
+            self._submit(waiting[0], False)
+
+    @staticmethod
+    def _hash_file(path):
+        """Returns the hash of the contents of a file."""
+        with open(path, "rb") as fh:
+            return hashlib.sha1(fh.read()).hexdigest()
+
+    def _scratch_file(self, extension):
+        """
+        Returns the path of the scratch file of the calling thread, which is
+        reused for every in-memory thumbnail it uploads.
+        """
+        with self._lock:
+            if self._scratch_dir is None:
+                self._scratch_dir = tempfile.mkdtemp(prefix="hiero_thumbnails_")
+            scratch_dir = self._scratch_dir
+
+        paths = getattr(self._scratch, "paths", None)
+        if paths is None:
+            paths = self._scratch.paths = {}
+        if (scratch_dir, extension) not in paths:
+            paths[(scratch_dir, extension)] = os.path.join(
+                scratch_dir,
+                "thumbnail_%s.%s" % (threading.current_thread().ident, extension),
+            )
+        return paths[(scratch_dir, extension)]
+
+    def _remove_scratch_dir(self):
+        """Removes the scratch files once no upload is running anymore."""
+        with self._lock:
+            (scratch_dir, self._scratch_dir) = (self._scratch_dir, None)
+        if scratch_dir:
+            try:
+                remove_temp_dir(self._app, scratch_dir)
+            except Exception:
+                self._app.log_debug(
+                    "Unable to remove temporary directory %s" % scratch_dir
+                )
+
+    def _start_workers(self):
+        """Starts the upload threads if they aren't running already."""
+        with self._lock:
+            self._workers = [w for w in self._workers if w.is_alive()]
+            while len(self._workers) < self._worker_count:
+                worker = threading.Thread(target=self._work)
+                worker.daemon = True
+                worker.start()
+                self._workers.append(worker)
+
+    def _stop_workers(self):
+        """Asks the upload threads to exit once the queue has been drained."""
+        with self._lock:
+            workers = self._workers
+            self._workers = []
+        for _ in workers:
+            self._queue.put(None)
+
+    def _work(self):
+        """Upload thread main loop."""
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                with self._connection_pool.connection() as sg:
+                    self._run(sg, job)
+            except Exception as e:
+                # failing to connect. the job is reported as failed.
+                self._record_failure(job, e)
+                if job.digest is not None:
+                    self._thumbnail_done(job, False)
+            finally:
+                self._queue.task_done()
+
+    def _run(self, sg, job):
+        """Runs an upload job and records its outcome."""
+        entity = job.entity
+        success = False
+        try:
+            job.upload(sg)
+        except Exception as e:
+            self._record_failure(job, e)
+        else:
+            success = True
+            with self._lock:
+                self._completed += 1
+                if job.shared:
+                    self._shared += 1
+                else:
+                    self._bytes += job.size
+                progress = (self._completed, self._submitted)
+            self._app.log_debug(
+                "%s %s for %s %s (%d/%d)"
+                % (
+                    ("Shared" if job.shared else "Uploaded", job.description)
+                    + (entity["type"], entity["id"])
+                    + progress
+                )
+            )
+        finally:
+            if job.cleanup_dir:
+                try:
+                    remove_temp_dir(self._app, job.cleanup_dir)
+                except Exception:
+                    self._app.log_debug(
+                        "Unable to remove temporary directory %s" % job.cleanup_dir
+                    )
+
+        if job.digest is not None:
+            self._thumbnail_done(job, success)
+
+    def _record_failure(self, job, error):
+        entity = job.entity
+        with self._lock:
+            self._failures.append((entity, job.description, error))
+        self._app.log_info(
+            "Upload of %s for %s %s (#%s) to ShotGrid failed: %s"
+            % (job.description, entity["type"], entity.get("name"), entity["id"], error)
+        )
+
+    def _wait_and_report(self):
+        """Waits for the queued uploads and logs the summary."""
+        self.wait()
+        self._stop_workers()
+        self._remove_scratch_dir()
+        with self._lock:
+            # every thumbnail has been uploaded or shared by now
+            self._thumbnails.clear()
+
+        self._app.log_info(self.summary())
+        with self._lock:
+            failures = list(self._failures)
+        for (entity, description, error) in failures:
+            self._app.log_warning(
+                "Failed to upload %s for %s %s: %s"
+                % (description, entity["type"], entity["id"], error)
+            )
@@ -9,7 +9,6 @@
 # not expressly granted therein are reserved by Shotgun Software Inc.
 
 import os
-import ast
 import sys
 import shutil
 import tempfile
@@ -29,6 +28,7 @@ import sgtk.util
 from sgtk.platform.qt import QtGui, QtCore
 
 from .base import ShotgunHieroObjectBase
+from .tracing import traced_task
 from .collating_exporter import CollatingExporter, CollatedShotPreset
 
 from . import (
@@ -118,6 +118,7 @@ class ShotgunTranscodeExporterUI(
             layout.addWidget(custom_widget)
 
 
+@traced_task
 class ShotgunTranscodeExporter(
     ShotgunHieroObjectBase, FnTranscodeExporter.TranscodeExporter, CollatingExporter
 ):
@@ -322,17 +323,13 @@ class ShotgunTranscodeExporter(
         ##############################
         # see if we get a task to use
         self._sg_task = None
-        try:
-            task_filter = self.app.get_setting("default_task_filter", "[]")
-            task_filter = ast.literal_eval(task_filter)
-            task_filter.append(["entity", "is", self._sg_shot])
+        # an invalid filter is reported once, when the preset is compiled
+        task_filter = self._get_compiled_preset().task_filter
+        if task_filter is not None:
+            task_filter = list(task_filter) + [["entity", "is", self._sg_shot]]
             tasks = self.app.shotgun.find("Task", task_filter)
             if len(tasks) == 1:
                 self._sg_task = tasks[0]
-        except ValueError:
-            # continue without task
-            setting = self.app.get_setting("default_task_filter", "[]")
-            self.app.log_error("Invalid value for 'default_task_filter': %s" % setting)
 
         if self._preset.properties()["create_version"]:
             # lookup current login
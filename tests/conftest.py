@@ -0,0 +1,35 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+
+"""
+Fixtures of the tests, which run against the headless stand-ins of the Hiero
+and Toolkit APIs and a fake SG site. See :mod:`tests.headless`.
+"""
+
+import pytest
+
+from tests.headless import harness, standin
+from tests.headless.fake_shotgun import FakeShotgun
+
+# makes the tk_hiero_export package importable by the tests
+harness.load_app_module()
+
+
+@pytest.fixture
+def sg():
+    """A fake SG site holding the current user."""
+    return FakeShotgun(entities=[dict(standin.CURRENT_USER)])
+
+
+@pytest.fixture
+def app(sg):
+    """The app, with its default settings, talking to the fake SG site."""
+    return harness.create_app(shotgun=sg)
@@ -0,0 +1,378 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+End to end benchmark of an export of a synthetic sequence, run from the root
+of the app with a plain Python interpreter::
+
+    python -m tests.headless.benchmark --shots 200 --tracks 3 --latency 0.05
+
+The export goes through the shot processor, the shot updater and the copy
+exporter against a :class:`~tests.headless.fake_shotgun.FakeShotgun`. The
+wall time, SG requests, bytes copied and uploaded and the peak Python memory
+are reported for each stage of the export:
+
+- ``prefetch``: the SG prefetch made while the export dialog is open.
+- ``start_processing``: the creation of the tasks, including ``pre_queue``.
+- ``pre_queue``: the pre-processing of the tasks, ie. the Cut creation.
+- ``tasks``: the run of the tasks, including ``commit`` and ``finish``.
+- ``commit``: the batched SG writes of the shots, each committed once the
+  last task of the shot is done, and their post creation steps.
+- ``finish``: the end of the export, once the last task is done, including
+  the wait for the uploads.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+import resource
+import tracemalloc
+import contextlib
+import collections
+
+from . import harness, standin, synthetic
+from .fake_shotgun import FakeShotgun
+
+
+class Stage(object):
+    """The measures of a stage of the export."""
+
+    def __init__(self, name, depth):
+        self.name = name
+        self.depth = depth
+        self.wall_time = 0.0
+        self.requests = collections.Counter()
+        self.bytes_copied = 0
+        self.bytes_uploaded = 0
+        self.peak_memory = 0
+
+    def as_dict(self):
+        return {
+            "name": self.name,
+            "depth": self.depth,
+            "wall_time": self.wall_time,
+            "requests": dict(self.requests),
+            "bytes_copied": self.bytes_copied,
+            "bytes_uploaded": self.bytes_uploaded,
+            "peak_memory": self.peak_memory,
+        }
+
+
+class StageMeter(object):
+    """
+    Measures the stages of an export. Stages can be nested, the measures of
+    a stage then include those of the stages it contains. The measures of a
+    merged stage run more than once are added up.
+    """
+
+    def __init__(self, shotgun, trace_memory=True):
+        self._shotgun = shotgun
+        self._trace_memory = trace_memory
+        self._stack = []
+        self.stages = []
+        self.bytes_copied = 0
+
+    @contextlib.contextmanager
+    def stage(self, name, merge=False):
+        stage = Stage(name, len(self._stack))
+        merged = None
+        if merge:
+            merged = next(
+                (s for s in self.stages if (s.name, s.depth) == (name, stage.depth)),
+                None,
+            )
+        if merged is None:
+            self.stages.append(stage)
+        if self._trace_memory:
+            if self._stack:
+                parent = self._stack[-1]
+                parent.peak_memory = max(
+                    parent.peak_memory, tracemalloc.get_traced_memory()[1]
+                )
+            tracemalloc.reset_peak()
+        self._stack.append(stage)
+
+        calls = collections.Counter(self._shotgun.calls)
+        uploaded = self._shotgun.uploaded_bytes
+        copied = self.bytes_copied
+        start = time.perf_counter()
+        try:
+            yield stage
+        finally:
+            stage.wall_time = time.perf_counter() - start
+            stage.requests = collections.Counter(self._shotgun.calls) - calls
+            stage.bytes_uploaded = self._shotgun.uploaded_bytes - uploaded
+            stage.bytes_copied = self.bytes_copied - copied
+            self._stack.pop()
+            if self._trace_memory:
+                stage.peak_memory = max(
+                    stage.peak_memory, tracemalloc.get_traced_memory()[1]
+                )
+                if self._stack:
+                    parent = self._stack[-1]
+                    parent.peak_memory = max(parent.peak_memory, stage.peak_memory)
+            if merged is not None:
+                merged.wall_time += stage.wall_time
+                merged.requests += stage.requests
+                merged.bytes_uploaded += stage.bytes_uploaded
+                merged.bytes_copied += stage.bytes_copied
+                merged.peak_memory = max(merged.peak_memory, stage.peak_memory)
+
+    def wrap(self, name, fn, merge=False):
+        """Returns a callable running ``fn`` as a stage."""
+
+        def wrapper(*args, **kwargs):
+            with self.stage(name, merge):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    @contextlib.contextmanager
+    def count_copies(self):
+        """Counts the bytes copied through ``shutil.copy2``."""
+        copy2 = shutil.copy2
+
+        def counting_copy2(src, dst, *args, **kwargs):
+            result = copy2(src, dst, *args, **kwargs)
+            self.bytes_copied += os.path.getsize(result)
+            return result
+
+        shutil.copy2 = counting_copy2
+        try:
+            yield
+        finally:
+            shutil.copy2 = copy2
+
+
+def run(
+    shots=50,
+    tracks=2,
+    overlap=0.5,
+    frames=24,
+    handles=10,
+    frame_bytes=4096,
+    latency=0.0,
+    prefetch=True,
+    trace_memory=True,
+    thumbnail_size=None,
+    settings=None,
+    work_dir=None,
+):
+    """
+    Builds a synthetic sequence and exports it, measuring each stage.
+
+    :returns: A dictionary with the ``parameters`` of the run, its
+        ``stages``, the number of ``shots``, ``items`` and ``tasks``, the
+        ``errors`` of the failed tasks and the ``max_rss`` of the process in
+        kilobytes.
+    """
+    parameters = dict(locals())
+
+    harness.load_app_module()
+    from tk_hiero_export import ShotgunShotProcessor
+    from tk_hiero_export.sg_batch import BatchPipeline
+    from tk_hiero_export.export_session import ExportSession
+
+    own_work_dir = work_dir is None
+    if own_work_dir:
+        work_dir = tempfile.mkdtemp(prefix="tk-hiero-export-benchmark-")
+
+    shotgun = FakeShotgun(latency=latency, entities=[standin.CURRENT_USER])
+    app = harness.create_app(settings, shotgun)
+    sequence = synthetic.build_sequence(
+        os.path.join(work_dir, "source"),
+        shots=shots,
+        tracks=tracks,
+        overlap=overlap,
+        frames=frames,
+        handles=handles,
+        frame_bytes=frame_bytes,
+    )
+    preset = harness.create_preset(os.path.join(work_dir, "export"))
+
+    # the size of the frames the thumbnails are made from
+    default_thumbnail_size = standin.THUMBNAIL_SIZE
+    if thumbnail_size is not None:
+        standin.THUMBNAIL_SIZE = thumbnail_size
+
+    if trace_memory:
+        tracemalloc.start()
+    meter = StageMeter(shotgun, trace_memory)
+
+    # the pipeline of a shot is committed by its last task to finish, and
+    # the session by the last task of the export
+    commit = BatchPipeline.commit
+    BatchPipeline.commit = lambda pipeline: meter.wrap("commit", commit, True)(pipeline)
+    finish = ExportSession.finish
+    ExportSession.finish = lambda session: meter.wrap("finish", finish)(session)
+
+    # the tasks print the data they publish
+    try:
+        with meter.count_copies(), contextlib.redirect_stdout(open(os.devnull, "w")):
+            if prefetch:
+                with meter.stage("prefetch"):
+                    harness.prefetch(app, sequence)
+
+            processor = ShotgunShotProcessor(preset)
+            processor.processTaskPreQueue = meter.wrap(
+                "pre_queue", processor.processTaskPreQueue
+            )
+            with meter.stage("start_processing"):
+                processor.startProcessing([harness.hiero.core.ItemWrapper(sequence)])
+
+            with meter.stage("tasks"):
+                errors = harness.run_tasks(processor)
+    finally:
+        BatchPipeline.commit = commit
+        ExportSession.finish = finish
+        standin.THUMBNAIL_SIZE = default_thumbnail_size
+        if trace_memory:
+            tracemalloc.stop()
+        if own_work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        "parameters": parameters,
+        "shots": shots,
+        "items": synthetic.count_items(sequence),
+        "tasks": sum(len(g.children()) for g in processor._submission.children()),
+        "stages": [stage.as_dict() for stage in meter.stages],
+        "errors": ["%s: %s" % (task.shotName(), error) for (task, error) in errors],
+        "max_rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def format_report(result):
+    """Returns the report of a run as a table."""
+    lines = [
+        "%(shots)d shot(s), %(items)d item(s), %(tasks)d task(s)" % result,
+        "",
+        "%-20s %10s %10s %12s %12s %12s"
+        % ("stage", "wall (s)", "SG calls", "copied", "uploaded", "peak mem"),
+    ]
+    for stage in result["stages"]:
+        lines.append(
+            "%-20s %10.3f %10d %12s %12s %12s"
+            % (
+                "  " * stage["depth"] + stage["name"],
+                stage["wall_time"],
+                sum(stage["requests"].values()),
+                _format_bytes(stage["bytes_copied"]),
+                _format_bytes(stage["bytes_uploaded"]),
+                _format_bytes(stage["peak_memory"]) if stage["peak_memory"] else "-",
+            )
+        )
+
+    lines.append("")
+    for stage in result["stages"]:
+        if stage["requests"]:
+            lines.append(
+                "%s requests: %s"
+                % (
+                    stage["name"],
+                    ", ".join(
+                        "%s %d" % item
+                        for item in sorted(
+                            stage["requests"].items(), key=lambda i: -i[1]
+                        )
+                    ),
+                )
+            )
+    total = sum(
+        sum(s["requests"].values()) for s in result["stages"] if s["depth"] == 0
+    )
+    lines.append(
+        "%d SG request(s), %.1f per shot, max RSS %s"
+        % (
+            total,
+            total / float(result["shots"] or 1),
+            _format_bytes(result["max_rss"] * 1024),
+        )
+    )
+    for error in result["errors"]:
+        lines.append("error: %s" % error)
+    return "\n".join(lines)
+
+
+def _format_bytes(count):
+    for unit in ("B", "KB", "MB"):
+        if count < 1024:
+            return "%d%s" % (count, unit)
+        count /= 1024.0
+    return "%.1fGB" % count
+
+
+def _parse_size(value):
+    try:
+        (width, height) = [int(v) for v in value.lower().split("x")]
+    except ValueError:
+        raise argparse.ArgumentTypeError("Invalid size: %s" % value)
+    return (width, height)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--shots", type=int, default=50)
+    parser.add_argument("--tracks", type=int, default=2)
+    parser.add_argument(
+        "--overlap",
+        type=float,
+        default=0.5,
+        help="The chance for each shot to be overlapped on each other track.",
+    )
+    parser.add_argument("--frames", type=int, default=24, help="Frames per shot.")
+    parser.add_argument("--handles", type=int, default=10)
+    parser.add_argument("--frame-bytes", type=int, default=4096)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Seconds per SG request."
+    )
+    parser.add_argument(
+        "--no-prefetch", action="store_true", help="Skip the dialog's prefetch."
+    )
+    parser.add_argument(
+        "--no-memory", action="store_true", help="Don't trace memory allocations."
+    )
+    parser.add_argument(
+        "--thumbnail-size",
+        type=_parse_size,
+        help="The size of the frames thumbnails are made from, ie. 3840x2160.",
+    )
+    parser.add_argument("--json", help="Write the results to this file.")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING)
+
+    result = run(
+        shots=args.shots,
+        tracks=args.tracks,
+        overlap=args.overlap,
+        frames=args.frames,
+        handles=args.handles,
+        frame_bytes=args.frame_bytes,
+        latency=args.latency,
+        prefetch=not args.no_prefetch,
+        trace_memory=not args.no_memory,
+        thumbnail_size=args.thumbnail_size,
+    )
+    print(format_report(result))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+    return 1 if result["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
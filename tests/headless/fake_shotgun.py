@@ -0,0 +1,643 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import os
+import copy
+import json
+import time
+import threading
+import collections
+
+
+# The methods which are served from a recording.
+RECORDED_METHODS = (
+    "find",
+    "find_one",
+    "create",
+    "update",
+    "delete",
+    "batch",
+    "upload",
+    "upload_thumbnail",
+    "share_thumbnail",
+    "schema_field_read",
+)
+
+# The arguments of the recorded methods, in order.
+_SIGNATURES = {
+    "find": (
+        "entity_type",
+        "filters",
+        "fields",
+        "order",
+        "filter_operator",
+        "limit",
+    ),
+    "find_one": ("entity_type", "filters", "fields", "order", "filter_operator"),
+    "create": ("entity_type", "data", "return_fields"),
+    "update": ("entity_type", "entity_id", "data", "multi_entity_update_modes"),
+    "delete": ("entity_type", "entity_id"),
+    "batch": ("requests",),
+    "upload": (
+        "entity_type",
+        "entity_id",
+        "path",
+        "field_name",
+        "display_name",
+        "tag_list",
+    ),
+    "upload_thumbnail": ("entity_type", "entity_id", "path"),
+    "share_thumbnail": (
+        "entities",
+        "thumbnail_path",
+        "source_entity",
+        "filmstrip_thumbnail",
+    ),
+    "schema_field_read": ("entity_type", "field_name", "project_entity"),
+}
+
+# The arguments which aren't part of the key a recorded request is replayed
+# for, as they differ from one export to the next: the uploaded files live in
+# temporary directories.
+_IGNORED_ARGUMENTS = ("path", "thumbnail_path")
+
+# The schema of the fields the export reads, used when no schema is given.
+DEFAULT_SCHEMA = {
+    "Cut": {
+        "sg_cut_type": {
+            "data_type": {"value": "list"},
+            "properties": {"valid_values": {"value": ["Edit", "Animatic"]}},
+        },
+    },
+    "Shot": {
+        "sg_status_list": {
+            "data_type": {"value": "status_list"},
+            "properties": {"valid_values": {"value": ["wtg", "ip", "fin"]}},
+        },
+    },
+}
+
+
+class FakeShotgun(object):
+    """
+    In-process stand-in for a ShotGrid connection, to run and measure exports
+    without a live site. The headless harness connects the stand-in Toolkit
+    to it, after which ``app.shotgun`` and the app's connection pool return
+    it instead of a real connection::
+
+        shotgun = FakeShotgun(latency=0.05)
+        app = harness.create_app(shotgun=shotgun)
+        # ... run the export ...
+        shotgun.calls
+
+    Entities are kept in memory. ``find``, ``find_one``, ``create``,
+    ``update``, ``delete``, ``batch``, ``upload``, ``upload_thumbnail``,
+    ``share_thumbnail`` and ``schema_field_read`` are implemented, for the
+    filters and fields the export uses. Every request sleeps for the
+    simulated latency before being answered. The fake is thread safe, so the
+    same instance is shared by all the threads of an export.
+
+    A fake created with :meth:`from_recording` replays the traffic recorded
+    by a :class:`TrafficRecorder` from a real session: requests are answered
+    with the recorded results, after the recorded duration unless a latency
+    is given. Requests which weren't recorded are answered from the
+    in-memory entities and counted in ``unmatched``.
+    """
+
+    def __init__(self, latency=0.0, entities=None, schema=None):
+        """
+        :param latency: The seconds each request takes, either a number or a
+            dictionary of numbers keyed by method name.
+        :param list entities: Entity dictionaries to start with, each with a
+            ``type`` and an ``id``.
+        :param dict schema: The fields returned by :meth:`schema_field_read`,
+            keyed by entity type then field name. Defaults to
+            :data:`DEFAULT_SCHEMA`.
+        """
+        self._latency = latency
+        self._schema = copy.deepcopy(schema or DEFAULT_SCHEMA)
+        self._lock = threading.RLock()
+        self._entities = collections.defaultdict(dict)
+        self._next_id = 1
+        self._recording = None
+        self.calls = collections.Counter()
+        self.uploaded_bytes = 0
+        self.unmatched = 0
+        self.server_caps = _ServerCaps()
+        self.base_url = "https://fake.shotgrid.local"
+
+        for entity in entities or []:
+            self._entities[entity["type"]][entity["id"]] = copy.deepcopy(entity)
+            self._next_id = max(self._next_id, entity["id"] + 1)
+
+    @classmethod
+    def from_recording(cls, path, latency=None, entities=None, schema=None):
+        """
+        Returns a fake replaying the traffic saved by a :class:`TrafficRecorder`.
+
+        :param str path: The recording file.
+        :param latency: If given, used instead of the recorded durations.
+        """
+        with open(path) as fh:
+            requests = json.load(fh)
+
+        fake = cls(latency or 0.0, entities, schema)
+        fake._recording = collections.defaultdict(collections.deque)
+        for request in requests:
+            key = _request_key(request["method"], request["args"], request["kwargs"])
+            fake._recording[key].append(request)
+        if latency is None:
+            fake._latency = None
+        return fake
+
+    def close(self):
+        pass
+
+    def find(
+        self,
+        entity_type,
+        filters,
+        fields=None,
+        order=None,
+        filter_operator=None,
+        limit=0,
+        **kwargs
+    ):
+        return self._request(
+            "find", (entity_type, filters, fields, order, filter_operator, limit)
+        )
+
+    def find_one(
+        self,
+        entity_type,
+        filters,
+        fields=None,
+        order=None,
+        filter_operator=None,
+        **kwargs
+    ):
+        return self._request(
+            "find_one", (entity_type, filters, fields, order, filter_operator)
+        )
+
+    def create(self, entity_type, data, return_fields=None):
+        return self._request("create", (entity_type, data, return_fields))
+
+    def update(self, entity_type, entity_id, data, multi_entity_update_modes=None):
+        return self._request(
+            "update", (entity_type, entity_id, data, multi_entity_update_modes)
+        )
+
+    def delete(self, entity_type, entity_id):
+        return self._request("delete", (entity_type, entity_id))
+
+    def batch(self, requests):
+        return self._request("batch", (requests,))
+
+    def upload(
+        self,
+        entity_type,
+        entity_id,
+        path,
+        field_name=None,
+        display_name=None,
+        tag_list=None,
+    ):
+        return self._request(
+            "upload", (entity_type, entity_id, path, field_name, display_name)
+        )
+
+    def upload_thumbnail(self, entity_type, entity_id, path, **kwargs):
+        return self._request("upload_thumbnail", (entity_type, entity_id, path))
+
+    def share_thumbnail(
+        self,
+        entities,
+        thumbnail_path=None,
+        source_entity=None,
+        filmstrip_thumbnail=False,
+    ):
+        return self._request(
+            "share_thumbnail", (entities, thumbnail_path, source_entity)
+        )
+
+    def schema_field_read(self, entity_type, field_name=None, project_entity=None):
+        return self._request("schema_field_read", (entity_type, field_name))
+
+    def _request(self, method, args):
+        """Answers a request, from the recording if there is one."""
+        self.calls[method] += 1
+
+        recorded = self._replay(method, args)
+        if recorded is not None:
+            latency = recorded["duration"] if self._latency is None else self._latency
+            self._sleep(method, latency)
+            return copy.deepcopy(recorded["result"])
+
+        self._sleep(method, self._latency or 0.0)
+        with self._lock:
+            return copy.deepcopy(getattr(self, "_" + method)(*args))
+
+    def _replay(self, method, args):
+        """Returns the recorded request matching a request, if any."""
+        if self._recording is None:
+            return None
+        key = _request_key(method, args, {})
+        with self._lock:
+            requests = self._recording.get(key)
+            if not requests:
+                self.unmatched += 1
+                return None
+            # identical requests are answered in the recorded order, the last
+            # answer being repeated once they're all used
+            if len(requests) > 1:
+                return requests.popleft()
+            return requests[0]
+
+    @staticmethod
+    def _sleep(method, latency):
+        if isinstance(latency, dict):
+            latency = latency.get(method, 0.0)
+        if latency:
+            time.sleep(latency)
+
+    def _find(
+        self,
+        entity_type,
+        filters,
+        fields=None,
+        order=None,
+        filter_operator=None,
+        limit=0,
+    ):
+        matches = [
+            e
+            for e in self._entities[entity_type].values()
+            if self._match(e, filters, filter_operator or "all")
+        ]
+        for sort in reversed(order or []):
+            matches.sort(
+                key=lambda e: _sort_key(self._get_field(e, sort["field_name"])),
+                reverse=sort.get("direction") == "desc",
+            )
+        if limit:
+            matches = matches[:limit]
+        return [self._project(e, fields) for e in matches]
+
+    def _find_one(
+        self, entity_type, filters, fields=None, order=None, filter_operator=None
+    ):
+        found = self._find(entity_type, filters, fields, order, filter_operator, 1)
+        return found[0] if found else None
+
+    def _create(self, entity_type, data, return_fields=None):
+        entity = dict((k, _link(v)) for (k, v) in data.items())
+        entity["type"] = entity_type
+        entity["id"] = self._next_id
+        self._next_id += 1
+        self._entities[entity_type][entity["id"]] = entity
+        return self._project(entity, list(data.keys()) + list(return_fields or []))
+
+    def _update(self, entity_type, entity_id, data, multi_entity_update_modes=None):
+        entity = self._get_entity(entity_type, entity_id)
+        modes = multi_entity_update_modes or {}
+        for (field, value) in data.items():
+            value = _link(value)
+            mode = modes.get(field, "set")
+            if mode == "add":
+                value = (entity.get(field) or []) + value
+            elif mode == "remove":
+                removed = [_key(v) for v in value]
+                value = [v for v in entity.get(field) or [] if _key(v) not in removed]
+            entity[field] = value
+        return self._project(entity, list(data.keys()))
+
+    def _delete(self, entity_type, entity_id):
+        return self._entities[entity_type].pop(entity_id, None) is not None
+
+    def _batch(self, requests):
+        results = []
+        for request in requests:
+            request_type = request["request_type"]
+            if request_type == "create":
+                results.append(
+                    self._create(
+                        request["entity_type"],
+                        request["data"],
+                        request.get("return_fields"),
+                    )
+                )
+            elif request_type == "update":
+                results.append(
+                    self._update(
+                        request["entity_type"],
+                        request["entity_id"],
+                        request["data"],
+                        request.get("multi_entity_update_modes"),
+                    )
+                )
+            elif request_type == "delete":
+                results.append(
+                    self._delete(request["entity_type"], request["entity_id"])
+                )
+            else:
+                raise ValueError("Unsupported batch request type: %s" % request_type)
+        return results
+
+    def _upload(self, entity_type, entity_id, path, field_name=None, display_name=None):
+        entity = self._get_entity(entity_type, entity_id)
+        attachment = self._attach(path)
+        if field_name:
+            entity[field_name] = {
+                "type": "Attachment",
+                "id": attachment["id"],
+                "name": display_name or os.path.basename(path),
+            }
+        return attachment["id"]
+
+    def _upload_thumbnail(self, entity_type, entity_id, path):
+        entity = self._get_entity(entity_type, entity_id)
+        attachment = self._attach(path)
+        entity["image"] = attachment["this_file"]
+        return attachment["id"]
+
+    def _share_thumbnail(self, entities, thumbnail_path=None, source_entity=None):
+        if source_entity is not None:
+            source = self._get_entity(source_entity["type"], source_entity["id"])
+            image = source.get("image")
+            if image is None:
+                raise ValueError("%s has no thumbnail to share." % (source_entity,))
+            attachment_id = None
+        else:
+            attachment = self._attach(thumbnail_path)
+            (image, attachment_id) = (attachment["this_file"], attachment["id"])
+        for entity in entities:
+            self._get_entity(entity["type"], entity["id"])["image"] = image
+        return attachment_id
+
+    def _schema_field_read(self, entity_type, field_name=None):
+        fields = self._schema.get(entity_type, {})
+        if field_name is None:
+            return fields
+        if field_name not in fields:
+            raise ValueError("%s has no field %s." % (entity_type, field_name))
+        return {field_name: fields[field_name]}
+
+    def _attach(self, path):
+        """Creates an Attachment for an uploaded file."""
+        if not os.path.isfile(path):
+            raise ValueError("Path must be a valid file: %s" % path)
+        self.uploaded_bytes += os.path.getsize(path)
+        return self._create(
+            "Attachment", {"this_file": "fake://%s" % os.path.basename(path)}
+        )
+
+    def _get_entity(self, entity_type, entity_id):
+        entity = self._entities[entity_type].get(entity_id)
+        if entity is None:
+            raise ValueError("%s %s doesn't exist." % (entity_type, entity_id))
+        return entity
+
+    def _get_field(self, entity, field):
+        """Returns the value of a field, following ``link.Type.field`` paths."""
+        parts = field.split(".")
+        value = entity.get(parts[0])
+        while len(parts) > 1 and value is not None:
+            if isinstance(value, list) or value.get("type") != parts[1]:
+                return None
+            linked = self._entities[parts[1]].get(value["id"])
+            if linked is None:
+                return None
+            parts = parts[2:]
+            value = linked.get(parts[0]) if parts else None
+        return value
+
+    def _project(self, entity, fields):
+        """Returns the given fields of an entity, as a find would."""
+        result = {"type": entity["type"], "id": entity["id"]}
+        for field in fields or []:
+            result[field] = self._get_field(entity, field)
+        return result
+
+    def _match(self, entity, filters, filter_operator):
+        matches = (self._match_filter(entity, f) for f in filters)
+        if filter_operator in ("any", "or"):
+            return any(matches)
+        return all(matches)
+
+    def _match_filter(self, entity, condition):
+        if isinstance(condition, dict):
+            if "filters" in condition:
+                return self._match(
+                    entity,
+                    condition["filters"],
+                    condition.get("filter_operator", "all"),
+                )
+            (field, relation, value) = (
+                condition["path"],
+                condition["relation"],
+                condition["values"],
+            )
+            if len(value) == 1 and relation not in ("in", "not_in"):
+                value = value[0]
+        else:
+            (field, relation) = condition[:2]
+            value = condition[2] if len(condition) == 3 else list(condition[2:])
+
+        actual = self._get_field(entity, field)
+        return _RELATIONS[relation](actual, value)
+
+
+class TrafficRecorder(object):
+    """
+    Records the requests made to SG and their results, to be replayed by a
+    :class:`FakeShotgun` created with :meth:`FakeShotgun.from_recording`.
+
+    It is installed on the app of a Hiero session, ie. from the Script
+    Editor, after which the connections returned by ``app.shotgun`` and the
+    app's connection pool are wrapped to record their requests::
+
+        recorder = TrafficRecorder()
+        recorder.install(app)
+        # ... run the export ...
+        recorder.uninstall()
+        recorder.save("/path/to/recording.json")
+    """
+
+    def __init__(self):
+        self._requests = []
+        self._lock = threading.Lock()
+        self._installed = None
+
+    def install(self, app):
+        """
+        Records the requests made through ``app.shotgun`` and the connections
+        created by ``sgtk.util.shotgun.create_sg_connection``, until
+        :meth:`uninstall` is called.
+        """
+        import sgtk
+
+        if self._installed is not None:
+            return
+
+        recorder = self
+        app_class = type(app)
+        create_sg_connection = sgtk.util.shotgun.create_sg_connection
+
+        class RecordingApp(app_class):
+            @property
+            def shotgun(self):
+                return recorder.wrap(app_class.shotgun.fget(self))
+
+        def create_recording_connection(*args, **kwargs):
+            return recorder.wrap(create_sg_connection(*args, **kwargs))
+
+        app.__class__ = RecordingApp
+        sgtk.util.shotgun.create_sg_connection = create_recording_connection
+        self._installed = (app, app_class, create_sg_connection)
+
+    def uninstall(self):
+        """Stops recording the requests of the app it was installed on."""
+        import sgtk
+
+        if self._installed is None:
+            return
+
+        (app, app_class, create_sg_connection) = self._installed
+        app.__class__ = app_class
+        sgtk.util.shotgun.create_sg_connection = create_sg_connection
+        self._installed = None
+
+    def wrap(self, sg):
+        """Returns the given connection, recording the requests made through it."""
+        return _RecordingConnection(sg, self)
+
+    def record(self, method, args, kwargs, result, duration):
+        with self._lock:
+            self._requests.append(
+                {
+                    "method": method,
+                    "args": _jsonable(args),
+                    "kwargs": _jsonable(kwargs),
+                    "result": _jsonable(result),
+                    "duration": duration,
+                }
+            )
+
+    def save(self, path):
+        """Writes the recorded requests to a JSON file."""
+        with self._lock:
+            requests = list(self._requests)
+        with open(path, "w") as fh:
+            json.dump(requests, fh, indent=1)
+        return len(requests)
+
+
+class _RecordingConnection(object):
+    """Wraps a SG connection, behaving as it does while recording its requests."""
+
+    def __init__(self, sg, recorder):
+        self._sg = sg
+        self._recorder = recorder
+
+    def __getattr__(self, name):
+        attr = getattr(self._sg, name)
+        if name not in RECORDED_METHODS:
+            return attr
+
+        def call(*args, **kwargs):
+            start = time.time()
+            result = attr(*args, **kwargs)
+            self._recorder.record(name, args, kwargs, result, time.time() - start)
+            return result
+
+        return call
+
+
+class _ServerCaps(object):
+    """The server capabilities reported by the fake."""
+
+    version = (8, 0, 0)
+
+
+def _request_key(method, args, kwargs):
+    """
+    Returns the key a request is replayed for, which doesn't depend on the
+    arguments being passed by position or by name.
+    """
+    arguments = dict(zip(_SIGNATURES[method], args))
+    arguments.update(kwargs)
+    for name in _IGNORED_ARGUMENTS:
+        arguments.pop(name, None)
+    arguments = dict(
+        (k, v) for (k, v) in _jsonable(arguments).items() if v not in (None, 0, False)
+    )
+    return json.dumps([method, arguments], sort_keys=True)
+
+
+def _jsonable(value):
+    """Returns a value as it reads back from JSON."""
+    return json.loads(json.dumps(value, default=str))
+
+
+def _link(value):
+    """Reduces entity dictionaries to links, as SG stores them."""
+    if isinstance(value, dict) and "type" in value and "id" in value:
+        return dict((k, value[k]) for k in ("type", "id", "name") if k in value)
+    if isinstance(value, list):
+        return [_link(v) for v in value]
+    return value
+
+
+def _key(value):
+    """Returns a comparable key for a field value."""
+    if isinstance(value, dict) and "type" in value and "id" in value:
+        return (value["type"], value["id"])
+    return value
+
+
+def _sort_key(value):
+    return (value is not None, _key(value) if value is not None else 0)
+
+
+def _is(actual, value):
+    if isinstance(actual, list):
+        return _key(value) in [_key(a) for a in actual]
+    return _key(actual) == _key(value)
+
+
+def _in(actual, values):
+    if isinstance(actual, list):
+        return any(_in(a, values) for a in actual)
+    return _key(actual) in [_key(v) for v in values]
+
+
+def _contains(actual, value):
+    if isinstance(actual, list):
+        return _key(value) in [_key(a) for a in actual]
+    return actual is not None and value in actual
+
+
+_RELATIONS = {
+    "is": _is,
+    "is_not": lambda actual, value: not _is(actual, value),
+    "in": _in,
+    "not_in": lambda actual, values: not _in(actual, values),
+    "contains": _contains,
+    "not_contains": lambda actual, value: not _contains(actual, value),
+    "starts_with": lambda actual, value: (actual or "").startswith(value),
+    "ends_with": lambda actual, value: (actual or "").endswith(value),
+    "greater_than": lambda actual, value: actual is not None and actual > value,
+    "less_than": lambda actual, value: actual is not None and actual < value,
+    "between": lambda actual, values: (
+        actual is not None and values[0] <= actual <= values[1]
+    ),
+    "type_is": lambda actual, value: (actual or {}).get("type") == value,
+}
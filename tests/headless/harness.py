@@ -0,0 +1,155 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Runs exports of the app against the headless stand-ins and a
+:class:`~tests.headless.fake_shotgun.FakeShotgun`, the way Hiero would::
+
+    app = harness.create_app()
+    sequence = synthetic.build_sequence(source_root, shots=20)
+    preset = harness.create_preset(export_root)
+    processor = harness.start_export(app, sequence, preset)
+    errors = harness.run_tasks(processor)
+"""
+
+import os
+import sys
+import time
+import importlib.util
+
+from . import standin
+from .fake_shotgun import FakeShotgun
+
+standin.install()
+
+import hiero.core
+
+
+# The root of the app.
+APP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+# The export path of the plates, relative to the export root.
+DEFAULT_PLATE_PATH = (
+    "{sequence}/{shot}/plates/{track}/{shot}_{track}_{tk_version}.####.{ext}"
+)
+
+# The name the app's module is imported as.
+_APP_MODULE = "tk_hiero_export_headless_app"
+
+
+def load_app_module():
+    """
+    Imports the app's module, which makes the ``tk_hiero_export`` package
+    importable.
+    """
+    module = sys.modules.get(_APP_MODULE)
+    if module is None:
+        spec = importlib.util.spec_from_file_location(
+            _APP_MODULE, os.path.join(APP_DIR, "app.py")
+        )
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[_APP_MODULE] = module
+        spec.loader.exec_module(module)
+    return module
+
+
+def create_app(settings=None, shotgun=None):
+    """
+    Creates the app with its default settings, updated with the given ones.
+
+    :param dict settings: The settings to override.
+    :param shotgun: The fake SG the app talks to, a new
+        :class:`~tests.headless.fake_shotgun.FakeShotgun` holding the
+        current user if not given.
+
+    :returns: The app.
+    """
+    if shotgun is None:
+        shotgun = FakeShotgun(entities=[standin.CURRENT_USER])
+    standin.connect_shotgun(shotgun)
+    return load_app_module().HieroExport(APP_DIR, settings)
+
+
+def create_preset(export_root, plate_path=DEFAULT_PLATE_PATH, **properties):
+    """
+    Returns a shot processor preset copying the plates of the exported items
+    with their cut handles, from a custom start frame.
+
+    :param str export_root: The folder the plates are copied to.
+    :param str plate_path: The export path of the plates.
+    :param properties: The preset properties to override.
+    """
+    from tk_hiero_export import ShotgunShotProcessorPreset, ShotgunCopyPreset
+
+    preset_properties = {
+        "exportRoot": export_root,
+        "exportTemplate": ((plate_path, ShotgunCopyPreset("", {})),),
+        "cutLength": True,
+        "cutUseHandles": True,
+        "cutHandles": 8,
+        "startFrameIndex": 1001,
+        "startFrameSource": "Custom",
+    }
+    preset_properties.update(properties)
+    return ShotgunShotProcessorPreset("headless", preset_properties)
+
+
+def prefetch(app, sequence, timeout=60):
+    """
+    Prefetches the SG data of an export of the sequence, as the export
+    dialog does, and waits for the prefetch to be done.
+    """
+    from tk_hiero_export import ShotgunHieroObjectBase
+    from tk_hiero_export.prefetch import SGPrefetcher
+
+    items = [item for track in sequence.videoTracks() for item in track.items()]
+    sg_prefetch = SGPrefetcher(app, ShotgunHieroObjectBase()._get_connection_pool())
+    sg_prefetch.start(items)
+    deadline = time.time() + timeout
+    while not sg_prefetch.is_done() and time.time() < deadline:
+        time.sleep(0.001)
+    app.sg_prefetch = sg_prefetch
+    return sg_prefetch
+
+
+def start_export(app, sequence, preset):
+    """
+    Creates the shot processor of the preset and starts the export of the
+    sequence, which creates and pre-processes its tasks.
+
+    :returns: The processor.
+    """
+    from tk_hiero_export import ShotgunShotProcessor
+
+    processor = ShotgunShotProcessor(preset)
+    processor.startProcessing([hiero.core.ItemWrapper(sequence)])
+    return processor
+
+
+def run_tasks(processor):
+    """
+    Runs the tasks of a started export one after the other, as the Hiero
+    export queue does, then finishes the export's submission.
+
+    :returns: A list of ``(task, error)`` tuples for the tasks that failed.
+    """
+    errors = []
+    try:
+        for group in processor._submission.children():
+            for task in group.children():
+                task.startTask()
+                while task.taskStep():
+                    pass
+                task.finishTask()
+                if task.error():
+                    errors.append((task, task.error()))
+    finally:
+        processor._submission.finishTask()
+    return errors
@@ -0,0 +1,166 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Micro-benchmarks of the hot paths of an export, run from the root of the
+app with a plain Python interpreter::
+
+    python -m tests.headless.microbench tk_version --count 100000
+
+Each benchmark reports the throughput of the code path it exercises, along
+with the one of the implementation it replaced when relevant.
+"""
+
+import sys
+import time
+import argparse
+
+from . import harness
+
+
+# The benchmarks, by name.
+BENCHMARKS = {}
+
+
+def benchmark(fn):
+    """Registers a benchmark function, taking the number of iterations."""
+    BENCHMARKS[fn.__name__] = fn
+    return fn
+
+
+def measure(fn, count):
+    """
+    Calls ``fn`` ``count`` times.
+
+    :returns: The number of calls per second.
+    """
+    start = time.perf_counter()
+    for _ in range(count):
+        fn()
+    return count / max(time.perf_counter() - start, 1e-9)
+
+
+@benchmark
+def tk_version(count):
+    """
+    Resolution of ``{tk_version}`` in an export path, for a few versions and
+    a glob expression, against formatting the version with the version
+    template on every resolution.
+    """
+    app = harness.create_app()
+    from tk_hiero_export import ShotgunHieroObjectBase
+
+    import hiero.core
+
+    preset = harness.create_preset("/tmp")
+    resolver = hiero.core.ResolveTable()
+    preset.addUserResolveEntries(resolver)
+
+    class Task(object):
+        def __init__(self, version):
+            self._version = version
+
+        def versionString(self):
+            return self._version
+
+    tasks = [Task(v) for v in ("v001", "v002", "v010", "v#")]
+    path = "{tk_version}/plate_{tk_version}.####.exr"
+
+    def resolve():
+        for task in tasks:
+            resolver.resolve(task, path)
+
+    def uncached():
+        for task in tasks:
+            version = task.versionString()[1:]
+            try:
+                number = int(version)
+            except ValueError:
+                continue
+            app.get_template("template_version").apply_fields({"version": number})
+
+    base = ShotgunHieroObjectBase()
+    return {
+        "resolutions/s": measure(resolve, count) * len(tasks),
+        "formats/s": measure(lambda: base._formatTkVersionString("v001"), count),
+        "uncached formats/s": measure(uncached, count) * len(tasks),
+    }
+
+
+@benchmark
+def timecode(count):
+    """
+    Formatting of the in/out timecodes of the cut items of a 100 shots cut
+    at 23.976 and drop frame 29.97, against the stand-in of
+    ``hiero.core.Timecode``. The stand-in isn't Hiero: the timecodes are
+    checked against the reference table of the module, which
+    ``tests/hiero/capture_timecodes.py`` checks against Hiero itself.
+    """
+    harness.create_app()
+    from tk_hiero_export import timecode
+
+    import hiero.core
+
+    def time_to_string(frame, fps, drop_frame):
+        if drop_frame:
+            display_type = hiero.core.Timecode.kDisplayDropFrameTimecode
+        else:
+            display_type = hiero.core.Timecode.kDisplayTimecode
+        return hiero.core.Timecode.timeToString(frame, fps, display_type)
+
+    mismatches = timecode.validate()
+    if mismatches:
+        raise AssertionError("Mismatched timecodes: %s" % (mismatches,))
+
+    # contiguous cut items of 48 frames, starting at one hour
+    frames = []
+    for shot in range(100):
+        frames.extend([86400 + shot * 48, 86400 + shot * 48 + 47])
+    rates = [(23.976, False), (29.97, True)]
+
+    def timecodes():
+        for (fps, drop_frame) in rates:
+            formatter = timecode.get_formatter(fps, drop_frame)
+            for frame in frames:
+                formatter.format(frame)
+
+    def standin_timecodes():
+        for (fps, drop_frame) in rates:
+            for frame in frames:
+                time_to_string(frame, fps, drop_frame)
+
+    total = len(frames) * len(rates)
+    return {
+        "timecodes/s": measure(timecodes, count // 100 or 1) * total,
+        "stand-in timeToString/s": measure(standin_timecodes, count // 100 or 1)
+        * total,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument(
+        "names", nargs="*", help="The benchmarks to run: %s." % ", ".join(BENCHMARKS)
+    )
+    parser.add_argument("--count", type=int, default=10000)
+    args = parser.parse_args(argv)
+
+    for name in args.names or sorted(BENCHMARKS):
+        if name not in BENCHMARKS:
+            parser.error("Unknown benchmark: %s" % name)
+        results = BENCHMARKS[name](args.count)
+        print(name)
+        for (key, value) in results.items():
+            print("  %-24s %14.0f" % (key, value))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Stand-ins for the Hiero shot processor and shot task, installed as
+``hiero.exporters.FnShotProcessor`` and ``hiero.exporters.FnShotExporter``.
+"""
+
+import os
+
+import hiero.core
+
+
+class ShotTask(hiero.core.TaskBase):
+    """Stand-in for the base class of the Hiero shot exporters."""
+
+
+class ExportStructure(object):
+    """The ``(path, preset)`` entries of a processor's export template."""
+
+    def __init__(self, template):
+        self._template = list(template)
+
+    def flatten(self):
+        return list(self._template)
+
+    def restore(self, template):
+        self._template = list(template)
+
+
+class ShotProcessorPreset(hiero.core.TaskPresetBase):
+    """Stand-in for the Hiero shot processor preset, with its defaults."""
+
+    def __init__(self, name, properties):
+        hiero.core.TaskPresetBase.__init__(self, ShotProcessor, name)
+        self._properties.update(
+            {
+                "exportRoot": "{projectroot}",
+                "exportTemplate": (),
+                "cutHandles": 12,
+                "cutUseHandles": False,
+                "cutLength": False,
+                "includeRetimes": False,
+                "startFrameIndex": 1001,
+                "startFrameSource": "Source",
+                "versionIndex": 1,
+                "versionPadding": 3,
+                "skipOffline": True,
+            }
+        )
+        self._properties.update(properties)
+
+
+class ShotProcessor(object):
+    """
+    Stand-in for the Hiero shot processor, creating one task group per
+    exported track item, holding a task per export template entry.
+    """
+
+    def __init__(self, preset, submission=None, synchronous=False):
+        self._preset = preset
+        self._submission = (
+            submission if submission is not None else hiero.core.Submission()
+        )
+        self._synchronous = synchronous
+        self._exportTemplate = ExportStructure(preset.properties()["exportTemplate"])
+
+    def preset(self):
+        return self._preset
+
+    def startProcessing(self, exportItems, preview=False):
+        properties = self._preset.properties()
+
+        trackItems = []
+        for exportItem in exportItems:
+            if exportItem.trackItem():
+                trackItems.append(exportItem.trackItem())
+            elif exportItem.sequence():
+                for track in exportItem.sequence().videoTracks():
+                    trackItems.extend(track.items())
+
+        cutHandles = None
+        if properties["cutLength"]:
+            cutHandles = properties["cutHandles"] if properties["cutUseHandles"] else 0
+        startFrame = None
+        if properties["startFrameSource"] == "Custom":
+            startFrame = properties["startFrameIndex"]
+
+        tasks = []
+        for (index, trackItem) in enumerate(trackItems):
+            group = hiero.core.TaskGroup(trackItem)
+            for (path, taskPreset) in self._exportTemplate.flatten():
+                resolver = self._resolver(taskPreset, trackItem)
+                task = hiero.core.taskRegistry.createTaskFromPreset(
+                    taskPreset,
+                    hiero.core.TaskData(
+                        preset=taskPreset,
+                        item=trackItem,
+                        exportRoot=properties["exportRoot"],
+                        exportPath=os.path.join(properties["exportRoot"], path),
+                        version=properties["versionIndex"],
+                        versionPadding=properties["versionPadding"],
+                        project=trackItem.parentSequence().project(),
+                        cutHandles=cutHandles,
+                        retime=properties["includeRetimes"],
+                        startFrame=startFrame,
+                        resolver=resolver,
+                        skipOffline=properties["skipOffline"],
+                        submission=self._submission,
+                        shotNameIndex=str(index),
+                    ),
+                )
+                group.addChild(task)
+                tasks.append(task)
+            self._submission.addChild(group)
+
+        if preview:
+            return tasks
+
+        self.processTaskPreQueue()
+        self._submission.addToQueue()
+
+    def processTaskPreQueue(self):
+        pass
+
+    def _resolver(self, taskPreset, trackItem):
+        """Returns the resolve table of the Hiero keywords for a task."""
+        resolver = hiero.core.ResolveTable()
+        track = trackItem.parentTrack()
+        sequence = trackItem.parentSequence()
+        fileinfo = trackItem.source().mediaSource().fileinfos()[0]
+        filename = os.path.basename(fileinfo.filename())
+        (filebase, fileext) = (filename.split(".")[0], filename.rsplit(".", 1)[-1])
+        project = sequence.project()
+
+        resolver.addResolver("{shot}", "Shot name", lambda k, t: t.shotName())
+        resolver.addResolver("{clip}", "Clip name", lambda k, t: t.clipName())
+        resolver.addResolver("{track}", "Track name", track.name().replace(" ", "_"))
+        resolver.addResolver("{sequence}", "Sequence name", sequence.name())
+        resolver.addResolver("{version}", "Version", lambda k, t: t.versionString())
+        resolver.addResolver(
+            "{project}", "Project name", project.name() if project else ""
+        )
+        resolver.addResolver("{filename}", "Source file name", filename)
+        resolver.addResolver("{filebase}", "Source file base name", filebase)
+        resolver.addResolver("{fileext}", "Source file extension", fileext)
+        resolver.addResolver("{ext}", "Export file extension", fileext)
+        resolver.addResolver(
+            "{event}",
+            "Event number",
+            "%03d" % (trackItem.parentTrack().items().index(trackItem) + 1),
+        )
+        self._preset.addUserResolveEntries(resolver)
+        taskPreset.addUserResolveEntries(resolver)
+        return resolver
@@ -0,0 +1,1402 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Headless stand-ins for the parts of the Hiero, Nuke, Toolkit and Qt APIs the
+export relies on, so that the shot processor and its tasks can be driven from
+a plain Python interpreter.
+
+Only what the :class:`ShotgunShotProcessor`, :class:`ShotgunShotUpdater`,
+:class:`ShotgunCopyExporter` and the collate helpers use is modelled. Every
+other class the app's modules import, mostly UI classes and the exporters
+built on top of the Nuke backend, is a placeholder accepting any argument and
+doing nothing.
+
+:func:`install` has to be called before the app's modules are imported.
+"""
+
+import os
+import re
+import sys
+import math
+import uuid
+import types
+import logging
+import inspect
+import tempfile
+import importlib.util
+
+
+logger = logging.getLogger("tk-hiero-export.headless")
+
+# The size of the images returned by the stand-in thumbnail methods.
+THUMBNAIL_SIZE = (1920, 1080)
+
+# The Nuke version reported by the stand-in nuke module.
+NUKE_VERSION = (13, 2, 5)
+
+
+class _AnythingType(type):
+    """Metaclass of the placeholder classes, returning placeholders for any attribute."""
+
+    def __getattr__(cls, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return _Anything()
+
+
+class _Anything(object, metaclass=_AnythingType):
+    """
+    Placeholder instance, accepting any call and returning placeholders for
+    any attribute.
+    """
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return _Anything()
+
+    def __call__(self, *args, **kwargs):
+        return _Anything()
+
+    def __iter__(self):
+        return iter(())
+
+    def __bool__(self):
+        return False
+
+
+class _StandInModule(types.ModuleType):
+    """
+    Module whose unknown attributes are placeholder classes deriving from
+    :class:`_Anything`, so that they can be used as base classes.
+    """
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        value = type(name, (_Anything,), {"__module__": self.__name__})
+        setattr(self, name, value)
+        return value
+
+
+def _module(name, permissive=False, **attrs):
+    """Creates a stand-in module, registered as a child of its parent."""
+    module = (_StandInModule if permissive else types.ModuleType)(name)
+    module.__dict__.update(attrs)
+    sys.modules[name] = module
+    (parent, _, child) = name.rpartition(".")
+    if parent:
+        setattr(sys.modules[parent], child, module)
+    return module
+
+
+# ---------------------------------------------------------------------------
+# Qt
+
+
+class Qt(object):
+    SmoothTransformation = 1
+    Unchecked = 0
+    Checked = 2
+
+
+class QIODevice(object):
+    ReadOnly = 1
+    WriteOnly = 2
+
+
+class QByteArray(object):
+    def __init__(self, data=b""):
+        self._data = bytearray(data)
+
+    def data(self):
+        return bytes(self._data)
+
+    def size(self):
+        return len(self._data)
+
+
+class QBuffer(object):
+    def __init__(self, byte_array=None):
+        self._array = byte_array if byte_array is not None else QByteArray()
+
+    def open(self, mode):
+        return True
+
+    def write(self, data):
+        self._array._data.extend(data)
+        return len(data)
+
+    def close(self):
+        pass
+
+
+class QImage(object):
+    """
+    Image holding a pixel buffer of its size, encoded into deterministic bytes
+    of a size similar to an actual encoded image.
+    """
+
+    # The approximate compression ratio of each format.
+    _RATIOS = {"JPG": 12, "JPEG": 12, "PNG": 2}
+
+    def __init__(self, width=None, height=None):
+        if width is None:
+            (width, height) = THUMBNAIL_SIZE
+        self._width = width
+        self._height = height
+        self._pixels = bytearray(width * height * 4)
+
+    def width(self):
+        return self._width
+
+    def height(self):
+        return self._height
+
+    def isNull(self):
+        return not self._pixels
+
+    def byteCount(self):
+        return len(self._pixels)
+
+    def scaledToWidth(self, width, mode=None):
+        height = max(1, int(round(self._height * width / float(self._width))))
+        return QImage(width, height)
+
+    def save(self, target, format=None, quality=-1):
+        if format is None:
+            format = os.path.splitext(target)[1][1:] or "PNG"
+        ratio = self._RATIOS.get(format.upper(), 4)
+        header = "%s %dx%d q%d\n" % (format, self._width, self._height, quality)
+        data = header.encode("ascii") + bytes(self._width * self._height * 3 // ratio)
+        if isinstance(target, QBuffer):
+            target.write(data)
+        else:
+            with open(target, "wb") as f:
+                f.write(data)
+        return True
+
+
+def _install_qt():
+    qt = _module("sgtk.platform.qt")
+    qt.QtCore = _module(
+        "sgtk.platform.qt.QtCore",
+        permissive=True,
+        Qt=Qt,
+        QIODevice=QIODevice,
+        QByteArray=QByteArray,
+        QBuffer=QBuffer,
+    )
+    qt.QtGui = _module("sgtk.platform.qt.QtGui", permissive=True, QImage=QImage)
+    sys.modules["tank.platform.qt"] = qt
+
+
+# ---------------------------------------------------------------------------
+# Toolkit
+
+
+class TankError(Exception):
+    pass
+
+
+class TankHookMethodDoesNotExistError(TankError):
+    pass
+
+
+class Hook(object):
+    """Stand-in for the Toolkit hook base class."""
+
+    def __init__(self, parent):
+        self.__parent = parent
+
+    @property
+    def parent(self):
+        return self.__parent
+
+    @property
+    def logger(self):
+        return self.__parent.logger
+
+    @property
+    def sgtk(self):
+        return self.__parent.sgtk
+
+    tank = sgtk
+
+
+# The class returned by get_hook_baseclass() while a hook file is loaded.
+_hook_base_class = Hook
+
+
+def get_hook_baseclass():
+    return _hook_base_class
+
+
+class Template(object):
+    """
+    Stand-in for a Toolkit template, only formatting its version field as a
+    three digits number.
+    """
+
+    def __init__(self, name, definition):
+        self.name = name
+        self.definition = definition
+
+    def apply_fields(self, fields):
+        return "%03d" % fields["version"]
+
+
+class Context(object):
+    def __init__(self, project, entity=None):
+        self.project = project
+        self.entity = entity
+
+    def __repr__(self):
+        return "<Context %s %s>" % (self.project["name"], self.entity)
+
+
+class Toolkit(object):
+    """
+    Stand-in for the Toolkit API instance, counting the folder creations and
+    contexts it is asked for.
+    """
+
+    def __init__(self, app):
+        self._app = app
+        self.filesystem_structures = []
+        self.contexts = 0
+
+    @property
+    def shotgun(self):
+        return self._app.shotgun
+
+    def context_from_entity(self, entity_type, entity_id):
+        self.contexts += 1
+        return Context(
+            self._app.context.project, {"type": entity_type, "id": entity_id}
+        )
+
+    def create_filesystem_structure(self, entity_type, entity_ids, engine=None):
+        self.filesystem_structures.append((entity_type, list(entity_ids)))
+        return len(entity_ids)
+
+
+# The user the stand-in Toolkit is authenticated as.
+CURRENT_USER = {
+    "type": "HumanUser",
+    "id": 1,
+    "name": "Headless User",
+    "login": "headless",
+}
+
+
+class AuthenticatedUser(object):
+    """Stand-in for the ShotgunUser returned by sgtk.get_authenticated_user."""
+
+    login = CURRENT_USER["login"]
+
+
+def get_authenticated_user():
+    return AuthenticatedUser()
+
+
+def get_current_user(tk):
+    return dict(CURRENT_USER)
+
+
+def get_published_file_entity_type(tk):
+    return "PublishedFile"
+
+
+def register_publish(
+    tk,
+    context,
+    path,
+    name,
+    version_number,
+    task=None,
+    comment="",
+    thumbnail_path="",
+    published_file_type=None,
+    dependency_paths=None,
+    created_by=None,
+    sg_fields=None,
+    dry_run=False,
+    **kwargs
+):
+    data = {
+        "type": get_published_file_entity_type(tk),
+        "code": os.path.basename(path),
+        "name": name,
+        "description": comment,
+        "project": context.project,
+        "entity": context.entity,
+        "task": task,
+        "version_number": version_number,
+        "path": {"local_path": path},
+        "published_file_type": published_file_type,
+        "created_by": created_by or get_current_user(tk),
+    }
+    data.update(sg_fields or {})
+    if dry_run:
+        return data
+    entity_type = data.pop("type")
+    return tk.shotgun.create(entity_type, data)
+
+
+def find_publish(tk, list_of_paths, filters=None, fields=None):
+    publishes = tk.shotgun.find(
+        get_published_file_entity_type(tk), filters or [], ["path"] + (fields or [])
+    )
+    found = {}
+    for publish in publishes:
+        path = (publish.get("path") or {}).get("local_path")
+        if path in list_of_paths:
+            found[path] = publish
+    return found
+
+
+# The SG connection returned by the stand-in Toolkit, see connect_shotgun.
+_shotgun = None
+
+
+def connect_shotgun(shotgun):
+    """
+    Makes the given connection, ie. a
+    :class:`~tests.headless.fake_shotgun.FakeShotgun`, the one returned by
+    ``create_sg_connection`` and the apps' ``shotgun``.
+    """
+    global _shotgun
+    _shotgun = shotgun
+
+
+def create_sg_connection():
+    if _shotgun is None:
+        raise TankError("There is no ShotGrid site to connect to in headless mode.")
+    return _shotgun
+
+
+class Engine(object):
+    """Stand-in for the Hiero engine, counting the busy popups shown."""
+
+    name = "tk-hiero"
+
+    def __init__(self):
+        self.busy = 0
+
+    def show_busy(self, title, details):
+        self.busy += 1
+
+    def clear_busy(self):
+        pass
+
+
+class Application(object):
+    """
+    Stand-in for the Toolkit application base class.
+
+    The settings are the defaults of the app's ``info.yml``, updated with the
+    given ones. Hooks are loaded from the app's ``hooks`` folder, or from the
+    path given as a setting value with a ``{self}`` or ``{config}`` prefix
+    pointing at the app's and the given config folders.
+    """
+
+    def __init__(self, app_dir, settings=None, project=None, config_dir=None):
+        import yaml
+
+        self.disk_location = app_dir
+        self._config_dir = config_dir
+        with open(os.path.join(app_dir, "info.yml")) as f:
+            configuration = yaml.safe_load(f)["configuration"]
+        self._settings = dict(
+            (key, value.get("default_value")) for (key, value) in configuration.items()
+        )
+        self._settings.update(settings or {})
+        self._hooks = {}
+
+        self.logger = logger
+        self.context = Context(
+            project or {"type": "Project", "id": 1, "name": "Headless Project"}
+        )
+        self.sgtk = self.tank = Toolkit(self)
+        self.engine = Engine()
+        self.cache_location = tempfile.mkdtemp(prefix="tk-hiero-export-cache-")
+        self.metrics = []
+
+        self.init_app()
+
+    @property
+    def shotgun(self):
+        return create_sg_connection()
+
+    def get_setting(self, key, default=None):
+        return self._settings.get(key, default)
+
+    def get_template(self, key):
+        return Template(key, self._settings.get(key))
+
+    def execute_hook(self, key, base_class=None, **kwargs):
+        return self._execute_hook_method(key, "execute", base_class, **kwargs)
+
+    def execute_hook_method(self, key, method_name, base_class=None, **kwargs):
+        return self._execute_hook_method(key, method_name, base_class, **kwargs)
+
+    def _execute_hook_method(self, key, method_name, base_class, **kwargs):
+        hook = self._get_hook(self._settings[key], base_class)
+        method = getattr(hook, method_name, None)
+        if method is None:
+            raise TankHookMethodDoesNotExistError(
+                "Hook %s has no method %s." % (key, method_name)
+            )
+        return method(**kwargs)
+
+    def _get_hook(self, value, base_class):
+        """Returns the hook instance of a hook setting, loading it once."""
+        path = value.replace("{self}", os.path.join(self.disk_location, "hooks"))
+        if self._config_dir:
+            path = path.replace("{config}", self._config_dir)
+        if not os.path.isabs(path):
+            path = os.path.join(self.disk_location, "hooks", path)
+        if not path.endswith(".py"):
+            path += ".py"
+
+        hook = self._hooks.get((path, base_class))
+        if hook is None:
+            hook = self._load_hook(path, base_class or Hook)(self)
+            self._hooks[(path, base_class)] = hook
+        return hook
+
+    @staticmethod
+    def _load_hook(path, base_class):
+        """Loads a hook file, returning the hook class it defines."""
+        global _hook_base_class
+
+        name = "headless_hook_%s_%s" % (
+            os.path.splitext(os.path.basename(path))[0],
+            base_class.__name__,
+        )
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        _hook_base_class = base_class
+        try:
+            spec.loader.exec_module(module)
+        finally:
+            _hook_base_class = Hook
+
+        classes = [
+            cls
+            for cls in vars(module).values()
+            if inspect.isclass(cls) and issubclass(cls, Hook) and cls.__module__ == name
+        ]
+        # the hook is the class none of the others derive from
+        for cls in classes:
+            if not any(
+                other is not cls and issubclass(other, cls) for other in classes
+            ):
+                return cls
+        raise TankError("No hook class found in %s." % path)
+
+    def log_debug(self, msg):
+        self.logger.debug(msg)
+
+    def log_info(self, msg):
+        self.logger.info(msg)
+
+    def log_warning(self, msg):
+        self.logger.warning(msg)
+
+    def log_error(self, msg):
+        self.logger.error(msg)
+
+    def log_exception(self, msg):
+        self.logger.exception(msg)
+
+    def log_metric(self, action, log_version=False):
+        self.metrics.append(action)
+
+
+def _install_sgtk():
+    sgtk = _module(
+        "sgtk",
+        Hook=Hook,
+        TankError=TankError,
+        get_hook_baseclass=get_hook_baseclass,
+        get_authenticated_user=get_authenticated_user,
+    )
+    sys.modules["tank"] = sgtk
+    _module(
+        "sgtk.errors",
+        TankError=TankError,
+        TankHookMethodDoesNotExistError=TankHookMethodDoesNotExistError,
+    )
+    _module("sgtk.platform", Application=Application)
+    _module(
+        "sgtk.util",
+        get_current_user=get_current_user,
+        find_publish=find_publish,
+        get_published_file_entity_type=get_published_file_entity_type,
+        register_publish=register_publish,
+        is_linux=lambda: sys.platform.startswith("linux"),
+        is_macos=lambda: sys.platform == "darwin",
+        is_windows=lambda: sys.platform == "win32",
+    )
+    _module("sgtk.util.shotgun", create_sg_connection=create_sg_connection)
+    _module("sgtk.templatekey", permissive=True)
+    for name in list(sys.modules):
+        if name.startswith("sgtk."):
+            sys.modules["tank" + name[4:]] = sys.modules[name]
+
+
+# ---------------------------------------------------------------------------
+# hiero.core
+
+
+class TimeBase(object):
+    def __init__(self, fps):
+        self._fps = fps
+
+    def toFloat(self):
+        return float(self._fps)
+
+    def toInt(self):
+        return int(round(self._fps))
+
+
+class Timecode(object):
+    kDisplayFrame = 0
+    kDisplayTimecode = 1
+    kDisplayDropFrameTimecode = 2
+
+    @staticmethod
+    def timeToString(time, base, displayType, includeSign=False, offset=0):
+        """Formats a frame as a timecode, with drop frames at 29.97 and 59.94."""
+        fps = base.toFloat() if isinstance(base, TimeBase) else float(base)
+        frame = int(time) + offset
+        if displayType == Timecode.kDisplayFrame:
+            return str(frame)
+
+        rate = int(round(fps))
+        separator = ":"
+        if displayType == Timecode.kDisplayDropFrameTimecode and rate in (30, 60):
+            separator = ";"
+            dropped = rate // 15
+            per_minute = rate * 60 - dropped
+            per_ten_minutes = per_minute * 10 + dropped
+            (tens, remainder) = divmod(frame, per_ten_minutes)
+            frame += dropped * 9 * tens
+            if remainder > dropped:
+                frame += dropped * ((remainder - dropped) // per_minute)
+
+        (seconds, frames) = divmod(frame, rate)
+        (minutes, seconds) = divmod(seconds, 60)
+        (hours, minutes) = divmod(minutes, 60)
+        return "%02d:%02d:%02d%s%02d" % (
+            hours % 24,
+            minutes,
+            seconds,
+            separator,
+            frames,
+        )
+
+
+class Tag(object):
+    def __init__(self, name):
+        self._name = name
+
+    def name(self):
+        return self._name
+
+    def visible(self):
+        return True
+
+
+class _Item(object):
+    """Base of the stand-in items, with a name, a guid and tags."""
+
+    def __init__(self, name):
+        self._name = name
+        self._guid = "{%s}" % uuid.uuid4()
+        self._tags = []
+
+    def name(self):
+        return self._name
+
+    def setName(self, name):
+        self._name = name
+
+    def guid(self):
+        return self._guid
+
+    def tags(self):
+        return list(self._tags)
+
+    def addTag(self, tag):
+        self._tags.append(tag)
+
+    def __repr__(self):
+        return "<%s %s>" % (type(self).__name__, self._name)
+
+
+class FileInfo(object):
+    def __init__(self, filename, start, end):
+        self._filename = filename
+        self._start = start
+        self._end = end
+
+    def filename(self):
+        return self._filename
+
+    def startFrame(self):
+        return self._start
+
+    def endFrame(self):
+        return self._end
+
+
+class MediaSource(object):
+    """A frame sequence such as ``/path/name.####.exr`` on disk."""
+
+    def __init__(self, path, first, last, present=True):
+        self._fileinfo = FileInfo(path, first, last)
+        self._present = present
+
+    def isMediaPresent(self):
+        return self._present
+
+    def fileinfos(self):
+        return [self._fileinfo]
+
+    def firstpath(self):
+        return HashesToPrintf(self._fileinfo.filename()) % self._fileinfo.startFrame()
+
+    def startTime(self):
+        return self._fileinfo.startFrame()
+
+    def duration(self):
+        return self._fileinfo.endFrame() - self._fileinfo.startFrame() + 1
+
+    def filename(self):
+        return os.path.basename(self._fileinfo.filename())
+
+
+class SequenceBase(_Item):
+    def __init__(self, name):
+        _Item.__init__(self, name)
+        self._framerate = TimeBase(24)
+        self._posterFrame = 0
+        self._inTime = None
+        self._outTime = None
+
+    def framerate(self):
+        return self._framerate
+
+    def setFramerate(self, framerate):
+        self._framerate = (
+            framerate if isinstance(framerate, TimeBase) else TimeBase(framerate)
+        )
+
+    def posterFrame(self):
+        return self._posterFrame
+
+    def setPosterFrame(self, frame):
+        self._posterFrame = frame
+
+    def thumbnail(self, frame=None):
+        return QImage()
+
+    def inTime(self):
+        if self._inTime is None:
+            raise RuntimeError("No in time set.")
+        return self._inTime
+
+    def outTime(self):
+        if self._outTime is None:
+            raise RuntimeError("No out time set.")
+        return self._outTime
+
+    def setInTime(self, time):
+        self._inTime = time
+
+    def setOutTime(self, time):
+        self._outTime = time
+
+
+class Clip(SequenceBase):
+    """
+    A clip of a media source. Its source in and out are the first and last
+    frames of the media, while the source in and out of the track items
+    using it are relative to the start of the clip.
+    """
+
+    def __init__(self, mediaSource, name=None):
+        fileinfo = mediaSource.fileinfos()[0]
+        SequenceBase.__init__(self, name or mediaSource.filename().split(".")[0])
+        self._mediaSource = mediaSource
+        self._first = fileinfo.startFrame()
+        self._last = fileinfo.endFrame()
+
+    def mediaSource(self):
+        return self._mediaSource
+
+    def sourceIn(self):
+        return self._first
+
+    def sourceOut(self):
+        return self._last
+
+    def duration(self):
+        return self._last - self._first + 1
+
+    def timecodeStart(self):
+        return self._first
+
+
+class Sequence(SequenceBase):
+    def __init__(self, name):
+        SequenceBase.__init__(self, name)
+        self._videoTracks = []
+        self._audioTracks = []
+        self._dropFrame = False
+        self._timecodeStart = 0
+        self._project = None
+
+    def videoTracks(self):
+        return list(self._videoTracks)
+
+    def audioTracks(self):
+        return list(self._audioTracks)
+
+    def addTrack(self, track):
+        tracks = (
+            self._audioTracks if isinstance(track, AudioTrack) else self._videoTracks
+        )
+        track._parent = self
+        track._index = len(tracks)
+        tracks.append(track)
+
+    def items(self):
+        return self.videoTracks() + self.audioTracks()
+
+    def dropFrame(self):
+        return self._dropFrame
+
+    def setDropFrame(self, dropFrame):
+        self._dropFrame = dropFrame
+
+    def timecodeStart(self):
+        return self._timecodeStart
+
+    def setTimecodeStart(self, timecodeStart):
+        self._timecodeStart = timecodeStart
+
+    def duration(self):
+        ends = [i.timelineOut() + 1 for t in self._videoTracks for i in t.items()]
+        return max(ends) if ends else 0
+
+    def project(self):
+        return self._project
+
+
+class _Track(_Item):
+    def __init__(self, name):
+        _Item.__init__(self, name)
+        self._items = []
+        self._parent = None
+        self._index = 0
+
+    def items(self):
+        return tuple(self._items)
+
+    def __iter__(self):
+        return iter(tuple(self._items))
+
+    def __len__(self):
+        return len(self._items)
+
+    def addItem(self, item):
+        for other in self._items:
+            if (
+                item.timelineIn() <= other.timelineOut()
+                and other.timelineIn() <= item.timelineOut()
+            ):
+                raise RuntimeError("%s overlaps %s on %s." % (item, other, self))
+        item._parentTrack = self
+        self._items.append(item)
+        self._items.sort(key=lambda i: i.timelineIn())
+        return item
+
+    def parent(self):
+        return self._parent
+
+    def trackIndex(self):
+        return self._index
+
+    def subTrackItems(self):
+        return []
+
+    def isEnabled(self):
+        return True
+
+
+class VideoTrack(_Track):
+    pass
+
+
+class AudioTrack(_Track):
+    pass
+
+
+class TrackItem(_Item):
+    class MediaType(object):
+        kVideo = 1
+        kAudio = 2
+
+    def __init__(self, name, mediaType=MediaType.kVideo):
+        _Item.__init__(self, name)
+        self._mediaType = mediaType
+        self._source = None
+        self._parentTrack = None
+        self._timelineIn = 0
+        self._timelineOut = 0
+        self._sourceIn = 0
+        self._sourceOut = 0
+        self._linkedItems = []
+
+    def mediaType(self):
+        return self._mediaType
+
+    def setSource(self, source):
+        self._source = source
+
+    def source(self):
+        return self._source
+
+    def parentTrack(self):
+        return self._parentTrack
+
+    parent = parentTrack
+
+    def parentSequence(self):
+        return self._parentTrack.parent() if self._parentTrack else None
+
+    sequence = parentSequence
+
+    def linkedItems(self):
+        return list(self._linkedItems)
+
+    def timelineIn(self):
+        return self._timelineIn
+
+    def timelineOut(self):
+        return self._timelineOut
+
+    def setTimelineIn(self, time):
+        self._timelineIn = time
+
+    def setTimelineOut(self, time):
+        self._timelineOut = time
+
+    def sourceIn(self):
+        return self._sourceIn
+
+    def sourceOut(self):
+        return self._sourceOut
+
+    def setSourceIn(self, time):
+        self._sourceIn = time
+
+    def setSourceOut(self, time):
+        self._sourceOut = time
+
+    def trimIn(self, frames):
+        self._timelineIn += frames
+        self._sourceIn += frames * self.playbackSpeed()
+
+    def trimOut(self, frames):
+        self._timelineOut -= frames
+        self._sourceOut -= frames * self.playbackSpeed()
+
+    def duration(self):
+        return self._timelineOut - self._timelineIn + 1
+
+    def sourceDuration(self):
+        return self._sourceOut - self._sourceIn + 1
+
+    def playbackSpeed(self):
+        return float(self.sourceDuration()) / self.duration()
+
+    def handleInLength(self):
+        return int(self._sourceIn)
+
+    def handleOutLength(self):
+        return int(self._source.duration() - 1 - self._sourceOut)
+
+    def isEnabled(self):
+        return True
+
+    def isMediaPresent(self):
+        return self._source.mediaSource().isMediaPresent()
+
+    def copy(self):
+        item = TrackItem(self._name, self._mediaType)
+        item.__dict__.update(self.__dict__)
+        item._guid = "{%s}" % uuid.uuid4()
+        item._parentTrack = None
+        return item
+
+
+class Project(_Item):
+    def __init__(self, name, ocioConfigName="nuke-default"):
+        _Item.__init__(self, name)
+        self._sequences = []
+        self._settings = {"ocioConfigName": ocioConfigName}
+
+    def sequences(self):
+        return list(self._sequences)
+
+    def addSequence(self, sequence):
+        sequence._project = self
+        self._sequences.append(sequence)
+
+    def extractSettings(self):
+        return dict(self._settings)
+
+
+_projects = []
+
+
+def projects():
+    return list(_projects)
+
+
+def newProject(name):
+    project = Project(name)
+    _projects.append(project)
+    return project
+
+
+def findProjectTags(project, name=None):
+    return []
+
+
+def HashesToPrintf(path):
+    """Replaces the ``####`` frame pattern of a path with a printf pattern."""
+    return re.sub(r"#+", lambda m: "%%0%dd" % len(m.group(0)), path)
+
+
+def asUnicode(value):
+    return value
+
+
+def makeDirs(path):
+    if not os.path.isdir(path):
+        os.makedirs(path)
+
+
+class ResolveTable(object):
+    """
+    Resolver of the ``{keyword}`` tokens of the export paths, each resolved
+    by a value or by a callable taking the keyword and the task.
+    """
+
+    def __init__(self):
+        self._resolvers = {}
+
+    def addResolver(self, keyword, description, resolver):
+        self._resolvers[keyword] = (description, resolver)
+
+    def addEntriesFromTable(self, other):
+        self._resolvers.update(other._resolvers)
+
+    def duplicate(self):
+        table = ResolveTable()
+        table.addEntriesFromTable(self)
+        return table
+
+    def entries(self):
+        return list(self._resolvers)
+
+    def resolve(self, task, value, isPath=False):
+        def replace(match):
+            entry = self._resolvers.get(match.group(0))
+            if entry is None:
+                return match.group(0)
+            resolver = entry[1]
+            if callable(resolver):
+                resolver = resolver(match.group(0), task)
+            result = str(resolver)
+            return result.replace(os.path.sep, "_") if isPath else result
+
+        return re.sub(r"\{\w+\}", replace, value)
+
+
+class TaskPresetBase(object):
+    kSequence = 1
+    kTrackItem = 2
+    kAllItems = kSequence | kTrackItem
+
+    def __init__(self, parentType, presetName):
+        self._parentType = parentType
+        self._name = presetName
+        self._properties = {}
+
+    def name(self):
+        return self._name
+
+    def properties(self):
+        return self._properties
+
+    def parentType(self):
+        return self._parentType
+
+    def supportedItems(self):
+        return TaskPresetBase.kAllItems
+
+    def addUserResolveEntries(self, resolver):
+        pass
+
+    def isValid(self):
+        return (True, "")
+
+
+class TaskData(dict):
+    """The data a task is created from."""
+
+
+class TaskBase(object):
+    """
+    Stand-in for the base class of the Hiero export tasks. The frame and
+    handle computations mirror those of the Hiero exporters.
+    """
+
+    def __init__(self, initDict):
+        self._init_dictionary = initDict
+        self._preset = initDict["preset"]
+        self._item = initDict["item"]
+        self._exportRoot = initDict["exportRoot"]
+        self._exportPath = initDict["exportPath"]
+        self._version = initDict["version"]
+        self._versionPadding = initDict.get("versionPadding", 2)
+        self._project = initDict["project"]
+        self._cutHandles = initDict["cutHandles"]
+        self._retime = initDict["retime"]
+        self._startFrame = initDict["startFrame"]
+        self._resolver = initDict["resolver"]
+        self._skipOffline = initDict["skipOffline"]
+        self._submission = initDict["submission"]
+        self._shotNameIndex = initDict.get("shotNameIndex", "")
+        self._error = None
+        self._finished = False
+
+        if isinstance(self._item, TrackItem):
+            self._sequence = self._item.parentSequence()
+            self._clip = self._item.source()
+            self._source = self._clip.mediaSource()
+        elif isinstance(self._item, Clip):
+            self._sequence = None
+            self._clip = self._item
+            self._source = self._item.mediaSource()
+        else:
+            self._sequence = self._item
+            self._clip = None
+            self._source = self._item
+
+    def versionString(self):
+        return "v%0*d" % (self._versionPadding, self._version)
+
+    def clipName(self):
+        return self._clip.name() if self._clip else self._item.name()
+
+    def shotName(self):
+        return self._item.name()
+
+    def sequenceName(self):
+        return self._sequence.name() if self._sequence else ""
+
+    def resolvedExportPath(self):
+        return self._resolver.resolve(self, self._exportPath, isPath=True)
+
+    def inputRange(self, ignoreHandles=False, ignoreRetimes=False, clampToSource=True):
+        """Returns the range of source frames used by the task's item."""
+        if isinstance(self._item, Sequence):
+            return (0, self._item.duration() - 1)
+        if isinstance(self._item, Clip):
+            return (0, self._item.duration() - 1)
+
+        handles = 0
+        if self._cutHandles is not None and not ignoreHandles:
+            handles = self._cutHandles
+            if self._retime and not ignoreRetimes:
+                handles *= abs(self._item.playbackSpeed())
+
+        sourceInOut = (self._item.sourceIn(), self._item.sourceOut())
+        start = min(sourceInOut) - handles
+        end = max(sourceInOut) + handles
+        if clampToSource:
+            start = max(start, 0)
+            end = min(end, self._clip.duration() - 1)
+        return (start, end)
+
+    def outputRange(self, ignoreHandles=False, ignoreRetimes=True, clampToSource=True):
+        (start, end) = self.inputRange(ignoreHandles, ignoreRetimes, clampToSource)
+        start = int(math.floor(start))
+        end = int(math.ceil(end))
+        if self._startFrame is not None:
+            (start, end) = (self._startFrame, self._startFrame + end - start)
+        return (start, end)
+
+    def nothingToDo(self):
+        return False
+
+    def startTask(self):
+        pass
+
+    def taskStep(self):
+        return False
+
+    def finishTask(self):
+        self._finished = True
+
+    def progress(self):
+        return 1.0 if self._finished else 0.0
+
+    def forcedAbort(self):
+        pass
+
+    def setError(self, message):
+        self._error = message
+
+    def error(self):
+        return self._error
+
+
+class TaskGroup(object):
+    def __init__(self, item=None):
+        self._item = item
+        self._children = []
+
+    def item(self):
+        return self._item
+
+    def addChild(self, task):
+        self._children.append(task)
+
+    def children(self):
+        return list(self._children)
+
+    def finishTask(self):
+        pass
+
+    def forcedAbort(self):
+        pass
+
+
+class Submission(TaskGroup):
+    """The tasks of an export, grouped by item."""
+
+    def __init__(self):
+        TaskGroup.__init__(self)
+        self.queued = False
+
+    def addToQueue(self):
+        self.queued = True
+
+
+class ItemWrapper(object):
+    """An item selected for export, as handed to the processors."""
+
+    def __init__(self, item):
+        self._item = item
+
+    def trackItem(self):
+        return self._item if isinstance(self._item, TrackItem) else None
+
+    def sequence(self):
+        return self._item if isinstance(self._item, Sequence) else None
+
+    def clip(self):
+        return self._item if isinstance(self._item, Clip) else None
+
+    def item(self):
+        return self._item
+
+
+class TaskRegistry(object):
+    def __init__(self):
+        self._tasks = {}
+        self._processors = {}
+        self._processorPresets = {}
+        self._defaultPresets = lambda overwrite: None
+
+    def registerTask(self, presetType, taskType):
+        self._tasks[presetType] = taskType
+
+    def registerProcessor(self, presetType, processorType):
+        self._processors[presetType] = processorType
+
+    def setDefaultPresets(self, fn):
+        self._defaultPresets = fn
+
+    def localPresets(self):
+        return list(self._processorPresets.values())
+
+    def addProcessorPreset(self, name, preset):
+        self._processorPresets[name] = preset
+
+    def removeProcessorPreset(self, name):
+        self._processorPresets.pop(name, None)
+
+    def createTaskFromPreset(self, preset, initDict):
+        taskType = self._tasks.get(type(preset), preset.parentType())
+        return taskType(initDict)
+
+    def createProcessor(self, preset, submission=None, synchronous=False):
+        processorType = self._processors.get(type(preset), preset.parentType())
+        return processorType(preset, submission, synchronous)
+
+
+def _install_hiero():
+    hiero = _module("hiero")
+    core = _module(
+        "hiero.core",
+        permissive=True,
+        TimeBase=TimeBase,
+        Timecode=Timecode,
+        Tag=Tag,
+        FileInfo=FileInfo,
+        MediaSource=MediaSource,
+        SequenceBase=SequenceBase,
+        Clip=Clip,
+        Sequence=Sequence,
+        VideoTrack=VideoTrack,
+        AudioTrack=AudioTrack,
+        TrackItem=TrackItem,
+        Project=Project,
+        projects=projects,
+        newProject=newProject,
+        findProjectTags=findProjectTags,
+        ResolveTable=ResolveTable,
+        TaskPresetBase=TaskPresetBase,
+        TaskData=TaskData,
+        TaskBase=TaskBase,
+        TaskGroup=TaskGroup,
+        ItemWrapper=ItemWrapper,
+        taskRegistry=TaskRegistry(),
+    )
+    _module("hiero.core.util", HashesToPrintf=HashesToPrintf, asUnicode=asUnicode)
+    _module("hiero.core.util.filesystem", makeDirs=makeDirs)
+    _module(
+        "hiero.core.log",
+        debug=logger.debug,
+        info=logger.debug,
+        warning=logger.warning,
+        error=logger.error,
+        exception=logger.exception,
+    )
+    _module("hiero.core.nuke", permissive=True)
+    _module("hiero.core.FnNukeHelpers", permissive=True)
+    _module(
+        "hiero.core.FnExporterBase",
+        permissive=True,
+        tagsFromSelection=lambda *a, **k: [],
+    )
+    core.Submission = Submission
+
+    _module("hiero.exporters")
+    from . import processor
+
+    _module(
+        "hiero.exporters.FnShotExporter",
+        ShotTask=processor.ShotTask,
+    )
+    _module(
+        "hiero.exporters.FnShotProcessor",
+        ShotProcessor=processor.ShotProcessor,
+        ShotProcessorPreset=processor.ShotProcessorPreset,
+    )
+    _module(
+        "hiero.exporters.FnEffectHelpers",
+        findEffectsAnnotationsForTrackItems=lambda items: ([], []),
+    )
+    for name in (
+        "FnShotProcessorUI",
+        "FnTranscodeExporter",
+        "FnTranscodeExporterUI",
+        "FnExternalRender",
+        "FnNukeShotExporter",
+        "FnNukeShotExporterUI",
+        "FnSymLinkExporter",
+        "FnSymLinkExporterUI",
+        "FnAudioExportTask",
+        "FnAudioExportUI",
+    ):
+        _module("hiero.exporters.%s" % name, permissive=True)
+
+    _module("hiero.ui", permissive=True, taskUIRegistry=_Anything())
+    _module("hiero.ui.FnUIProperty", permissive=True)
+    _module("hiero.ui.nuke_bridge", permissive=True)
+    _module(
+        "hiero.ui.nuke_bridge.FnNsFrameServer",
+        isServerRunning=lambda timeout=1: False,
+    )
+    return hiero
+
+
+# ---------------------------------------------------------------------------
+# Nuke and BaitTasks
+
+
+class TaskQueue(object):
+    """Stand-in for the BaitTasks queue, keeping the tasks it is given."""
+
+    def __init__(self):
+        self.tasks = []
+
+    def addTasksToQueue(self, tasks, autoStart=False):
+        self.tasks.extend(tasks)
+
+
+def _install_nuke():
+    nuke = _module(
+        "nuke",
+        permissive=True,
+        NUKE_VERSION_MAJOR=NUKE_VERSION[0],
+        NUKE_VERSION_MINOR=NUKE_VERSION[1],
+        NUKE_VERSION_RELEASE=NUKE_VERSION[2],
+    )
+    nuke.nuke = nuke
+
+
+def _install_bait_tasks(bait_tasks_dir):
+    bait_tasks = _module("BaitTasks", permissive=True)
+    bait_tasks.Handler = _module("BaitTasks.Handler", default=TaskQueue())
+    os.environ.setdefault("BAIT_TASKS_PYTHON_DIR", bait_tasks_dir)
+    os.environ.setdefault("BAIT_TASKS_DIR", bait_tasks_dir)
+
+
+# ---------------------------------------------------------------------------
+
+
+def install():
+    """
+    Registers the stand-in modules, replacing any module of the same name
+    already imported. Calling it again has no effect.
+    """
+    if getattr(sys.modules.get("hiero"), "__headless__", False):
+        return
+    _install_sgtk()
+    _install_qt()
+    _install_nuke()
+    _install_bait_tasks(tempfile.gettempdir())
+    _install_hiero().__headless__ = True
@@ -0,0 +1,124 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Builds synthetic Hiero sequences out of the stand-in classes, with source
+frame files on disk for the copy exporter to copy.
+"""
+
+import os
+import random
+
+import hiero.core
+
+
+# The first frame of the synthetic source media.
+SOURCE_FIRST_FRAME = 1001
+
+
+def build_sequence(
+    root,
+    shots=10,
+    tracks=1,
+    overlap=0.5,
+    frames=24,
+    handles=10,
+    frame_bytes=4096,
+    fps=24,
+    drop_frame=False,
+    seed=0,
+    name="headless_seq",
+):
+    """
+    Builds a sequence of back to back shots on its first video track, with
+    shorter items overlapping them on the other tracks, and writes the
+    source frames of every item under ``root``.
+
+    :param str root: The folder the source frames are written to.
+    :param int shots: The number of shots on the first track.
+    :param int tracks: The number of video tracks.
+    :param float overlap: The chance for each shot to be overlapped by an
+        item on each of the other tracks, between 0 and 1.
+    :param int frames: The number of frames of each shot.
+    :param int handles: The number of frames available before and after
+        each item in its source media.
+    :param int frame_bytes: The size of each source frame file.
+    :param float fps: The frame rate of the sequence.
+    :param bool drop_frame: Whether the timecodes of the sequence are drop
+        frame ones.
+    :param int seed: The seed of the random overlaps.
+    :param str name: The name of the sequence.
+
+    :returns: The hiero.core.Sequence.
+    """
+    rng = random.Random(seed)
+    project = hiero.core.newProject("headless_project")
+    sequence = hiero.core.Sequence(name)
+    sequence.setFramerate(fps)
+    sequence.setDropFrame(drop_frame)
+    sequence.setTimecodeStart(86400)
+    project.addSequence(sequence)
+
+    for index in range(tracks):
+        sequence.addTrack(hiero.core.VideoTrack("Video %d" % (index + 1)))
+    video_tracks = sequence.videoTracks()
+
+    frame_data = bytes(frame_bytes)
+    for shot in range(shots):
+        shot_name = "sh%04d" % ((shot + 1) * 10)
+        timeline_in = shot * frames
+        _add_item(
+            root, video_tracks[0], shot_name, timeline_in, frames, handles, frame_data
+        )
+
+        for track in video_tracks[1:]:
+            if rng.random() >= overlap:
+                continue
+            length = rng.randint(max(1, frames // 4), frames)
+            start = timeline_in + rng.randint(0, frames - length)
+            _add_item(
+                root,
+                track,
+                "%s_%s" % (shot_name, track.name().replace(" ", "").lower()),
+                start,
+                length,
+                handles,
+                frame_data,
+            )
+
+    sequence.setPosterFrame(sequence.duration() // 2)
+    return sequence
+
+
+def _add_item(root, track, name, timeline_in, frames, handles, frame_data):
+    """Adds an item to a track, with its source frames written on disk."""
+    folder = os.path.join(root, track.name().replace(" ", "_"), name)
+    if not os.path.isdir(folder):
+        os.makedirs(folder)
+    path = os.path.join(folder, "%s.####.exr" % name)
+    first = SOURCE_FIRST_FRAME
+    last = first + frames + 2 * handles - 1
+    pattern = hiero.core.util.HashesToPrintf(path)
+    for frame in range(first, last + 1):
+        with open(pattern % frame, "wb") as f:
+            f.write(frame_data)
+
+    item = hiero.core.TrackItem(name)
+    item.setSource(hiero.core.Clip(hiero.core.MediaSource(path, first, last), name))
+    item.setTimelineIn(timeline_in)
+    item.setTimelineOut(timeline_in + frames - 1)
+    item.setSourceIn(handles)
+    item.setSourceOut(handles + frames - 1)
+    return track.addItem(item)
+
+
+def count_items(sequence):
+    """Returns the number of items on the video tracks of a sequence."""
+    return sum(len(track.items()) for track in sequence.videoTracks())
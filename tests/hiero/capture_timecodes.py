@@ -0,0 +1,126 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Captures the timecodes formatted by ``hiero.core.Timecode.timeToString`` and
+checks the app's timecode module against them.
+
+The frames captured are the ones of the module's ``REFERENCE_TIMECODES``
+along with, at every frame rate and with and without drop frame, the second,
+minute, ten minute, hour and day boundaries, negative frames and frames
+several days past zero.
+
+It has to run in a Hiero session, ie. from the Script Editor::
+
+    import runpy
+    runpy.run_path("/path/to/tk-hiero-export/tests/hiero/capture_timecodes.py")
+
+It prints the captured table, to paste over ``REFERENCE_TIMECODES`` in
+``python/tk_hiero_export/timecode.py``, followed by the frames the module
+formats differently from Hiero.
+"""
+
+import os
+import importlib.util
+
+import hiero.core
+
+
+# The root of the app.
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def load_timecode_module():
+    """Loads the app's timecode module, which doesn't depend on Toolkit."""
+    path = os.path.join(ROOT, "python", "tk_hiero_export", "timecode.py")
+    spec = importlib.util.spec_from_file_location("tk_hiero_export_timecode", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def time_to_string(frame, fps, drop_frame):
+    """Formats a frame the way the shot processor used to, through Hiero."""
+    if drop_frame:
+        display_type = hiero.core.Timecode.kDisplayDropFrameTimecode
+    else:
+        display_type = hiero.core.Timecode.kDisplayTimecode
+    return hiero.core.Timecode.timeToString(frame, fps, display_type)
+
+
+def capture_frames(fps, drop_frame):
+    """Returns the frames to capture at a frame rate."""
+    rate = int(round(fps))
+    # the drop frame minutes are shorter, except every tenth one
+    dropped = rate // 15 if drop_frame and rate in (30, 60) else 0
+    minute = rate * 60 - dropped
+    ten_minutes = minute * 10 + dropped
+    day = ten_minutes * 6 * 24
+
+    boundaries = [rate, rate * 60, minute, ten_minutes, ten_minutes * 6, day]
+    frames = set([0, 1])
+    for boundary in boundaries:
+        frames.update([boundary - 1, boundary, boundary + 1])
+    frames.update([minute * 2 + dropped, ten_minutes + minute])
+    frames.update([day * 10 + 12345, day * 100 + ten_minutes])
+    frames.update([-1, -rate, -ten_minutes, -day, -day - 1])
+    return sorted(frames)
+
+
+def capture(timecode):
+    """
+    Returns the captured table, as (frame, fps, drop frame, timecode)
+    tuples, sorted by frame rate, drop frame and frame.
+    """
+    keys = set(
+        (frame, fps, drop_frame)
+        for (frame, fps, drop_frame, _) in timecode.REFERENCE_TIMECODES
+    )
+    for fps in timecode.FRAME_RATES:
+        for drop_frame in (False, True):
+            keys.update(
+                (frame, fps, drop_frame) for frame in capture_frames(fps, drop_frame)
+            )
+
+    return [
+        (frame, fps, drop_frame, time_to_string(frame, fps, drop_frame))
+        for (frame, fps, drop_frame) in sorted(keys, key=lambda k: (k[1], k[2], k[0]))
+    ]
+
+
+def main():
+    timecode = load_timecode_module()
+    table = capture(timecode)
+
+    print(
+        "# Timecodes formatted by hiero.core.Timecode.timeToString in Hiero %s,"
+        % hiero.core.env["VersionString"]
+    )
+    print("# as (frame, fps, drop frame, timecode).")
+    print("REFERENCE_TIMECODES = (")
+    for (frame, fps, drop_frame, string) in table:
+        print('    (%d, %s, %s, "%s"),' % (frame, fps, drop_frame, string))
+    print(")")
+
+    mismatches = [
+        (frame, fps, drop_frame, formatted, string)
+        for (frame, fps, drop_frame, string) in table
+        for formatted in [timecode.TimecodeFormatter(fps, drop_frame).format(frame)]
+        if formatted != string
+    ]
+    print(
+        "%d of %d timecodes formatted differently by the timecode module."
+        % (len(mismatches), len(table))
+    )
+    for mismatch in mismatches:
+        print("  frame %d at %s, drop frame %s: %s, Hiero: %s" % mismatch)
+
+
+main()
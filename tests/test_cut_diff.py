@@ -0,0 +1,120 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+
+from tk_hiero_export.cut_diff import CutDiff
+
+
+SHOTS = dict((code, {"type": "Shot", "id": id}) for (id, code) in enumerate("ABC", 1))
+
+
+def _previous_item(id, code, cut_order, **fields):
+    item = {
+        "type": "CutItem",
+        "id": id,
+        "shot": SHOTS[code],
+        "shot.Shot.code": code,
+        "code": code,
+        "cut_order": cut_order,
+        "cut_item_in": 1001,
+        "cut_item_out": 1048,
+    }
+    item.update(fields)
+    return item
+
+
+def _exported_item(code, cut_order, **fields):
+    data = {
+        "shot": SHOTS[code],
+        "code": code,
+        "cut_order": cut_order,
+        "cut_item_in": 1001,
+        "cut_item_out": 1048,
+    }
+    data.update(fields)
+    return data
+
+
+def _diff(exported, shot_names, retire_removed=False, cut_data=None):
+    previous_cut = {"type": "Cut", "id": 1, "duration": 96, "fps": 24.0}
+    previous_items = [_previous_item(11, "A", 1), _previous_item(12, "B", 2)]
+    return CutDiff(
+        previous_cut,
+        previous_items,
+        cut_data or {"duration": 96, "fps": 24.0},
+        exported,
+        shot_names,
+        retire_removed,
+    )
+
+
+def test_unchanged():
+    diff = _diff([_exported_item("A", 1), _exported_item("B", 2)], ["A", "B"])
+    assert diff.is_empty()
+    assert diff.requests() == []
+
+
+def test_added():
+    added = _exported_item("C", 3)
+    diff = _diff(
+        [_exported_item("A", 1), _exported_item("B", 2), added], ["A", "B", "C"]
+    )
+    assert diff.added == [added]
+    assert not diff.changed
+    assert not diff.is_empty()
+    # the added CutItems are left to create
+    assert diff.requests() == []
+
+
+def test_changed():
+    diff = _diff(
+        [_exported_item("A", 1), _exported_item("B", 2, cut_item_out=1052)],
+        ["A", "B"],
+        cut_data={"duration": 100, "fps": 24.0},
+    )
+    assert [item["id"] for (_, item, _) in diff.changed] == [12]
+    assert diff.requests() == [
+        {
+            "request_type": "update",
+            "entity_type": "Cut",
+            "entity_id": 1,
+            "data": {"duration": 100},
+        },
+        {
+            "request_type": "update",
+            "entity_type": "CutItem",
+            "entity_id": 12,
+            "data": {"cut_item_out": 1052},
+        },
+    ]
+
+
+def test_removed_is_kept():
+    diff = _diff([_exported_item("A", 1)], ["A"])
+    assert [item["id"] for item in diff.removed] == [12]
+    assert diff.retired == []
+    assert diff.is_empty()
+    assert diff.requests() == []
+
+
+def test_removed_is_retired():
+    diff = _diff([_exported_item("A", 1)], ["A"], retire_removed=True)
+    assert [item["id"] for item in diff.retired] == [12]
+    assert diff.requests() == [
+        {"request_type": "delete", "entity_type": "CutItem", "entity_id": 12}
+    ]
+
+
+def test_unexported_is_not_removed():
+    # B is still in the edit, only missing from a partial export
+    diff = _diff([_exported_item("A", 1)], ["A", "B"], retire_removed=True)
+    assert diff.removed == []
+    assert [item["id"] for item in diff.unexported] == [12]
+    assert diff.is_empty()
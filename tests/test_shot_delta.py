@@ -0,0 +1,47 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+
+from tk_hiero_export.shot_delta import shot_update_delta
+
+
+CURRENT_SHOT = {
+    "code": "sh010",
+    "sg_cut_in": 1009,
+    "sg_cut_out": 1056,
+    "sg_status_list": "ip",
+    "task_template": {"type": "TaskTemplate", "id": 3, "code": "Shot"},
+}
+
+
+def test_empty_delta():
+    data = {
+        "sg_cut_in": 1009,
+        "sg_cut_out": 1056,
+        # entities are compared by type and id only
+        "task_template": {"type": "TaskTemplate", "id": 3},
+    }
+    assert shot_update_delta(CURRENT_SHOT, data) == {}
+
+
+def test_partial_delta():
+    data = {"sg_cut_in": 1009, "sg_cut_out": 1060, "sg_status_list": "ip"}
+    assert shot_update_delta(CURRENT_SHOT, data) == {"sg_cut_out": 1060}
+
+
+def test_full_delta():
+    data = {
+        "sg_cut_in": 1001,
+        "sg_cut_out": 1048,
+        "task_template": {"type": "TaskTemplate", "id": 4},
+        # fields the Shot wasn't fetched with are always part of the delta
+        "sg_cut_order": 1,
+    }
+    assert shot_update_delta(CURRENT_SHOT, data) == data
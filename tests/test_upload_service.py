@@ -0,0 +1,48 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+
+from tk_hiero_export.upload_service import UploadService
+
+
+def _shots(sg, count):
+    return [sg.create("Shot", {"code": "sh%03d" % (i * 10)}) for i in range(count)]
+
+
+def test_identical_thumbnails_are_shared(app, sg):
+    shots = _shots(sg, 3)
+    service = UploadService(app, None, worker_count=0)
+    for shot in shots:
+        service.upload_thumbnail_data(shot, b"thumbnail", "jpg")
+    service.finish()
+
+    assert sg.calls["upload_thumbnail"] == 1
+    assert sg.calls["share_thumbnail"] == 2
+    images = [sg.find_one("Shot", [["id", "is", s["id"]]], ["image"]) for s in shots]
+    assert all(image["image"] for image in images)
+
+
+def test_failed_share_falls_back_to_upload(app, sg):
+    shots = _shots(sg, 3)
+
+    def share_thumbnail(*args, **kwargs):
+        raise RuntimeError("share failed")
+
+    sg.share_thumbnail = share_thumbnail
+    service = UploadService(app, None, worker_count=0)
+    for shot in shots:
+        service.upload_thumbnail_data(shot, b"thumbnail", "jpg")
+    service.finish()
+
+    assert sg.calls["upload_thumbnail"] == 3
+    images = [sg.find_one("Shot", [["id", "is", s["id"]]], ["image"]) for s in shots]
+    assert all(image["image"] for image in images)
+    assert "3 of 3 upload(s) to ShotGrid completed" in service.summary()
+    assert service.summary().endswith("0 failed.")